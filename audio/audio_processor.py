@@ -4,16 +4,19 @@ import json
 import threading
 import time
 import datetime
+from collections.abc import Iterator
 import sounddevice as sd
 from vosk import KaldiRecognizer, Model
 from .audio_out import get_audio_out
-from celery_config import get_celery_app
+from background.task_backend import send_task
 from integrations.openai.openai import OpenAIClient
 from integrations.openai.openai_conversation_builder import OpenAIConversationBuilder
 from utils.audio.helpers import contains_quiet_please_phrase, contains_wake_phrase, get_tool_not_found_phrase
 from decorators.openai_decorators import openai_functions
 from utils.openai.tool_processor import ToolProcessor
 from broadcast.broadcaster import broadcaster
+from database.system_state_store import get_system_state_store
+from video.speculative import get_speculative_vision
 from config import CONVERSATIONS_CONFIG, AUDIO_SETTINGS
 
 class AudioProcessor:
@@ -40,7 +43,9 @@ class AudioProcessor:
         self.openai_conversation_builder = OpenAIConversationBuilder()
         self.tool_processor = ToolProcessor()
         self.broadcaster = broadcaster
+        self.system_state = get_system_state_store()
         self.audio_out = get_audio_out()
+        self.speculative_vision = get_speculative_vision()
         self.audio_out_response_buffer = ''
         self.full_assistant_response = ''
         self.last_wake_time = 0
@@ -152,6 +157,8 @@ class AudioProcessor:
                 self.broadcaster.send_message(result)
                 logging.info("ROBOT HEARD: " + result)
                 return result
+            # The utterance was not understood; a frame captured for it must not serve the next one.
+            self.end_speculation()
         return None
 
     def handle_speech(self, result, openai_stream_thread, current_time):
@@ -169,6 +176,8 @@ class AudioProcessor:
         try:
             if self.should_process(result, current_time) and not self.processing_openai_request:
                 self.update_wake_time()
+                if self.speculative_vision:
+                    self.speculative_vision.on_utterance(result)
                 self.processing_openai_request = True
                 if not openai_stream_thread or not openai_stream_thread.is_alive():
                     self.openai_client.stop_signal.clear()
@@ -181,7 +190,15 @@ class AudioProcessor:
                 logging.info("ROBOT THOUGHT: Ignoring Conversation, it doesn't appear to be relevant.")
         finally:
             self.processing_openai_request = False
+            self.end_speculation()
             return openai_stream_thread
+
+    def end_speculation(self):
+        """
+        Discards the speculative vision work of the utterance just handled, if the vision tool did not use it.
+        """
+        if self.speculative_vision:
+            self.speculative_vision.end_utterance()
         
     
     def determine_tool_request(self, result):
@@ -252,7 +269,12 @@ class AudioProcessor:
             conversation (list): The conversation array.
             tool_response_message (Message): The tool response message from OpenAI.
         """
-        if tool_processor_response["is_conversational"]:
+        if isinstance(tool_processor_response["function_result"], Iterator):
+            # The tool streams its answer; speak it as it arrives instead of passing it through another completion
+            self.store_conversation(speaker_type=CONVERSATIONS_CONFIG["user"], response=result)
+            openai_stream_thread = threading.Thread(target=self.openai_client.stream_text, args=(tool_processor_response["function_result"],))
+            openai_stream_thread.start()
+        elif tool_processor_response["is_conversational"]:
             conversation.append(tool_response_message)
             tool_call_response_message = self.openai_conversation_builder.create_tool_call_response_message(tool_processor_response)
             conversation.append(tool_call_response_message)
@@ -287,6 +309,9 @@ class AudioProcessor:
         partial_result_json = json.loads(rec.PartialResult())
         if 'partial' in partial_result_json and contains_quiet_please_phrase(partial_result_json['partial']):
             self.stop_conversation_and_audio()
+        elif self.speculative_vision and contains_wake_phrase(partial_result_json.get('partial', '')):
+            # Capture the frame while the rest of the request is still being spoken
+            self.speculative_vision.on_wake()
 
     def stop_conversation_and_audio(self):
         """
@@ -321,8 +346,9 @@ class AudioProcessor:
         """
         while not self.openai_client.response_queue.empty():
             chunk = self.openai_client.response_queue.get()
-            if chunk.choices[0].delta.content is not None:
-                response_text = chunk.choices[0].delta.content
+            # Text streamed by tools is queued as plain strings, completions as chunks
+            response_text = chunk if isinstance(chunk, str) else chunk.choices[0].delta.content
+            if response_text is not None:
                 print(response_text, end='', flush=True)
                 self.update_response_end_time()
                 self.audio_out_response_buffer += response_text
@@ -344,21 +370,23 @@ class AudioProcessor:
 
     def store_conversation(self, speaker_type, response):
         """
-        Stores the conversation part in the database asynchronously using a Celery task.
+        Stores the conversation part in the database asynchronously using a background task.
 
         Args:
             speakerType (str): "user" or "assistant", indicating who is speaking.
             response (str): The text of the response.
         """
-        get_celery_app().send_task('background.memory.tasks.store_conversation_task', args=[speaker_type, response])
+        # Never wait on a full background queue from the audio thread; the part is dropped and logged instead
+        send_task('background.memory.tasks.store_conversation_task', args=[speaker_type, response], block=False)
         logging.info("Store conversation task submitted to background")
     
     def save_system_state(self):
         """
-        Saves the system state in the database asynchronously using a Celery task.
+        Saves the system state to the in-process state store, which persists it to the database
+        in the background with debounced writes.
         """
-        get_celery_app().send_task('background.memory.tasks.update_system_state_task', args=[self.last_wake_time])
-        logging.info("Update system state task submitted to background")
+        self.system_state.update(last_wake_time=self.last_wake_time)
+        logging.debug("System state updated")
 
     def shutdown(self):
         self.shutdown_event.set()
\ No newline at end of file
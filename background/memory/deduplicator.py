@@ -0,0 +1,148 @@
+import logging
+import threading
+from collections import deque
+from datetime import datetime, timedelta, timezone
+import numpy as np
+from config import CONVERSATIONS_CONFIG
+from integrations.openai.embedding_cache import EmbeddingCache
+
+class ConversationDeduplicator:
+    """
+    Suppresses repeated and near-duplicate conversation parts before they are stored.
+
+    Repeated utterances ("stop", "stop") and retried responses would otherwise fill the recent
+    window sent with every prompt. Only consecutive repeats are suppressed: a part is compared
+    with the part right before it, if that part is of the same speaker and was stored within the
+    last window_seconds. The same answer given to different questions ("yes" ... "yes") has the
+    other speaker's part in between, and is kept, so no turn is lost from the dialogue.
+
+      - Exact repeats, by hash of the normalized text, are skipped before they are embedded.
+      - Near repeats, by cosine similarity of their embeddings, are skipped as well. When both
+        parts are in the same batch, the longer of the two is kept.
+
+    Attributes:
+        window_seconds (float): How far back a part is compared with earlier parts.
+        similarity_threshold (float): Cosine similarity at or above which two parts are near duplicates.
+        recent (deque): (created_at, speaker_type, text hash, normalized embedding) of recently stored parts.
+    """
+
+    def __init__(self, conversation_manager, window_seconds=None, similarity_threshold=None):
+        """
+        Initializes the deduplicator.
+
+        Args:
+            conversation_manager: Memory manager used to load the parts stored before this process started.
+            window_seconds (float, optional): Overrides CONVERSATIONS_CONFIG['dedup_window_seconds'].
+            similarity_threshold (float, optional): Overrides CONVERSATIONS_CONFIG['dedup_similarity_threshold'].
+        """
+        self.conversation_manager = conversation_manager
+        self.window_seconds = window_seconds or CONVERSATIONS_CONFIG.get('dedup_window_seconds', 120)
+        self.similarity_threshold = similarity_threshold or CONVERSATIONS_CONFIG.get('dedup_similarity_threshold', 0.97)
+        self.recent = deque()
+        self.seeded = False
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def normalize(embedding):
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def seed(self):
+        """
+        Loads the parts stored within the window, so duplicates of parts written before this
+        process started are also caught.
+        """
+        self.seeded = True
+        after_date = datetime.now(timezone.utc) - timedelta(seconds=self.window_seconds)
+        try:
+            stored = self.conversation_manager.list_conversations(after_date=after_date)
+        except Exception as e:
+            logging.warning(f"Could not load recent conversation parts for deduplication: {e}")
+            return
+        for conversation in sorted(stored, key=lambda conversation: conversation.created_at):
+            if conversation.response_embedding is None:
+                continue
+            self.recent.append((conversation.created_at, conversation.speaker_type,
+                                EmbeddingCache.hash_text(conversation.response),
+                                self.normalize(conversation.response_embedding)))
+
+    def expire(self, now):
+        """
+        Forgets the parts that fell out of the window.
+        """
+        cutoff = now - timedelta(seconds=self.window_seconds)
+        while self.recent and self.recent[0][0] < cutoff:
+            self.recent.popleft()
+
+    def filter_exact(self, conversations):
+        """
+        Drops parts whose normalized text repeats the part right before them, of the same speaker.
+
+        Args:
+            conversations (list[dict]): Pending parts with speaker_type, response and created_at.
+
+        Returns:
+            list[dict]: The parts to embed and store.
+        """
+        with self.lock:
+            if not self.seeded:
+                self.seed()
+            if conversations:
+                self.expire(conversations[0]["created_at"])
+            previous = self.recent[-1][1:3] if self.recent else None
+
+        kept = []
+        for row in conversations:
+            key = (row["speaker_type"], EmbeddingCache.hash_text(row["response"]))
+            if key == previous:
+                logging.debug(f"Skipping repeated conversation part: {row['response']!r}")
+                continue
+            previous = key
+            kept.append(row)
+        return kept
+
+    def filter_similar(self, conversations, embeddings):
+        """
+        Drops (or merges within the batch) parts whose embedding nearly matches the part right before them, of the same speaker.
+
+        Args:
+            conversations (list[dict]): The parts returned by filter_exact.
+            embeddings (list): Their embeddings, in the same order.
+
+        Returns:
+            tuple[list[dict], list]: The parts to store and their embeddings.
+        """
+        with self.lock:
+            # (speaker type, normalized embedding) of the part before the batch, if still in the window
+            previous = (self.recent[-1][1], self.recent[-1][3]) if self.recent else None
+
+        kept_rows, kept_embeddings, kept_vectors = [], [], []
+        for row, embedding in zip(conversations, embeddings):
+            vector = self.normalize(embedding)
+            repeats = previous is not None and previous[0] == row["speaker_type"] \
+                and float(vector @ previous[1]) >= self.similarity_threshold
+            if not repeats:
+                kept_rows.append(row)
+                kept_embeddings.append(embedding)
+                kept_vectors.append(vector)
+                previous = (row["speaker_type"], vector)
+            elif not kept_rows or kept_vectors[-1] is not previous[1]:
+                # The repeated part is already stored.
+                logging.debug(f"Skipping near-duplicate conversation part: {row['response']!r}")
+            elif len(row["response"]) > len(kept_rows[-1]["response"]):
+                # Both are in this batch: keep the more complete wording, at the position of the earlier part.
+                kept_rows[-1] = {**row, "created_at": kept_rows[-1]["created_at"]}
+                kept_embeddings[-1] = embedding
+                kept_vectors[-1] = vector
+                previous = (row["speaker_type"], vector)
+        return kept_rows, kept_embeddings
+
+    def remember(self, conversations, embeddings):
+        """
+        Adds stored parts to the window.
+        """
+        with self.lock:
+            for row, embedding in zip(conversations, embeddings):
+                self.recent.append((row["created_at"], row["speaker_type"],
+                                    EmbeddingCache.hash_text(row["response"]), self.normalize(embedding)))
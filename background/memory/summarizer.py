@@ -0,0 +1,97 @@
+import logging
+from config import CONVERSATIONS_CONFIG
+from background.worker_resources import get_worker_resources
+
+class ConversationSummarizer:
+    """
+    Compacts older conversation turns into a rolling summary.
+
+    Turns outside the most recent window are folded, together with the previous summary, into
+    a new summary row. The conversation builder then sends the summary plus the recent turns,
+    which bounds the prompt size while keeping long-range context.
+
+    Attributes:
+        keep_recent_tokens (int): Tokens of recent conversation that are never compacted.
+        trigger_tokens (int): Minimum tokens of compactable turns before a new summary is built.
+        max_summary_words (int): Target length of the summary, passed to the model.
+    """
+
+    SUMMARY_INSTRUCTIONS = (
+        "You maintain the long-term memory of a robot assistant. Update the running summary below with "
+        "the new conversation turns. Keep names, numbers, decisions, commitments, user preferences and open "
+        "questions; drop small talk and repetition. Write in the third person, in plain prose, in at most "
+        "{max_words} words. Respond with the updated summary only."
+    )
+
+    def __init__(self):
+        """
+        Initializes the summarizer with the worker's OpenAI client and memory manager, and its thresholds.
+        """
+        resources = get_worker_resources()
+        self.openai_client = resources.openai_client
+        self.memory_manager = resources.conversation_manager
+        self.keep_recent_tokens = CONVERSATIONS_CONFIG.get('summary_keep_recent_tokens', 1000)
+        self.trigger_tokens = CONVERSATIONS_CONFIG.get('summary_trigger_tokens', 1500)
+        self.max_summary_words = CONVERSATIONS_CONFIG.get('summary_max_words', 250)
+
+    def summarize(self):
+        """
+        Builds a new rolling summary if enough turns have aged out of the recent window.
+
+        Returns:
+            bool: True if a new summary was stored, False otherwise.
+        """
+        with self.memory_manager.summary_lock() as acquired:
+            if not acquired:
+                logging.debug("Summarization already running in another worker")
+                return False
+
+            turns = self.memory_manager.list_compactable_conversations(self.keep_recent_tokens)
+            if sum(turn.response_tokens for turn in turns) < self.trigger_tokens:
+                return False
+
+            previous_summary = self.memory_manager.get_latest_summary()
+            summary = self.create_summary(previous_summary, turns)
+            if not summary:
+                return False
+
+            embedding = self.openai_client.create_embeddings(summary)
+            if embedding is None:
+                return False
+
+            compacted_ids = [turn.id for turn in turns]
+            if previous_summary:
+                compacted_ids.append(previous_summary.id)
+            self.memory_manager.add_summary(
+                response=summary,
+                response_embedding=embedding,
+                response_tokens=self.openai_client.calculate_token_count(summary),
+                compacted_ids=compacted_ids,
+            )
+            logging.info(f"ROBOT THOUGHT: Compacted {len(turns)} older conversation parts into my long-term summary.")
+            return True
+
+    def create_summary(self, previous_summary, turns):
+        """
+        Asks the model for an updated summary.
+
+        Args:
+            previous_summary (Conversation): The current summary row, or None.
+            turns (list): The turns to fold into the summary, oldest first.
+
+        Returns:
+            str: The new summary text, or None if the request failed.
+        """
+        transcript = "\n".join(
+            f"{'User' if turn.speaker_type == CONVERSATIONS_CONFIG.get('user') else 'Assistant'}: {turn.response}"
+            for turn in turns
+        )
+        messages = [
+            {"role": "system", "content": self.SUMMARY_INSTRUCTIONS.format(max_words=self.max_summary_words)},
+            {"role": "user", "content": f"Running summary:\n{previous_summary.response if previous_summary else '(none)'}\n\n"
+                                        f"New conversation turns:\n{transcript}"},
+        ]
+        response = self.openai_client.create_completion(messages, False)
+        if not response or not response.choices:
+            return None
+        return response.choices[0].message.content.strip()
@@ -1,31 +1,28 @@
 from celery import shared_task
-from database.conversations import ConversationMemoryManager
-from database.system_state import SystemStateManager
-from integrations.openai.openai import OpenAIClient
+from background.memory.write_behind import get_write_buffer
+from background.memory.summarizer import ConversationSummarizer
+from background.task_backend import is_superseded
+from config import OPENAI_SETTINGS
+from database.backends import get_embedding_cache_store, is_partitioning_enabled
+from database.partitions import ConversationPartitionManager
 from datetime import datetime
+import logging
 
 @shared_task
 def store_conversation_task(speaker_type, response):
     """
     A Celery task for storing conversation parts in the database.
 
-    This asynchronous task takes a speaker type and a response, and stores them in the database
-    using the ConversationMemoryManager. It is designed to offload the database writing process
-    from the main execution thread, improving performance and responsiveness.
+    This asynchronous task takes a speaker type and a response, and queues them in the worker's
+    write-behind buffer. The buffer embeds pending parts with one batched request and writes them
+    with a single multi-row insert, offloading the database writing process from the main
+    execution thread and avoiding one round trip per utterance.
 
     Args:
         speaker_type (str): The type of speaker (e.g., 'user' or 'assistant'), indicating who is speaking.
         response (str): The text of the response or conversation part to be stored.
     """
-    openai_client = OpenAIClient()
-    # Generate embeddings
-    response_embedding = openai_client.create_embeddings(response)
-    # Calculate token counts
-    response_tokens = openai_client.calculate_token_count(response)
-    # Initialize the conversation memory manager
-    manager = ConversationMemoryManager()
-    # Add the conversation part to the database
-    manager.add_conversation(speaker_type=speaker_type, response=response, response_embedding=response_embedding, response_tokens=response_tokens)
+    get_write_buffer().add_conversation(speaker_type=speaker_type, response=response)
 
 @shared_task
 def update_system_state_task(last_wake_time):
@@ -33,10 +30,47 @@ def update_system_state_task(last_wake_time):
     A Celery task for updating the system state in the database.
 
     This asynchronous task updates the system state, such as the last wake time of the system.
-    It offloads the database update process from the main execution thread.
+    Updates are coalesced in the worker's write-behind buffer, so a burst of wake events results
+    in a single write of the latest value.
     """
-    # Initialize the system state manager
-    state_manager = SystemStateManager()
+    get_write_buffer().update_system_state(last_wake_time=last_wake_time)
 
-    # Update the last wake time in the database
-    state_manager.update_system_state(last_wake_time=last_wake_time)
\ No newline at end of file
+@shared_task
+def summarize_conversations_task(coalesce_token=None):
+    """
+    A Celery task for compacting older conversation turns into the rolling summary.
+
+    The task is queued each time another summary_trigger_tokens of conversation have been
+    written. It only calls the model when enough turns have aged out of the recent window.
+    A run compacts every turn waiting at that time, so invocations superseded by a newer one
+    while queued are skipped.
+    """
+    if is_superseded('background.memory.tasks.summarize_conversations_task', coalesce_token):
+        return
+    ConversationSummarizer().summarize()
+
+@shared_task
+def maintain_partitions_task():
+    """
+    A Celery task for maintaining the partitions of the conversations table.
+
+    Scheduled periodically through Celery beat when DATABASE_CONFIG['partition_conversations'] is
+    enabled. It creates the partitions for the coming months and detaches, archives or drops the
+    partitions that fall outside the retention period.
+    """
+    if is_partitioning_enabled():
+        ConversationPartitionManager().maintain()
+
+@shared_task
+def prune_embedding_cache_task():
+    """
+    A Celery task for deleting old entries from the persistent embedding cache.
+
+    Scheduled periodically through Celery beat while OPENAI_SETTINGS['embedding_cache_retention_days']
+    is set, so the embedding_cache table does not grow forever.
+    """
+    retention_days = OPENAI_SETTINGS.get('embedding_cache_retention_days')
+    if not retention_days:
+        return
+    deleted = get_embedding_cache_store().prune(retention_days)
+    logging.info(f"Pruned {deleted} embeddings cached more than {retention_days} days ago")
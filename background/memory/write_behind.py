@@ -0,0 +1,316 @@
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from celery.signals import worker_process_shutdown, worker_shutdown
+from background.memory.deduplicator import ConversationDeduplicator
+from background.task_backend import send_task
+from config import CONVERSATIONS_CONFIG
+from background.worker_resources import get_worker_resources
+
+class MemoryWriteBuffer:
+    """
+    A write-behind buffer for conversation and system state persistence in the background worker
+    (the Celery worker, or the Osiris process itself with the local task backend).
+
+    Conversation parts are accumulated in memory and flushed together: one batched embeddings
+    request for every pending part, followed by a single multi-row INSERT. System state updates
+    are coalesced so only the latest value of each field is written per flush. A flush happens
+    when the number of pending rows reaches max_rows, when flush_interval seconds have passed,
+    or when the worker shuts down.
+
+    A failed write is retried with exponential backoff. Parts from a failed batch are retried one
+    at a time, so a single bad part (one the database or the embeddings API rejects) cannot hold
+    back the others. A part that still fails after max_attempts is written to the dead-letter file
+    and dropped. The buffer holds at most max_pending parts; beyond that, the oldest parts are
+    dead-lettered, so a database outage cannot grow memory without bound.
+
+    Durability: store_conversation_task returns, and Celery acknowledges its message, as soon as
+    the part is buffered. Parts still in the buffer when a worker process crashes (as opposed to
+    shutting down, which flushes) are lost, at most flush_interval seconds or max_rows parts worth
+    in normal operation. This is the price of batching writes off the conversation path.
+
+    Attributes:
+        max_rows (int): Number of pending conversation parts that triggers an immediate flush.
+        flush_interval (float): Maximum number of seconds a part waits in the buffer.
+        max_pending (int): Maximum number of conversation parts held while writes are failing.
+        max_attempts (int): Number of failed writes after which a part is dead-lettered.
+        retry_backoff (float): Seconds to wait after the first failed flush; doubles with each consecutive failure.
+        max_retry_backoff (float): Maximum seconds to wait between failed flushes.
+        dead_letter_path (str): JSON lines file receiving the parts that could not be written, or None to only log them.
+        pending_conversations (list): Conversation parts waiting to be written.
+        pending_state (dict): Latest system state values waiting to be written.
+    """
+
+    def __init__(self, max_rows=None, flush_interval=None, max_pending=None, max_attempts=None):
+        """
+        Initializes the buffer and starts its background flush thread.
+
+        Args:
+            max_rows (int, optional): Overrides CONVERSATIONS_CONFIG['write_behind_max_rows'].
+            flush_interval (float, optional): Overrides CONVERSATIONS_CONFIG['write_behind_flush_interval'].
+            max_pending (int, optional): Overrides CONVERSATIONS_CONFIG['write_behind_max_pending'].
+            max_attempts (int, optional): Overrides CONVERSATIONS_CONFIG['write_behind_max_attempts'].
+        """
+        self.max_rows = max_rows or CONVERSATIONS_CONFIG.get('write_behind_max_rows', 20)
+        self.flush_interval = flush_interval or CONVERSATIONS_CONFIG.get('write_behind_flush_interval', 1.0)
+        self.max_pending = max_pending or CONVERSATIONS_CONFIG.get('write_behind_max_pending', 1000)
+        self.max_attempts = max_attempts or CONVERSATIONS_CONFIG.get('write_behind_max_attempts', 5)
+        self.retry_backoff = CONVERSATIONS_CONFIG.get('write_behind_retry_backoff', 1.0)
+        self.max_retry_backoff = CONVERSATIONS_CONFIG.get('write_behind_max_retry_backoff', 60.0)
+        self.dead_letter_path = CONVERSATIONS_CONFIG.get('write_behind_dead_letter_path', 'data/dead_letter_conversations.jsonl')
+        self.failures = 0
+        self.retry_at = 0
+        # Tokens written since the last summarization was requested
+        self.summary_trigger_tokens = CONVERSATIONS_CONFIG.get('summary_trigger_tokens', 1500)
+        self.unsummarized_tokens = 0
+        self.pending_conversations = []
+        self.pending_state = {}
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.flush_requested = threading.Event()
+        self.shutdown_event = threading.Event()
+        resources = get_worker_resources()
+        self.openai_client = resources.openai_client
+        self.conversation_manager = resources.conversation_manager
+        self.state_manager = resources.state_manager
+        self.deduplicator = None
+        if CONVERSATIONS_CONFIG.get('deduplicate_conversations', True):
+            self.deduplicator = ConversationDeduplicator(self.conversation_manager)
+
+        self.flush_thread = threading.Thread(target=self.run, daemon=True)
+        self.flush_thread.start()
+
+    def add_conversation(self, speaker_type, response):
+        """
+        Queues a conversation part for the next flush.
+
+        The creation time is captured now, so rows keep the order in which they were spoken
+        even though they are written later.
+
+        Args:
+            speaker_type (int): The type of speaker (user or assistant).
+            response (str): The text of the conversation part.
+        """
+        with self.lock:
+            self.pending_conversations.append({
+                "speaker_type": speaker_type,
+                "response": response,
+                "created_at": datetime.now(timezone.utc),
+                "attempts": 0,
+            })
+            overflow = self.pending_conversations[:-self.max_pending]
+            del self.pending_conversations[:-self.max_pending]
+            if len(self.pending_conversations) >= self.max_rows:
+                self.flush_requested.set()
+        if overflow:
+            self.dead_letter(overflow, f"the write-behind buffer is full ({self.max_pending} parts)")
+
+    def update_system_state(self, **updates):
+        """
+        Queues system state updates for the next flush, replacing any older pending values.
+
+        Args:
+            **updates: The system state fields to update and their new values.
+        """
+        with self.lock:
+            self.pending_state.update(updates)
+
+    def run(self):
+        """
+        Flushes the buffer every flush_interval seconds, or sooner when a size flush is requested.
+        """
+        while not self.shutdown_event.is_set():
+            self.flush_requested.wait(timeout=self.flush_interval)
+            self.flush_requested.clear()
+            self.flush()
+
+    def flush(self, force=False):
+        """
+        Writes all pending conversation parts and system state updates to the database.
+
+        New parts are written as one batch; parts from a failed batch are retried one at a time.
+        Parts that fail are put back at the front of the buffer, until they have failed
+        max_attempts times and are dead-lettered. After a failure, flushes are skipped until the
+        backoff has passed.
+
+        Args:
+            force (bool, optional): Flush even while backing off, e.g. on shutdown.
+        """
+        with self.flush_lock:
+            if not force and time.monotonic() < self.retry_at:
+                return
+            with self.lock:
+                conversations, self.pending_conversations = self.pending_conversations, []
+                state, self.pending_state = self.pending_state, {}
+
+            fresh = [row for row in conversations if row["attempts"] == 0]
+            batches = ([fresh] if fresh else []) + [[row] for row in conversations if row["attempts"] > 0]
+            failed = []
+            written_tokens = 0
+            for batch in batches:
+                try:
+                    written_tokens += self.write_conversations(batch)
+                except Exception as e:
+                    logging.error(f"Error flushing {len(batch)} conversation parts: {e}")
+                    for row in batch:
+                        row["attempts"] += 1
+                    failed.extend(batch)
+            retry = [row for row in failed if row["attempts"] < self.max_attempts]
+            if len(retry) < len(failed):
+                self.dead_letter([row for row in failed if row["attempts"] >= self.max_attempts],
+                                 f"the write failed {self.max_attempts} times")
+            if retry:
+                with self.lock:
+                    self.pending_conversations[:0] = retry
+            if written_tokens:
+                self.request_summary(written_tokens)
+
+            state_failed = False
+            if state:
+                try:
+                    self.state_manager.update_system_state(**state)
+                except Exception as e:
+                    logging.error(f"Error flushing system state, will retry: {e}")
+                    state_failed = True
+                    with self.lock:
+                        self.pending_state = {**state, **self.pending_state}
+
+            if failed or state_failed:
+                self.failures += 1
+                backoff = min(self.retry_backoff * 2 ** (self.failures - 1), self.max_retry_backoff)
+                self.retry_at = time.monotonic() + backoff
+                logging.warning(f"Retrying the failed writes in {backoff:g} seconds")
+            else:
+                self.failures = 0
+
+    def dead_letter(self, conversations, reason):
+        """
+        Gives up on conversation parts: logs them and appends them to the dead-letter file, so they can be recovered by hand.
+
+        Args:
+            conversations (list[dict]): The pending conversation parts.
+            reason (str): Why the parts could not be written.
+        """
+        logging.error(f"Dropping {len(conversations)} conversation parts because {reason}")
+        if not self.dead_letter_path:
+            for row in conversations:
+                logging.error(f"Dropped conversation part: {row['response']}")
+            return
+        try:
+            os.makedirs(os.path.dirname(self.dead_letter_path) or '.', exist_ok=True)
+            with open(self.dead_letter_path, 'a') as dead_letter_file:
+                for row in conversations:
+                    dead_letter_file.write(json.dumps({**row, "created_at": row["created_at"].isoformat(), "reason": reason}) + "\n")
+        except OSError as e:
+            logging.error(f"Could not write to the dead-letter file {self.dead_letter_path}: {e}")
+
+    def write_conversations(self, conversations):
+        """
+        Embeds and inserts a batch of conversation parts, leaving out repeated and near-duplicate parts.
+
+        Args:
+            conversations (list[dict]): The pending conversation parts.
+
+        Returns:
+            int: The number of tokens written.
+
+        Raises:
+            RuntimeError: If the embeddings could not be created.
+        """
+        if self.deduplicator:
+            conversations = self.deduplicator.filter_exact(conversations)
+            if not conversations:
+                return 0
+
+        embeddings = self.openai_client.create_embeddings_batch([row["response"] for row in conversations])
+        if embeddings is None:
+            raise RuntimeError("embeddings could not be created")
+
+        if self.deduplicator:
+            conversations, embeddings = self.deduplicator.filter_similar(conversations, embeddings)
+            if not conversations:
+                return 0
+
+        rows = []
+        for row, embedding in zip(conversations, embeddings):
+            rows.append({
+                "speaker_type": row["speaker_type"],
+                "response": row["response"],
+                "created_at": row["created_at"],
+                "response_embedding": embedding,
+                "response_tokens": self.openai_client.calculate_token_count(row["response"]),
+            })
+        self.conversation_manager.add_conversations(rows)
+        logging.debug(f"Flushed {len(rows)} conversation parts to memory")
+        if self.deduplicator:
+            self.deduplicator.remember(conversations, embeddings)
+        return sum(row["response_tokens"] for row in rows)
+
+    def request_summary(self, written_tokens):
+        """
+        Queues the summarization task once another summary_trigger_tokens of conversation have
+        been written. Called after the write has succeeded, so a failure to queue the task is
+        only logged and never makes written parts be retried.
+
+        Args:
+            written_tokens (int): The number of tokens just written.
+        """
+        if not CONVERSATIONS_CONFIG.get('summarize_conversations', True):
+            return
+        self.unsummarized_tokens += written_tokens
+        # No follow-up task is sent by the final flush; the task backend no longer accepts work at shutdown.
+        if self.unsummarized_tokens < self.summary_trigger_tokens or self.shutdown_event.is_set():
+            return
+        try:
+            send_task('background.memory.tasks.summarize_conversations_task')
+        except Exception as e:
+            logging.error(f"Could not queue the conversation summary, will try again after the next write: {e}")
+            return
+        self.unsummarized_tokens = 0
+
+    def shutdown(self):
+        """
+        Stops the flush thread and writes anything still pending. Parts that cannot be written are dead-lettered.
+        """
+        self.shutdown_event.set()
+        self.flush_requested.set()
+        self.flush(force=True)
+        with self.lock:
+            remaining, self.pending_conversations = self.pending_conversations, []
+        if remaining:
+            self.dead_letter(remaining, "they could not be written before shutdown")
+
+_write_buffer = None
+_write_buffer_pid = None
+_write_buffer_lock = threading.Lock()
+
+def get_write_buffer():
+    """
+    Returns the write-behind buffer for the current process, creating it on first use.
+
+    Each worker process owns its own buffer and flush thread; a buffer inherited through a
+    fork is never reused.
+
+    Returns:
+        MemoryWriteBuffer: The buffer for the current process.
+    """
+    global _write_buffer, _write_buffer_pid
+    with _write_buffer_lock:
+        if _write_buffer is None or _write_buffer_pid != os.getpid():
+            _write_buffer = MemoryWriteBuffer()
+            _write_buffer_pid = os.getpid()
+            atexit.register(_write_buffer.shutdown)
+        return _write_buffer
+
+@worker_process_shutdown.connect
+@worker_shutdown.connect
+def flush_write_buffer(**kwargs):
+    """
+    Flushes the current process's buffer when the Celery worker (or one of its pool processes) stops.
+    """
+    if _write_buffer is not None and _write_buffer_pid == os.getpid():
+        _write_buffer.shutdown()
@@ -0,0 +1,102 @@
+import threading
+import uuid
+from config import CELERY_CONFIG
+
+# Background task queues, most urgent first. Workers consume them in this order, so a burst of
+# state updates or a long summarization never delays conversation persistence. Tasks without a
+# route go to Celery's default 'celery' queue, consumed last.
+TASK_QUEUES = ('memory', 'state', 'maintenance')
+
+# Queue of each background task.
+TASK_ROUTES = {
+    'background.memory.tasks.store_conversation_task': {'queue': 'memory'},
+    'background.memory.tasks.update_system_state_task': {'queue': 'state'},
+    'background.memory.tasks.summarize_conversations_task': {'queue': 'maintenance'},
+    'background.memory.tasks.maintain_partitions_task': {'queue': 'maintenance'},
+    'background.memory.tasks.prune_embedding_cache_task': {'queue': 'maintenance'},
+}
+
+# Tasks where only the most recently sent invocation matters. Older invocations still waiting
+# in a queue are skipped when they run (see TaskCoalescer). A summarization run compacts every
+# waiting turn, so summaries queued behind a slow one have nothing left to do.
+COALESCED_TASKS = ('background.memory.tasks.summarize_conversations_task',)
+
+DEFAULT_QUEUE = 'celery'
+
+_broker_redis = None
+_broker_redis_lock = threading.Lock()
+
+def get_broker_redis():
+    """
+    Returns a Redis client for the Celery broker, or None if the broker is not Redis.
+    """
+    global _broker_redis
+    broker_url = CELERY_CONFIG.get('BROKER_URL', '')
+    if not broker_url.startswith(('redis://', 'rediss://')):
+        return None
+    with _broker_redis_lock:
+        if _broker_redis is None:
+            import redis
+            _broker_redis = redis.Redis.from_url(broker_url)
+        return _broker_redis
+
+def get_task_queue(name):
+    """
+    Returns the queue a task is routed to.
+    """
+    return TASK_ROUTES.get(name, {}).get('queue', DEFAULT_QUEUE)
+
+def get_queue_priority(queue_name):
+    """
+    Returns the position of a queue in consumption order; lower runs first.
+    """
+    return TASK_QUEUES.index(queue_name) if queue_name in TASK_QUEUES else len(TASK_QUEUES)
+
+class TaskCoalescer:
+    """
+    Tracks the latest invocation of each coalesced task, so superseded invocations can be skipped.
+
+    Sending a coalesced task records a new token for it; the task receives the token and runs only
+    if it is still the latest. With the Celery backend the tokens live in Redis (the broker), so
+    every worker process sees the same latest token; otherwise they are kept in memory.
+
+    Attributes:
+        redis: Redis client for the broker, or None to keep tokens in memory.
+        token_ttl (int): Seconds a token is kept in Redis.
+    """
+
+    KEY_PREFIX = 'osiris:coalesce:'
+
+    def __init__(self, redis_client=None):
+        """
+        Initializes the coalescer.
+
+        Args:
+            redis_client (redis.Redis, optional): Keep tokens in this Redis instance instead of in memory.
+        """
+        self.redis = redis_client
+        self.token_ttl = CELERY_CONFIG.get('COALESCE_TOKEN_TTL', 3600)
+        self.tokens = {}
+        self.lock = threading.Lock()
+
+    def new_token(self, name):
+        """
+        Records and returns a new latest token for a task.
+        """
+        token = uuid.uuid4().hex
+        if self.redis is not None:
+            self.redis.set(self.KEY_PREFIX + name, token, ex=self.token_ttl)
+        else:
+            with self.lock:
+                self.tokens[name] = token
+        return token
+
+    def is_superseded(self, name, token):
+        """
+        Returns True if a newer invocation of the task has been sent since the one holding token.
+        """
+        if self.redis is not None:
+            latest = self.redis.get(self.KEY_PREFIX + name)
+            return latest is not None and latest.decode() != token
+        with self.lock:
+            return self.tokens.get(name, token) != token
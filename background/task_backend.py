@@ -0,0 +1,264 @@
+import importlib
+import itertools
+import logging
+import queue
+import threading
+import time
+from collections import Counter
+from background.routing import (COALESCED_TASKS, TASK_QUEUES, DEFAULT_QUEUE, TaskCoalescer, get_broker_redis,
+                                get_queue_priority, get_task_queue)
+from celery_config import get_celery_app
+from config import CELERY_CONFIG
+
+# Background task backends selectable through CELERY_CONFIG['TASK_BACKEND'].
+#  - celery: tasks are sent through the broker to a Celery worker (default).
+#  - local: tasks run on a bounded thread pool inside the Osiris process. No broker or worker process
+#           is needed, which suits single-robot installs.
+TASK_BACKENDS = ('celery', 'local')
+
+def get_task_backend_name():
+    """
+    Returns the configured background task backend name.
+
+    Raises:
+        ValueError: If the backend is not one of TASK_BACKENDS.
+    """
+    backend = CELERY_CONFIG.get('TASK_BACKEND', 'celery')
+    if backend not in TASK_BACKENDS:
+        raise ValueError(f"Unknown task backend '{backend}', expected one of {TASK_BACKENDS}")
+    return backend
+
+class LocalTaskExecutor:
+    """
+    Runs background tasks on a pool of threads in the current process.
+
+    Tasks are referenced by the same dotted names used with Celery (e.g.
+    'background.memory.tasks.store_conversation_task') and run the same task functions. Queued
+    tasks run in the priority order of their routes (see background/routing.py), then in the order
+    they were submitted. The queue is bounded so a stalled database cannot grow memory without
+    limit; on shutdown, queued tasks are drained before the worker threads exit. Periodic tasks
+    from the Celery beat schedule are submitted by a scheduler thread.
+
+    Attributes:
+        workers (int): Number of worker threads.
+        queue_size (int): Maximum number of queued tasks.
+        submit_timeout (float): Seconds a blocking submit() waits for room in a full queue before dropping the task.
+    """
+
+    def __init__(self, workers=None, queue_size=None, submit_timeout=None):
+        """
+        Initializes the executor and starts its worker and scheduler threads.
+
+        Args:
+            workers (int, optional): Overrides CELERY_CONFIG['LOCAL_WORKERS'].
+            queue_size (int, optional): Overrides CELERY_CONFIG['LOCAL_QUEUE_SIZE'].
+            submit_timeout (float, optional): Overrides CELERY_CONFIG['LOCAL_SUBMIT_TIMEOUT'].
+        """
+        self.workers = workers or CELERY_CONFIG.get('LOCAL_WORKERS', 2)
+        self.queue_size = queue_size or CELERY_CONFIG.get('LOCAL_QUEUE_SIZE', 1000)
+        self.submit_timeout = submit_timeout or CELERY_CONFIG.get('LOCAL_SUBMIT_TIMEOUT', 1.0)
+        self.task_queue = queue.PriorityQueue(maxsize=self.queue_size)
+        self.sequence = itertools.count()
+        self.depths = Counter()
+        self.depth_lock = threading.Lock()
+        self.tasks = {}
+        self.accepting = True
+        self.shutdown_event = threading.Event()
+
+        self.threads = [threading.Thread(target=self.run_worker, daemon=True) for _ in range(self.workers)]
+        self.threads.append(threading.Thread(target=self.run_scheduler, daemon=True))
+        for thread in self.threads:
+            thread.start()
+
+    def resolve(self, name):
+        """
+        Returns the task function for a dotted task name, importing its module on first use.
+        """
+        task = self.tasks.get(name)
+        if task is None:
+            module_name, _, function_name = name.rpartition('.')
+            task = getattr(importlib.import_module(module_name), function_name)
+            self.tasks[name] = task
+        return task
+
+    def submit(self, name, args=None, kwargs=None, block=True):
+        """
+        Queues a task for execution.
+
+        Args:
+            name (str): The dotted name of the task.
+            args (list, optional): Positional arguments for the task.
+            kwargs (dict, optional): Keyword arguments for the task.
+            block (bool, optional): Wait up to submit_timeout for room in a full queue. Callers
+                                    on a latency-sensitive thread pass False to drop the task at once.
+
+        Returns:
+            bool: True if the task was queued, False if it was dropped.
+        """
+        if not self.accepting:
+            logging.warning(f"Task {name} submitted after shutdown, dropping it")
+            return False
+        queue_name = get_task_queue(name)
+        # Counted before the put, as a worker can take and finish the task before put returns
+        with self.depth_lock:
+            self.depths[queue_name] += 1
+        try:
+            self.task_queue.put((get_queue_priority(queue_name), next(self.sequence), (name, args or [], kwargs or {})),
+                                block=block, timeout=self.submit_timeout if block else None)
+        except queue.Full:
+            with self.depth_lock:
+                self.depths[queue_name] -= 1
+            logging.error(f"Background task queue is full, dropping {name}")
+            return False
+        return True
+
+    def get_queue_depths(self):
+        """
+        Returns the number of tasks waiting or running per queue.
+        """
+        with self.depth_lock:
+            return {queue_name: self.depths[queue_name] for queue_name in TASK_QUEUES + (DEFAULT_QUEUE,)}
+
+    def run_worker(self):
+        """
+        Runs queued tasks until a stop marker is received.
+        """
+        while True:
+            _, _, item = self.task_queue.get()
+            try:
+                if item is None:
+                    return
+                name, args, kwargs = item
+                self.resolve(name)(*args, **kwargs)
+            except Exception as e:
+                logging.error(f"Background task {item[0]} failed: {e}")
+            finally:
+                if item is not None:
+                    with self.depth_lock:
+                        self.depths[get_task_queue(item[0])] -= 1
+                self.task_queue.task_done()
+
+    def run_scheduler(self):
+        """
+        Submits the periodic tasks of the Celery beat schedule at their configured intervals.
+        """
+        schedule = get_celery_app().conf.beat_schedule or {}
+        next_runs = {key: time.monotonic() + entry['schedule'] for key, entry in schedule.items()}
+        while next_runs and not self.shutdown_event.is_set():
+            key = min(next_runs, key=next_runs.get)
+            if self.shutdown_event.wait(timeout=max(next_runs[key] - time.monotonic(), 0)):
+                return
+            self.submit(schedule[key]['task'])
+            next_runs[key] = time.monotonic() + schedule[key]['schedule']
+
+    def shutdown(self, timeout=None):
+        """
+        Stops accepting tasks, runs the ones already queued and stops the threads.
+
+        Args:
+            timeout (float, optional): Seconds to wait for queued tasks. Defaults to CELERY_CONFIG['SHUTDOWN_TIMEOUT'].
+        """
+        timeout = timeout if timeout is not None else CELERY_CONFIG.get('SHUTDOWN_TIMEOUT', 5)
+        self.accepting = False
+        self.shutdown_event.set()
+        deadline = time.monotonic() + timeout
+        # Stop markers sort after every task, so the queued tasks are drained first.
+        for _ in range(self.workers):
+            try:
+                self.task_queue.put((len(TASK_QUEUES) + 1, next(self.sequence), None), timeout=max(deadline - time.monotonic(), 0))
+            except queue.Full:
+                break
+        for thread in self.threads:
+            thread.join(timeout=max(deadline - time.monotonic(), 0))
+        remaining = self.task_queue.qsize()
+        if remaining:
+            logging.error(f"{remaining} background tasks were not run before shutdown")
+
+_local_executor = None
+_local_executor_lock = threading.Lock()
+
+def get_local_executor():
+    """
+    Returns the process-wide local task executor, creating it on first use.
+
+    Returns:
+        LocalTaskExecutor: The shared executor.
+    """
+    global _local_executor
+    with _local_executor_lock:
+        if _local_executor is None:
+            _local_executor = LocalTaskExecutor()
+        return _local_executor
+
+_task_coalescer = None
+_task_coalescer_lock = threading.Lock()
+
+def get_task_coalescer():
+    """
+    Returns the process-wide task coalescer, backed by the Redis broker with the Celery backend.
+
+    Returns:
+        TaskCoalescer: The shared coalescer.
+    """
+    global _task_coalescer
+    with _task_coalescer_lock:
+        if _task_coalescer is None:
+            redis_client = get_broker_redis() if get_task_backend_name() == 'celery' else None
+            _task_coalescer = TaskCoalescer(redis_client)
+        return _task_coalescer
+
+def send_task(name, args=None, kwargs=None, block=True):
+    """
+    Sends a background task to the configured task backend, on the queue of its route.
+
+    Coalesced tasks (see background/routing.py) receive a coalesce_token keyword argument; an
+    invocation whose token has been superseded by a newer one skips its work.
+
+    Args:
+        name (str): The dotted name of the task, e.g. 'background.memory.tasks.store_conversation_task'.
+        args (list, optional): Positional arguments for the task.
+        kwargs (dict, optional): Keyword arguments for the task.
+        block (bool, optional): With the local backend, wait for room in a full queue; if False,
+                                the task is dropped (and logged) at once instead.
+    """
+    if name in COALESCED_TASKS:
+        kwargs = {**(kwargs or {}), 'coalesce_token': get_task_coalescer().new_token(name)}
+
+    if get_task_backend_name() == 'local':
+        get_local_executor().submit(name, args, kwargs, block=block)
+    else:
+        get_celery_app().send_task(name, args=args, kwargs=kwargs, queue=get_task_queue(name))
+
+def is_superseded(name, coalesce_token):
+    """
+    Returns True if a newer invocation of a coalesced task has been sent since the one holding coalesce_token.
+    """
+    return coalesce_token is not None and get_task_coalescer().is_superseded(name, coalesce_token)
+
+def get_queue_depths():
+    """
+    Returns the number of pending tasks per queue, for monitoring.
+
+    With the local backend, running tasks are included. With the Celery backend the depths are
+    read from the Redis broker (tasks already reserved by a worker are not included), and are
+    None if the broker is not Redis.
+
+    Returns:
+        dict: A mapping of queue name to depth.
+    """
+    queue_names = TASK_QUEUES + (DEFAULT_QUEUE,)
+    if get_task_backend_name() == 'local':
+        return get_local_executor().get_queue_depths()
+    redis_client = get_broker_redis()
+    if redis_client is None:
+        return {queue_name: None for queue_name in queue_names}
+    return {queue_name: redis_client.llen(queue_name) for queue_name in queue_names}
+
+def shutdown_task_backend():
+    """
+    Drains the local executor, if one was started, and flushes this process's write-behind buffer.
+    """
+    if _local_executor is not None:
+        _local_executor.shutdown()
+        from background.memory.write_behind import flush_write_buffer
+        flush_write_buffer()
@@ -0,0 +1,62 @@
+import logging
+import os
+import threading
+from database.backends import get_backend_name, get_conversation_memory_manager, get_system_state_manager
+from integrations.openai.openai import OpenAIClient
+
+class WorkerResources:
+    """
+    The long-lived resources shared by every background task in a worker process.
+
+    Building an OpenAI client, resolving the tiktoken encoding and opening database connections
+    costs far more than the work most tasks do. They are created once per worker process, warmed
+    when the process starts, and reused by every task it runs.
+
+    Attributes:
+        openai_client (OpenAIClient): Client for embeddings, completions and token counting.
+        conversation_manager: Conversation memory manager for the configured backend.
+        state_manager: System state manager for the configured backend.
+    """
+
+    def __init__(self):
+        """
+        Creates the shared clients and managers.
+        """
+        self.openai_client = OpenAIClient()
+        self.conversation_manager = get_conversation_memory_manager()
+        self.state_manager = get_system_state_manager()
+
+    def warm(self):
+        """
+        Loads the token encoding and opens a pooled database connection, so the first task
+        does not pay for them.
+        """
+        try:
+            self.openai_client.calculate_token_count("warm up")
+            if get_backend_name() == 'postgres':
+                from sqlalchemy import text
+                from database.connection import get_engine
+                with get_engine().connect() as connection:
+                    connection.execute(text("SELECT 1"))
+        except Exception as e:
+            logging.warning(f"Could not warm the background worker resources: {e}")
+
+_worker_resources = None
+_worker_resources_pid = None
+_worker_resources_lock = threading.Lock()
+
+def get_worker_resources():
+    """
+    Returns the resources of the current worker process, creating them on first use.
+
+    Resources inherited through a fork are never reused.
+
+    Returns:
+        WorkerResources: The resources for the current process.
+    """
+    global _worker_resources, _worker_resources_pid
+    with _worker_resources_lock:
+        if _worker_resources is None or _worker_resources_pid != os.getpid():
+            _worker_resources = WorkerResources()
+            _worker_resources_pid = os.getpid()
+        return _worker_resources
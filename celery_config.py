@@ -1,8 +1,46 @@
 from celery import Celery
-from config import CELERY_CONFIG
+from celery.signals import worker_process_init
+from background.routing import TASK_ROUTES
+from config import CELERY_CONFIG, DATABASE_CONFIG, OPENAI_SETTINGS
+from database.backends import is_partitioning_enabled, reset_database_connections
 
 celery_app = Celery(CELERY_CONFIG['APPLICATION_NAME'], broker=CELERY_CONFIG['BROKER_URL'])
-celery_app.conf.update(CELERY_CONFIG)
+celery_config = dict(CELERY_CONFIG)
+
+# Route each task to its queue (see background/routing.py). With Redis, the 'priority' queue order
+# strategy makes workers always take from the first non-empty queue in the order given to -Q.
+celery_config['CELERY_ROUTES'] = TASK_ROUTES
+celery_config['BROKER_TRANSPORT_OPTIONS'] = {'queue_order_strategy': 'priority', **CELERY_CONFIG.get('BROKER_TRANSPORT_OPTIONS', {})}
+
+# Periodic tasks, run by a worker started with the -B (embedded beat) option. CELERY_CONFIG uses
+# Celery's uppercase setting names, which cannot be mixed with the lowercase ones.
+beat_schedule = {}
+if is_partitioning_enabled():
+    beat_schedule['maintain-conversation-partitions'] = {
+        'task': 'background.memory.tasks.maintain_partitions_task',
+        'schedule': DATABASE_CONFIG.get('partition_maintenance_interval', 3600),
+    }
+if OPENAI_SETTINGS.get('embedding_cache', True) and OPENAI_SETTINGS.get('embedding_cache_persistent', True) \
+        and OPENAI_SETTINGS.get('embedding_cache_retention_days'):
+    beat_schedule['prune-embedding-cache'] = {
+        'task': 'background.memory.tasks.prune_embedding_cache_task',
+        'schedule': OPENAI_SETTINGS.get('embedding_cache_prune_interval', 86400),
+    }
+if beat_schedule:
+    celery_config['CELERYBEAT_SCHEDULE'] = beat_schedule
+
+celery_app.conf.update(celery_config)
+
+@worker_process_init.connect
+def reset_worker_database_connections(**kwargs):
+    """
+    Drops any database connections inherited from the parent when a prefork worker process starts,
+    so each worker process opens and reuses its own connections, then warms the process's shared
+    task resources (clients, token encoding, database pool) before the first task arrives.
+    """
+    reset_database_connections()
+    from background.worker_resources import get_worker_resources
+    get_worker_resources().warm()
 
 def get_celery_app():
     return celery_app
@@ -67,17 +67,82 @@ VIDEO_SETTINGS = {
     "CAPTURE_VIDEO": True,
 
     # This determines the frame rate of the video capture. This is the number of frames captured per second.
+    # The camera picks its nearest supported mode; the negotiated frame rate is logged at startup.
     "FRAME_RATE": 30,
 
+    # The capture resolution requested from the camera, in pixels. Set both to None to keep the camera's default.
+    # Lower resolutions reduce the CPU and USB bandwidth used by capture. The negotiated resolution is logged at startup.
+    "FRAME_WIDTH": 640,
+    "FRAME_HEIGHT": 480,
+
     # This uses the cv2.VideoCapture method which takes the device as an argument. Typically, 0 is the primary camera. 
     # This can also accept a file path to the video stream, or a stream URL like http://192.168.86.41:9000/mjpg for instance.
     "VIDEO_DEVICE": 0,
 
+    # To capture from several cameras, list them here. Each camera needs a "name", which the vision tool uses to pick a camera,
+    # and a "VIDEO_DEVICE". A camera can override any other setting in VIDEO_SETTINGS for itself, such as FRAME_RATE,
+    # FRAME_WIDTH/FRAME_HEIGHT, CAPTURE_INTERVAL, FRAME_BUFFER_SIZE, SHOW_VIDEO, POSE_ESTIMATION or the SCENE_CHANGE_ settings.
+    # Each camera is captured in its own thread, into its own frame buffer, and archives its frames in a subdirectory of
+    # FRAME_ARCHIVE_PATH named after it. The first camera is the main camera, used when no camera is asked for.
+    # Leave empty to capture from VIDEO_DEVICE only. For example:
+    #   [{"name": "front", "VIDEO_DEVICE": 0}, {"name": "rear", "VIDEO_DEVICE": 2, "FRAME_RATE": 15, "SHOW_VIDEO": False}]
+    "VIDEO_DEVICES": [],
+
+    # The most frames decoded per second across all cameras, for display and pose estimation, shared evenly between the
+    # cameras so adding a camera does not add CPU load. Interval frames for the frame buffer are always decoded. None for no limit.
+    "MAX_DECODED_FRAMES_PER_SECOND": 30,
+
+    # How much capture threads lower their scheduling priority (Linux niceness), so audio processing is scheduled first
+    # when the CPU is busy. 0 keeps the normal priority.
+    "CAPTURE_NICENESS": 5,
+
     # If you would like to see the video in your GUI as it is streamed, set this to True. Otherwise, to run video processing in the background, set this to False.
     "SHOW_VIDEO": True,
 
-    # This deterines how often a frame is saved to tmp/video, in seconds. These images are used ad-hoc for analysis.
+    # How many frames per second are decoded and shown in the GUI when SHOW_VIDEO is True.
+    "DISPLAY_FRAME_RATE": 15,
+
+    # Whether MediaPipe pose estimation runs on the captured frames. It runs in a separate process at its own rate, taking the
+    # latest frame whenever it is free; frames captured while it is busy are skipped.
+    "POSE_ESTIMATION": False,
+
+    # This determines how often a frame is stored in the in-memory frame buffer, in seconds. These frames are used ad-hoc for analysis.
     "CAPTURE_INTERVAL": 1,
+
+    # The number of most recent frames kept in the in-memory frame buffer. Older frames are overwritten, so the buffer
+    # holds at least FRAME_BUFFER_SIZE * CAPTURE_INTERVAL seconds of video and its memory use stays fixed.
+    "FRAME_BUFFER_SIZE": 30,
+
+    # If True, an interval frame is only kept in the frame buffer's history (and the frame archive) when the scene has changed
+    # since the last kept frame. The latest interval frame is always available to vision analysis. Frames are compared as
+    # small grayscale thumbnails, which is cheap.
+    "SCENE_CHANGE_DETECTION": True,
+
+    # The fraction of thumbnail pixels (0 to 1) that must change for the scene to count as changed.
+    "SCENE_CHANGE_THRESHOLD": 0.05,
+
+    # The brightness difference (0 to 255) at which a thumbnail pixel counts as changed. Raise it if sensor noise or
+    # flickering light keeps triggering changes.
+    "SCENE_CHANGE_PIXEL_THRESHOLD": 25,
+
+    # If True, every frame added to the frame buffer is also archived on disk, for reviewing what the robot saw earlier
+    # (see scripts/export_frames.py). Frames are appended as JPEGs to one segment file per FRAME_ARCHIVE_SEGMENT_SECONDS, with
+    # a small timestamp index next to it. The archive is kept across restarts.
+    "FRAME_ARCHIVE": False,
+
+    # The directory holding the frame archive.
+    "FRAME_ARCHIVE_PATH": "data/frame_archive",
+
+    # Seconds of frames per segment file.
+    "FRAME_ARCHIVE_SEGMENT_SECONDS": 60,
+
+    # Segments are deleted once older than FRAME_ARCHIVE_MAX_AGE seconds, and oldest first while the archive is larger than
+    # FRAME_ARCHIVE_MAX_BYTES. Set either to None to disable that limit.
+    "FRAME_ARCHIVE_MAX_AGE": 7 * 24 * 3600,
+    "FRAME_ARCHIVE_MAX_BYTES": 2 * 1024 ** 3,
+
+    # JPEG quality (0-100) of archived frames.
+    "FRAME_ARCHIVE_JPEG_QUALITY": 85,
 }
 
 # VISION_ANALYSIS_SETTINGS configures the vision analysis service adapter. Only applicable if VIDEO_SETTINGS["CAPTURE_VIDEO"] is true.  Otherwise, no vision analysis will be performed.
@@ -91,7 +156,53 @@ VIDEO_SETTINGS = {
 #
 # Additional adapters can be defined in video/analysis_adapters if needed
 VISION_ANALYSIS_SETTINGS = {
-    "adapter": "video.analysis_adapters.google_vertex_ai.vertex_ai.VertexAIClient"
+    "adapter": "video.analysis_adapters.google_vertex_ai.vertex_ai.VertexAIClient",
+
+    # Cache analysis results, so asking the same question about an unchanged scene is answered instantly without a vision API
+    # request. Frames are matched by perceptual hash and small thumbnails, and questions after normalizing case, punctuation and
+    # whitespace.
+    "cache": True,
+
+    # Seconds a cached result is reused.
+    "cache_ttl": 60,
+
+    # How many of the 64 perceptual hash bits may differ between two frames of the same scene. Raise it if camera noise
+    # prevents hits on a static scene.
+    "cache_max_distance": 6,
+
+    # The fraction of thumbnail pixels (0 to 1) that may change, by more than cache_pixel_threshold (0 to 255) in any color,
+    # between two frames of the same scene. This catches small changes the hash misses, like an object held up to the camera.
+    # Raise it if camera noise prevents hits on a static scene.
+    "cache_max_change": 0.01,
+    "cache_pixel_threshold": 25,
+
+    # Maximum number of cached results.
+    "cache_size": 64,
+
+    # If True, the current frame is captured and prepared for upload as soon as a wake phrase is heard, and if the request
+    # contains one of the speculative_keywords, a generic scene description (speculative_prompt) is requested before the
+    # language model has even chosen the vision tool. The vision tool then answers from that description. COST CONSIDERATION:
+    # a vision request is made for every request containing a keyword, whether or not the vision tool is used.
+    "speculative": False,
+
+    # Words and phrases that make a request look visual. Avoid bare verbs like "see", "show" or "read", which are as common
+    # in requests that are not visual ("see you later", "show me the weather") and would each cost a vision request.
+    "speculative_keywords": ["can you see", "do you see", "what you see", "see this", "look at", "looking at", "read this",
+                             "read that", "show you", "color", "colour", "holding", "wearing", "camera", "picture",
+                             "front of you", "what is this", "what's this"],
+
+    # The query used for the speculative scene description. It should ask for enough detail to answer follow-up questions.
+    "speculative_prompt": "Describe this scene in detail: the people, objects, any visible text, colors and where things are. "
+                          "Mention what anyone near the camera is holding, pointing at or showing.",
+
+    # Seconds after the wake phrase during which the vision tool uses the speculatively captured frame. A speculation is
+    # only used for the request it was captured during, and discarded once that request has been handled.
+    "speculative_max_age": 30,
+
+    # If True, the vision model's answer is streamed straight to text-to-speech as it is generated, instead of being returned
+    # to the language model and rephrased in another completion. The first words are spoken seconds sooner, in the vision
+    # model's own wording. Speculative scene descriptions are not requested in this mode.
+    "stream_to_speech": False,
 }
 
 # GOOGLE_VISION_ANALYSIS_ADAPTER_SETTINGS are required when the VISION_ANALYSIS_SETTINGS adapter
@@ -111,7 +222,17 @@ GOOGLE_VISION_ANALYSIS_ADAPTER_SETTINGS = {
 
     # 'location': The Google Cloud region where your Vertex AI service is located.
     # Example: "us-west4" for a specific location within the United States.
-    "location": "us-west4"
+    "location": "us-west4",
+
+    # Images are downscaled so their longest edge is at most 'max_image_edge' pixels (None keeps the full resolution) and
+    # re-encoded as JPEG at 'jpeg_quality' (0-100) before upload. Smaller payloads upload much faster on robot Wi-Fi; see
+    # scripts/benchmark_vision_payload.py.
+    "max_image_edge": 1024,
+    "jpeg_quality": 85,
+
+    # Optionally crop images to a region of interest before upload, as (x, y, width, height) fractions of the frame,
+    # e.g. (0.25, 0.25, 0.5, 0.5) for the center of the view. None sends the whole frame.
+    "region_of_interest": None,
 }
 
 OPENAI_SETTINGS = {
@@ -124,9 +245,41 @@ OPENAI_SETTINGS = {
     # If the VISION_ANALYSIS_SETTINGS adapter is set to use OpenAI's vision capabilities, this setting will determine which openai vision model to use.
     "image_model": "gpt-4-1106-vision-preview", 
 
+    # Images sent to the image_model are downscaled so their longest edge is at most this many pixels (None keeps the full
+    # resolution), optionally cropped to a region of interest given as (x, y, width, height) fractions of the frame, and
+    # re-encoded as JPEG at this quality (0-100). Smaller payloads upload much faster on robot Wi-Fi.
+    "image_max_edge": 1024,
+    "image_region_of_interest": None,
+    "image_jpeg_quality": 85,
+
     # Model used for embedding text into a numerical format, useful in certain applications like semantic search.
     "embedding_model": "text-embedding-ada-002",
 
+    # Number of dimensions to request from the embedding model, or None for the model's default (1536 for text-embedding-ada-002).
+    # Only the text-embedding-3 models support shortened embeddings (e.g. 256 or 512), which shrink the conversations table, its
+    # indexes and similarity search I/O at a small cost in recall (see scripts/benchmark_embedding_recall.py). Changing this after
+    # conversations have been stored requires running scripts/reembed_conversations.py.
+    "embedding_dimensions": None,
+
+    # Cache embeddings by model and normalized text, so repeated utterances ("stop", "what do you see") are only embedded once. COST CONSIDERATION: disabling the cache sends every utterance to the embeddings API.
+    "embedding_cache": True,
+
+    # Number of embeddings kept in the in-memory (LRU) part of the cache, per process. Each takes 4 bytes per dimension
+    # (about 6 KB at 1536 dimensions), so 1000 entries use about 6 MB in every process, worker processes included.
+    "embedding_cache_size": 1000,
+
+    # Only texts of at most this many characters are cached. Longer texts, like most assistant responses, are rarely
+    # repeated word for word.
+    "embedding_cache_max_text_length": 200,
+
+    # Persist cached embeddings in the embedding_cache database table so they survive restarts.
+    "embedding_cache_persistent": True,
+
+    # Days a persisted embedding is kept before it is deleted from the embedding_cache table, or None to keep them forever.
+    # Pruning runs in the Celery worker every embedding_cache_prune_interval seconds (start the worker with -B).
+    "embedding_cache_retention_days": 30,
+    "embedding_cache_prune_interval": 86400,
+
     # Maximum number of tokens (wordsish) that can be used in the context for the GPT model. COST CONSIDERATION: higher context buffers create more realistic conversations, but cost more per request. See token pricing for your desired models.
     "max_context_tokens": 2000,
 
@@ -138,6 +291,18 @@ OPENAI_SETTINGS = {
 }
 
 DATABASE_CONFIG = {
+    # Storage backend for conversations and system state.
+    #  - 'postgres': PostgreSQL with the pgvector extension (default). Requires a running PostgreSQL server.
+    #  - 'sqlite': An embedded SQLite database with embeddings in a memory-mapped NumPy matrix. No database server is needed,
+    #              which suits standalone robots. Only the 'sqlite_*' settings below apply to this backend.
+    'backend': 'postgres',
+
+    # Path of the SQLite database file (sqlite backend only). Embeddings are stored next to it in '<sqlite_path>.embeddings'.
+    'sqlite_path': 'data/osiris.sqlite3',
+
+    # Storage type of the SQLite embedding matrix (sqlite backend only): 'float32', or 'float16' to halve its size.
+    'sqlite_embedding_dtype': 'float32',
+
     # Name of the database to be used for storing conversations and other data.
     'dbname': 'conversations',
 
@@ -151,7 +316,59 @@ DATABASE_CONFIG = {
     'host': 'localhost',
 
     # Port number for connecting to the database.
-    'port': '5432'
+    'port': '5432',
+
+    # PostgreSQL column type for conversation embeddings: 'vector' (float32) or 'halfvec' (float16, pgvector 0.7+), which halves
+    # the storage per row with negligible loss of recall. Run scripts/reembed_conversations.py after changing it.
+    'embedding_storage': 'vector',
+
+    # PostgreSQL text search configuration used to build the full-text index of conversation responses for hybrid
+    # (keyword + vector) memory search, e.g. 'english' or 'simple' (no stemming or stop words).
+    'text_search_config': 'english',
+
+    # Number of connections kept open in each process's shared connection pool.
+    'pool_size': 5,
+
+    # Number of extra connections allowed beyond pool_size during bursts.
+    'max_overflow': 10,
+
+    # Seconds to wait for a free pooled connection before raising an error.
+    'pool_timeout': 30,
+
+    # Seconds after which a pooled connection is replaced, avoiding stale server-side connections.
+    'pool_recycle': 1800,
+
+    # Test each pooled connection with a lightweight ping before use, transparently replacing dropped connections.
+    'pool_pre_ping': True,
+
+    # Hot system state (e.g. last wake time) is kept in memory and written to the system_state table in the background.
+    # Changes are coalesced and written at most once per this many seconds.
+    'system_state_persist_interval': 2.0,
+
+    # Range-partition the conversations table by month on created_at (postgres backend only). Recent-window queries then only
+    # scan the current month's partition, and old months can be removed without a large DELETE. Takes effect when the table is
+    # created; convert an existing table with scripts/partition_conversations.py. Partition maintenance runs in the Celery
+    # worker's embedded beat scheduler (started with -B automatically when RUN_LOCALLY_AUTOMATICALLY is set).
+    'partition_conversations': False,
+
+    # Number of future monthly partitions kept ready for new conversations.
+    'partition_months_ahead': 2,
+
+    # Months of conversations kept in the conversations table. Older partitions are handled by partition_retention_action.
+    # 0 keeps every month.
+    'partition_retention_months': 0,
+
+    # What happens to partitions older than partition_retention_months:
+    #  - 'archive': detach them and move them into the partition_archive_schema schema (still queryable, no longer searched).
+    #  - 'detach': detach them, leaving them as standalone tables.
+    #  - 'drop': delete them. The conversations are lost.
+    'partition_retention_action': 'archive',
+
+    # Schema that archived partitions are moved to.
+    'partition_archive_schema': 'archive',
+
+    # Seconds between partition maintenance runs.
+    'partition_maintenance_interval': 3600
 }
 
 
@@ -160,14 +377,78 @@ CONVERSATIONS_CONFIG = {
     "user": 1,
 
     # Identifier for the assistant (robot or AI) in the conversation database.
-    "assistant": 2
+    "assistant": 2,
+
+    # The background worker buffers conversation parts and writes them in batches (one embeddings request and one INSERT per batch).
+    # A batch is written as soon as it holds this many parts...
+    "write_behind_max_rows": 20,
+
+    # ...or after this many seconds, whichever comes first. Pending parts are also written when the worker shuts down.
+    # DURABILITY: a part counts as stored (and its Celery task is acknowledged) once it is buffered, so if the worker process
+    # crashes, the parts still buffered (up to the two limits above) are lost. Lower both to shrink that window.
+    "write_behind_flush_interval": 1.0,
+
+    # When writes fail, they are retried with exponential backoff, from write_behind_retry_backoff seconds up to
+    # write_behind_max_retry_backoff. A part that fails write_behind_max_attempts times is dropped, and so are the oldest parts
+    # once write_behind_max_pending parts are waiting. Dropped parts are appended to write_behind_dead_letter_path (JSON lines;
+    # None to only log them).
+    "write_behind_retry_backoff": 1.0,
+    "write_behind_max_retry_backoff": 60.0,
+    "write_behind_max_attempts": 5,
+    "write_behind_max_pending": 1000,
+    "write_behind_dead_letter_path": "data/dead_letter_conversations.jsonl",
+
+    # Skip conversation parts that repeat the part right before them, of the same speaker, stored within the last
+    # dedup_window_seconds, either word for word (after normalizing case, whitespace and punctuation) or nearly, by embedding
+    # similarity. Keeps repeated utterances and retried responses out of the recent context and the embeddings API. Repeats with
+    # another speaker's part in between, like "yes" to two different questions, are always kept.
+    "deduplicate_conversations": True,
+
+    # How far back, in seconds, a new conversation part is compared with earlier ones.
+    "dedup_window_seconds": 120,
+
+    # Cosine similarity of embeddings at or above which two conversation parts count as near duplicates (1.0 = identical meaning).
+    "dedup_similarity_threshold": 0.97,
+
+    # Identifier for rolling summaries of older conversation parts in the conversation database.
+    "summary": 3,
+
+    # Compact older conversation parts into a rolling summary in the background. The summary is sent along with the most recent
+    # conversation parts, keeping prompts small while preserving long-range context. COST CONSIDERATION: each summary is one extra chat completion.
+    "summarize_conversations": True,
+
+    # Number of tokens of the most recent conversation that are always sent verbatim and never summarized.
+    "summary_keep_recent_tokens": 1000,
+
+    # A new summary is built once at least this many tokens of older conversation are waiting to be compacted.
+    "summary_trigger_tokens": 1500,
+
+    # Target maximum length of the rolling summary, in words.
+    "summary_max_words": 250
 }
 
 CELERY_CONFIG = {
+    # Backend that runs background tasks (storing conversations, summaries, partition maintenance):
+    #  - 'celery': send tasks through the broker below to a Celery worker. Supports workers on other machines.
+    #  - 'local': run tasks on a small thread pool inside the Osiris process. No Redis broker or worker process is needed,
+    #             and startup is faster, which suits single-robot installs. The settings below other than the LOCAL_* ones
+    #             and SHUTDOWN_TIMEOUT do not apply.
+    "TASK_BACKEND": "celery",
+
+    # Number of worker threads of the 'local' task backend.
+    "LOCAL_WORKERS": 2,
+
+    # Maximum number of tasks waiting in the 'local' task backend's queue.
+    "LOCAL_QUEUE_SIZE": 1000,
+
+    # Seconds to wait for room in a full 'local' queue before a task is dropped (and logged).
+    "LOCAL_SUBMIT_TIMEOUT": 1.0,
+
     # Determines whether to run Celery locally and automatically. 
     # Set to False for manual start or in production environments. True is preferable for development.
     # Manual starts can be achieved by running the following command in the terminal:
-    # - celery -A osiris.celery_app worker --loglevel=info
+    # - celery -A osiris.celery_app worker --loglevel=info -Q memory,state,maintenance,celery
+    # The -Q order is the order in which the task queues (see background/routing.py) are consumed.
     "RUN_LOCALLY_AUTOMATICALLY": True,
 
     # Logging level for Celery. Use "debug" for more verbose output, helpful in development.
@@ -177,7 +458,14 @@ CELERY_CONFIG = {
     "APPLICATION_NAME": "osiris",
 
     # URL for the Celery broker, specifying the transport and location. Here, Redis is used as the broker.
-    "BROKER_URL": 'redis://localhost:6379/0'
+    "BROKER_URL": 'redis://localhost:6379/0',
+
+    # Seconds the latest-invocation token of a coalesced task (e.g. summarize_conversations_task) is kept in Redis.
+    "COALESCE_TOKEN_TTL": 3600,
+
+    # Seconds to wait for a locally started worker (or the 'local' task backend) to finish on shutdown, giving it time to write any
+    # buffered conversation parts.
+    "SHUTDOWN_TIMEOUT": 5
 }
 
 
@@ -0,0 +1,84 @@
+import os
+import threading
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from .connection import get_database_url, get_pool_options
+
+# Process-wide asyncio engine and session factory, the asyncio counterpart of database/connection.py.
+# asyncpg connections belong to the event loop that opened them, so the engine must only be used
+# from a single event loop per process.
+_async_engine = None
+_async_session_factory = None
+_async_engine_pid = None
+_async_registry_lock = threading.Lock()
+
+def get_async_database_url():
+    """
+    Builds the PostgreSQL connection URL for the asyncpg driver from DATABASE_CONFIG.
+
+    Returns:
+        str: The SQLAlchemy database URL.
+    """
+    return get_database_url().replace("postgresql://", "postgresql+asyncpg://", 1)
+
+def get_async_engine():
+    """
+    Returns the process-wide asyncio SQLAlchemy engine, creating it on first use.
+
+    The engine uses the asyncpg driver and the same pool options as the synchronous engine.
+    If the process has been forked since the engine was created, a fresh engine is built.
+
+    Returns:
+        AsyncEngine: The shared asyncio engine.
+    """
+    global _async_engine, _async_session_factory, _async_engine_pid
+
+    if _async_engine is not None and _async_engine_pid == os.getpid():
+        return _async_engine
+
+    with _async_registry_lock:
+        if _async_engine is not None and _async_engine_pid != os.getpid():
+            reset_async_engine()
+
+        if _async_engine is None:
+            _async_engine = create_async_engine(get_async_database_url(), **get_pool_options())
+            _async_session_factory = async_sessionmaker(bind=_async_engine, expire_on_commit=False)
+            _async_engine_pid = os.getpid()
+
+    return _async_engine
+
+def get_async_session_factory():
+    """
+    Returns the process-wide asyncio session factory bound to the shared asyncio engine.
+
+    Returns:
+        async_sessionmaker: The shared asyncio session factory.
+    """
+    get_async_engine()
+    return _async_session_factory
+
+def reset_async_engine():
+    """
+    Discards the process-wide asyncio engine without closing connections inherited from a
+    parent process. Use dispose_async_engine() to close the engine's connections cleanly.
+    """
+    global _async_engine, _async_session_factory, _async_engine_pid
+
+    if _async_engine is not None and _async_engine_pid != os.getpid():
+        _async_engine.sync_engine.dispose(close=False)
+
+    _async_engine = None
+    _async_session_factory = None
+    _async_engine_pid = None
+
+async def dispose_async_engine():
+    """
+    Closes the asyncio engine's pooled connections. Call this before the event loop is closed.
+    """
+    global _async_engine, _async_session_factory, _async_engine_pid
+
+    if _async_engine is not None and _async_engine_pid == os.getpid():
+        await _async_engine.dispose()
+
+    _async_engine = None
+    _async_session_factory = None
+    _async_engine_pid = None
@@ -0,0 +1,140 @@
+from datetime import datetime, timezone
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.sql import func
+from config import CONVERSATIONS_CONFIG
+from .async_connection import get_async_session_factory
+from .backends import is_partitioning_enabled
+from .models import Conversation
+from .partitions import month_start
+
+class AsyncConversationMemoryManager:
+    """
+    Manages database operations for the Conversation table on SQLAlchemy's asyncio extension.
+
+    This is the asyncio counterpart of ConversationMemoryManager for the hot path (the reads made
+    while building a prompt and the writes of new conversation parts). Its methods do not block
+    the event loop, so an asyncio orchestrator can overlap them with LLM and TTS I/O. Background
+    maintenance (summarization, exports) stays on the synchronous manager.
+    """
+
+    def __init__(self):
+        """
+        Initializes the manager with the shared asyncio session factory.
+        """
+        self.Session = get_async_session_factory()
+
+    async def add_conversation(self, speaker_type, response, response_embedding, response_tokens):
+        """
+        Adds a new conversation part to the database.
+        """
+        await self.add_conversations([{
+            "speaker_type": speaker_type,
+            "response": response,
+            "response_embedding": response_embedding,
+            "response_tokens": response_tokens,
+        }])
+
+    async def add_conversations(self, conversations):
+        """
+        Adds several conversation parts to the database in a single multi-row INSERT.
+
+        Parameters:
+            conversations (list[dict]): Rows with speaker_type, response, response_embedding,
+                                        response_tokens and optionally created_at.
+        """
+        if not conversations:
+            return
+
+        async with self.Session() as session:
+            await session.execute(insert(Conversation).values(conversations))
+            await session.commit()
+
+    async def get_conversation(self, conversation_id):
+        """
+        Retrieves a conversation from the database by its ID.
+        """
+        async with self.Session() as session:
+            return (await session.execute(select(Conversation).filter_by(id=conversation_id))).scalars().first()
+
+    async def update_conversation(self, conversation_id, **updates):
+        """
+        Updates a conversation based on the provided conversation ID and update fields.
+        """
+        async with self.Session() as session:
+            await session.execute(update(Conversation).filter_by(id=conversation_id).values(**updates))
+            await session.commit()
+
+    async def delete_conversation(self, conversation_id):
+        """
+        Deletes a conversation from the database.
+        """
+        async with self.Session() as session:
+            await session.execute(delete(Conversation).filter_by(id=conversation_id))
+            await session.commit()
+
+    async def list_recent_conversations(self, context_limit):
+        """
+        Lists recent conversations such that their total token count is close to the context limit.
+
+        Behaves like ConversationMemoryManager.list_recent_conversations, including the restriction
+        to the current month's partition when the table is partitioned.
+
+        Returns:
+            List of rows with the Conversation columns and their running token total, oldest first.
+        """
+        async with self.Session() as session:
+            if is_partitioning_enabled():
+                since = month_start(datetime.now(timezone.utc))
+                rows = (await session.execute(self.recent_conversations_query(context_limit, since))).all()
+                # The window is complete if a turn in the partition no longer fits in it.
+                if not any(row.running_total > context_limit for row in rows):
+                    rows = (await session.execute(self.recent_conversations_query(context_limit))).all()
+            else:
+                rows = (await session.execute(self.recent_conversations_query(context_limit))).all()
+
+        return [row for row in rows if row.running_total <= context_limit]
+
+    @staticmethod
+    def recent_conversations_query(context_limit, since=None):
+        """
+        Returns a statement selecting the newest active turns that fit in context_limit tokens,
+        plus the first older turn that does not, oldest first, with their running token totals.
+        """
+        query = select(Conversation.__table__) \
+            .where(Conversation.speaker_type != CONVERSATIONS_CONFIG.get("summary", 3)) \
+            .where(Conversation.summarized_by_id.is_(None))
+        if since is not None:
+            query = query.where(Conversation.created_at >= since)
+        subquery = query.add_columns(
+            func.sum(Conversation.response_tokens).over(order_by=(Conversation.created_at.desc(), Conversation.id.desc())).label('running_total')
+        ).subquery()
+
+        return select(subquery) \
+            .where(subquery.c.running_total - subquery.c.response_tokens < context_limit) \
+            .order_by(subquery.c.created_at.asc(), subquery.c.id.asc())
+
+    async def get_latest_summary(self):
+        """
+        Retrieves the current rolling summary of older conversation turns, or None.
+        """
+        async with self.Session() as session:
+            query = select(Conversation) \
+                .where(Conversation.speaker_type == CONVERSATIONS_CONFIG.get("summary", 3)) \
+                .where(Conversation.summarized_by_id.is_(None)) \
+                .order_by(Conversation.created_at.desc(), Conversation.id.desc()) \
+                .limit(1)
+            return (await session.execute(query)).scalars().first()
+
+    async def find_similar_conversations(self, embedding, limit=5):
+        """
+        Finds the conversation parts most similar to the given embedding, by cosine similarity.
+
+        Returns:
+            List of (Conversation, similarity) tuples, most similar first.
+        """
+        async with self.Session() as session:
+            distance = Conversation.response_embedding.cosine_distance(embedding)
+            rows = (await session.execute(
+                select(Conversation, distance.label('distance')).order_by(distance).limit(limit)
+            )).all()
+            return [(conversation, 1 - cosine_distance) for conversation, cosine_distance in rows]
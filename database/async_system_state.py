@@ -0,0 +1,47 @@
+from sqlalchemy import select
+from .async_connection import get_async_session_factory
+from .models import SystemState
+
+class AsyncSystemStateManager:
+    """
+    Manages database operations for the SystemState table on SQLAlchemy's asyncio extension.
+
+    This is the asyncio counterpart of SystemStateManager.
+    """
+
+    def __init__(self):
+        """
+        Initializes the manager with the shared asyncio session factory.
+        """
+        self.Session = get_async_session_factory()
+
+    async def get_or_create_state(self):
+        """
+        Retrieves the current system state from the database, or creates it if it doesn't exist.
+        """
+        async with self.Session() as session:
+            state = (await session.execute(select(SystemState).limit(1))).scalars().first()
+            if not state:
+                state = SystemState()
+                session.add(state)
+                await session.commit()
+                await session.refresh(state)
+            return state
+
+    async def update_system_state(self, **updates):
+        """
+        Updates the system state in the database.
+
+        Parameters:
+            **updates: Arbitrary keyword arguments representing the fields to update and their new values.
+        """
+        async with self.Session() as session:
+            state = (await session.execute(select(SystemState).limit(1))).scalars().first()
+            if not state:
+                state = SystemState()
+                session.add(state)
+
+            for key, value in updates.items():
+                setattr(state, key, value)
+
+            await session.commit()
@@ -0,0 +1,139 @@
+from config import DATABASE_CONFIG, OPENAI_SETTINGS
+
+# Storage backends selectable through DATABASE_CONFIG['backend'].
+#  - postgres: PostgreSQL with the pgvector extension (default).
+#  - sqlite: an embedded SQLite database with a memory-mapped NumPy embedding matrix,
+#            for standalone robots that should not run a database server.
+BACKENDS = ('postgres', 'sqlite')
+
+def get_backend_name(backend=None):
+    """
+    Returns the configured storage backend name.
+
+    Args:
+        backend (str, optional): Overrides DATABASE_CONFIG['backend'].
+
+    Raises:
+        ValueError: If the backend is not one of BACKENDS.
+    """
+    backend = backend or DATABASE_CONFIG.get('backend', 'postgres')
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown database backend '{backend}', expected one of {BACKENDS}")
+    return backend
+
+# Embedding storage types for the PostgreSQL backend, selectable through DATABASE_CONFIG['embedding_storage'].
+#  - vector: pgvector's float32 vector type (default).
+#  - halfvec: pgvector's float16 halfvec type (pgvector 0.7+), half the size on disk, in indexes and in I/O.
+EMBEDDING_STORAGE_TYPES = ('vector', 'halfvec')
+
+# Output size of the default embedding models when no 'dimensions' parameter is sent.
+DEFAULT_EMBEDDING_DIMENSIONS = 1536
+
+def get_embedding_dimensions():
+    """
+    Returns the number of dimensions of stored embeddings, from OPENAI_SETTINGS['embedding_dimensions'].
+    """
+    return OPENAI_SETTINGS.get('embedding_dimensions') or DEFAULT_EMBEDDING_DIMENSIONS
+
+def get_embedding_storage():
+    """
+    Returns the configured PostgreSQL embedding storage type.
+
+    Raises:
+        ValueError: If the storage type is not one of EMBEDDING_STORAGE_TYPES.
+    """
+    storage = DATABASE_CONFIG.get('embedding_storage', 'vector')
+    if storage not in EMBEDDING_STORAGE_TYPES:
+        raise ValueError(f"Unknown embedding storage '{storage}', expected one of {EMBEDDING_STORAGE_TYPES}")
+    return storage
+
+def get_text_search_config():
+    """
+    Returns the PostgreSQL text search configuration (language) used for keyword search of conversations.
+    """
+    return DATABASE_CONFIG.get('text_search_config', 'english')
+
+def is_partitioning_enabled():
+    """
+    Returns True if the PostgreSQL conversations table is range-partitioned on created_at
+    (DATABASE_CONFIG['partition_conversations']). Partitioning does not apply to the SQLite backend.
+    """
+    return get_backend_name() == 'postgres' and DATABASE_CONFIG.get('partition_conversations', False)
+
+# Backend modules are imported lazily, so the SQLite backend works without the
+# PostgreSQL driver or pgvector installed.
+
+def get_conversation_memory_manager(backend=None):
+    """
+    Returns a conversation memory manager for the configured backend.
+    """
+    if get_backend_name(backend) == 'sqlite':
+        from .sqlite.conversations import SQLiteConversationMemoryManager
+        return SQLiteConversationMemoryManager()
+    from .conversations import ConversationMemoryManager
+    return ConversationMemoryManager()
+
+def get_system_state_manager(backend=None):
+    """
+    Returns a system state manager for the configured backend.
+    """
+    if get_backend_name(backend) == 'sqlite':
+        from .sqlite.system_state import SQLiteSystemStateManager
+        return SQLiteSystemStateManager()
+    from .system_state import SystemStateManager
+    return SystemStateManager()
+
+def get_embedding_cache_store(backend=None):
+    """
+    Returns the persistent embedding cache store for the configured backend.
+    """
+    if get_backend_name(backend) == 'sqlite':
+        from .sqlite.embedding_cache import SQLiteEmbeddingCacheStore
+        return SQLiteEmbeddingCacheStore()
+    from .embedding_cache import EmbeddingCacheStore
+    return EmbeddingCacheStore()
+
+def get_database_setup(backend=None):
+    """
+    Returns the setup class for the configured backend.
+    """
+    if get_backend_name(backend) == 'sqlite':
+        from .sqlite.setup import SQLiteDatabaseSetup
+        return SQLiteDatabaseSetup
+    from .setup import DatabaseSetup
+    return DatabaseSetup
+
+def get_async_conversation_memory_manager(backend=None):
+    """
+    Returns an asyncio conversation memory manager. Only the postgres backend has async managers.
+
+    Raises:
+        ValueError: If the configured backend has no async managers.
+    """
+    if get_backend_name(backend) == 'sqlite':
+        raise ValueError("The sqlite backend has no async managers, use get_conversation_memory_manager()")
+    from .async_conversations import AsyncConversationMemoryManager
+    return AsyncConversationMemoryManager()
+
+def get_async_system_state_manager(backend=None):
+    """
+    Returns an asyncio system state manager. Only the postgres backend has async managers.
+
+    Raises:
+        ValueError: If the configured backend has no async managers.
+    """
+    if get_backend_name(backend) == 'sqlite':
+        raise ValueError("The sqlite backend has no async managers, use get_system_state_manager()")
+    from .async_system_state import AsyncSystemStateManager
+    return AsyncSystemStateManager()
+
+def reset_database_connections():
+    """
+    Drops connections inherited from a parent process. Intended for freshly forked worker processes.
+    """
+    if get_backend_name() == 'sqlite':
+        from .sqlite.connection import reset_sqlite_connection
+        reset_sqlite_connection()
+    else:
+        from .connection import reset_engine
+        reset_engine()
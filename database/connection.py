@@ -1,33 +1,116 @@
 import logging
+import os
+import threading
 from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
 from config import DATABASE_CONFIG
 
+# Process-wide engine and session factory registry. Every manager in the process shares
+# the same connection pool instead of building its own on each instantiation.
+_engine = None
+_session_factory = None
+_engine_pid = None
+_registry_lock = threading.Lock()
+
+def get_database_url():
+    """
+    Builds the PostgreSQL connection URL from DATABASE_CONFIG.
+
+    The connection string is dynamically constructed based on
+    the presence of a password in the DATABASE_CONFIG.
+
+    Returns:
+        str: The SQLAlchemy database URL.
+    """
+    # Check if 'password' key exists and is not an empty string
+    if DATABASE_CONFIG.get('password'):
+        logging.info("Connecting to database with password...")
+        # Include the password in the connection string
+        return f"postgresql://{DATABASE_CONFIG['user']}:{DATABASE_CONFIG['password']}@" \
+               f"{DATABASE_CONFIG['host']}:{DATABASE_CONFIG['port']}/{DATABASE_CONFIG['dbname']}"
+
+    logging.info("Connecting to database without password...")
+    # Omit the password from the connection string
+    return f"postgresql://{DATABASE_CONFIG['user']}@" \
+           f"{DATABASE_CONFIG['host']}:{DATABASE_CONFIG['port']}/{DATABASE_CONFIG['dbname']}"
+
+def get_pool_options():
+    """
+    Returns the connection pool options for the engine, read from DATABASE_CONFIG.
+
+    Returns:
+        dict: Keyword arguments for create_engine controlling the connection pool.
+    """
+    return {
+        "pool_size": DATABASE_CONFIG.get('pool_size', 5),
+        "max_overflow": DATABASE_CONFIG.get('max_overflow', 10),
+        "pool_timeout": DATABASE_CONFIG.get('pool_timeout', 30),
+        "pool_recycle": DATABASE_CONFIG.get('pool_recycle', 1800),
+        "pool_pre_ping": DATABASE_CONFIG.get('pool_pre_ping', True),
+    }
+
 def get_engine():
     """
-    Creates and returns a SQLAlchemy engine.
+    Returns the process-wide SQLAlchemy engine, creating it on first use.
 
     This engine is the entry point to the SQLAlchemy library, providing a connection
     to the specified PostgreSQL database using configuration parameters defined in
     DATABASE_CONFIG. It uses the psycopg driver for PostgreSQL.
 
-    The engine's connection string is dynamically constructed based on
-    the presence of a password in the DATABASE_CONFIG.
+    The engine is created once per process. If the process has been forked since the
+    engine was created (for example, a Celery prefork worker), the inherited pool is
+    discarded and a fresh engine is built for the child process.
 
     Returns:
         A SQLAlchemy engine object connected to the PostgreSQL database.
     """
+    global _engine, _session_factory, _engine_pid
 
-    # Check if 'password' key exists and is not an empty string
-    if DATABASE_CONFIG.get('password'):
-        logging.info("Connecting to database with password...")
-        # Include the password in the connection string
-        db_url = f"postgresql://{DATABASE_CONFIG['user']}:{DATABASE_CONFIG['password']}@" \
-                 f"{DATABASE_CONFIG['host']}:{DATABASE_CONFIG['port']}/{DATABASE_CONFIG['dbname']}"
-    else:
-        logging.info("Connecting to database without password...")
-        # Omit the password from the connection string
-        db_url = f"postgresql://{DATABASE_CONFIG['user']}@" \
-                 f"{DATABASE_CONFIG['host']}:{DATABASE_CONFIG['port']}/{DATABASE_CONFIG['dbname']}"
-
-    # Create and return the SQLAlchemy engine
-    return create_engine(db_url)
\ No newline at end of file
+    if _engine is not None and _engine_pid == os.getpid():
+        return _engine
+
+    with _registry_lock:
+        if _engine is not None and _engine_pid != os.getpid():
+            # Inherited from a parent process, never reuse its sockets.
+            reset_engine()
+
+        if _engine is None:
+            _engine = create_engine(get_database_url(), **get_pool_options())
+            _session_factory = sessionmaker(bind=_engine, expire_on_commit=False)
+            _engine_pid = os.getpid()
+
+    return _engine
+
+def get_session_factory():
+    """
+    Returns the process-wide session factory bound to the shared engine.
+
+    Sessions created from this factory do not expire their objects on commit, so
+    rows returned by the managers remain readable after the session is closed.
+
+    Returns:
+        sessionmaker: The shared session factory.
+    """
+    get_engine()
+    return _session_factory
+
+def reset_engine():
+    """
+    Discards the process-wide engine and session factory.
+
+    Intended to be called in a freshly forked process (e.g. from Celery's
+    worker_process_init signal). Pooled connections inherited from the parent are
+    dropped without being closed, so the parent's connections are left untouched.
+    The next call to get_engine() builds a new pool for the current process.
+    """
+    global _engine, _session_factory, _engine_pid
+
+    if _engine is not None:
+        if _engine_pid == os.getpid():
+            _engine.dispose()
+        else:
+            _engine.dispose(close=False)
+
+    _engine = None
+    _session_factory = None
+    _engine_pid = None
@@ -1,7 +1,15 @@
-from sqlalchemy.orm import sessionmaker
+import re
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from sqlalchemy import cast, create_engine, insert, select, text
+from sqlalchemy.dialects.postgresql import REGCONFIG
+from sqlalchemy.pool import NullPool
 from sqlalchemy.sql import func
+from config import CONVERSATIONS_CONFIG
 from .models import Conversation, Base
-from .connection import get_engine
+from .backends import get_text_search_config, is_partitioning_enabled
+from .connection import get_database_url, get_session_factory
+from .partitions import month_start
 
 class ConversationMemoryManager:
     """
@@ -9,11 +17,14 @@ class ConversationMemoryManager:
     including insertions, updates, deletions, and queries.
     """
 
+    # Advisory lock key used to serialize summarization across worker processes.
+    SUMMARY_LOCK_KEY = 7301
+
     def __init__(self):
         """
-        Initializes the ConversationManager with a database session.
+        Initializes the ConversationManager with the shared database session factory.
         """
-        self.engine = get_engine()
+        self.Session = get_session_factory()
 
     def add_conversation(self, speaker_type, response, response_embedding, response_tokens):
         """
@@ -30,19 +41,32 @@ class ConversationMemoryManager:
             response_tokens=response_tokens,
             response_embedding=response_embedding,
         )
-        
-        Session = sessionmaker(bind=self.engine)
 
-        with Session() as session:
+        with self.Session() as session:
             session.add(new_conversation)
             session.commit()
 
+    def add_conversations(self, conversations):
+        """
+        Adds several conversation parts to the database in a single multi-row INSERT.
+
+        Parameters:
+            conversations (list[dict]): Rows to insert. Each dict holds speaker_type, response,
+                                        response_embedding and response_tokens, and optionally
+                                        created_at to preserve the time the part was spoken.
+        """
+        if not conversations:
+            return
+
+        with self.Session() as session:
+            session.execute(insert(Conversation).values(conversations))
+            session.commit()
+
     def get_conversation(self, conversation_id):
         """
         Retrieves a conversation from the database by its ID.
         """
-        Session = sessionmaker(bind=self.engine)
-        with Session() as session:
+        with self.Session() as session:
             return session.query(Conversation).filter_by(id=conversation_id).first()
 
     def update_conversation(self, conversation_id, **updates):
@@ -61,8 +85,7 @@ class ConversationMemoryManager:
         Note:
             The fields in **updates should match the column names of the Conversation model.
         """
-        Session = sessionmaker(bind=self.engine)
-        with Session() as session:
+        with self.Session() as session:
             session.query(Conversation).filter_by(id=conversation_id).update(updates)
             session.commit()
 
@@ -70,9 +93,8 @@ class ConversationMemoryManager:
         """
         Deletes a conversation from the database.
         """
-        Session = sessionmaker(bind=self.engine)
-        with Session() as session:
-            conversation = self.session.query(Conversation).filter_by(id=conversation_id).first()
+        with self.Session() as session:
+            conversation = session.query(Conversation).filter_by(id=conversation_id).first()
             if conversation:
                 session.delete(conversation)
                 session.commit()
@@ -88,32 +110,241 @@ class ConversationMemoryManager:
         Returns:
             List of Conversation objects that match the criteria.
         """
-        Session = sessionmaker(bind=self.engine)
-        with Session() as session:
+        with self.Session() as session:
             query = session.query(Conversation)
             
             if after_date:
-                query = query.filter(Conversation.createdAt >= after_date)
+                query = query.filter(Conversation.created_at >= after_date)
             
             if before_date:
-                query = query.filter(Conversation.createdAt <= before_date)
+                query = query.filter(Conversation.created_at <= before_date)
 
             return query.all()
 
+    def iter_conversation_batches(self, columns=None, after_date=None, before_date=None, batch_size=1000):
+        """
+        Streams conversations in batches, without loading the whole table into memory.
+
+        Rows are read through a server-side cursor and only the requested columns are selected,
+        so memory use depends on batch_size rather than on the size of the table. Rows are
+        returned as plain tuples instead of ORM objects.
+
+        Parameters:
+            columns (list[str]): Optional. Column names to select; defaults to every column.
+            after_date (datetime): Optional. Retrieve conversations after this date.
+            before_date (datetime): Optional. Retrieve conversations before this date.
+            batch_size (int): Number of rows per batch.
+
+        Yields:
+            list[tuple]: Rows with the requested columns, in the requested order, ordered by ID.
+        """
+        columns = columns or [column.name for column in Conversation.__table__.columns]
+        query = select(*[Conversation.__table__.c[column] for column in columns])
+        if after_date:
+            query = query.where(Conversation.created_at >= after_date)
+        if before_date:
+            query = query.where(Conversation.created_at <= before_date)
+        query = query.order_by(Conversation.id).execution_options(yield_per=batch_size)
+
+        with self.Session() as session:
+            for partition in session.execute(query).partitions():
+                yield [tuple(row) for row in partition]
+
     def list_recent_conversations(self, context_limit):
         """
         Lists recent conversations from the database such that their total token count is close to the context limit.
 
+        Summaries and turns that have already been compacted into a summary are excluded; use
+        get_latest_summary() to retrieve the summary of older turns.
+
+        When the table is partitioned, only the current month's partition is scanned. The whole
+        table is only queried when that partition holds less than a full context window.
+
         Returns:
             List of Conversation objects that match the criteria.
         """
-        Session = sessionmaker(bind=self.engine)
-        with Session() as session:
-            subquery = session.query(
-                Conversation,
-                func.sum(Conversation.response_tokens).over(order_by=Conversation.created_at.desc()).label('running_total')
+        with self.Session() as session:
+            if is_partitioning_enabled():
+                rows = self.recent_conversations_query(session, context_limit, month_start(datetime.now(timezone.utc))).all()
+                # The window is complete if a turn in the partition no longer fits in it.
+                if not any(row.running_total > context_limit for row in rows):
+                    rows = self.recent_conversations_query(session, context_limit).all()
+            else:
+                rows = self.recent_conversations_query(session, context_limit).all()
+
+        return [row for row in rows if row.running_total <= context_limit]
+
+    def recent_conversations_query(self, session, context_limit, since=None):
+        """
+        Returns a query for the newest active turns that fit in context_limit tokens, plus the
+        first older turn that does not, oldest first, with their running token totals.
+
+        Parameters:
+            session: The session to build the query in.
+            context_limit (int): The token budget of the window.
+            since (datetime): Optional. Only consider turns created at or after this time.
+        """
+        query = self.active_turns_query(session)
+        if since is not None:
+            query = query.filter(Conversation.created_at >= since)
+        subquery = query.add_columns(
+            func.sum(Conversation.response_tokens).over(order_by=(Conversation.created_at.desc(), Conversation.id.desc())).label('running_total')
+        ).subquery()
+
+        return session.query(subquery) \
+            .filter(subquery.c.running_total - subquery.c.response_tokens < context_limit) \
+            .order_by(subquery.c.created_at.asc(), subquery.c.id.asc())
+
+    def get_latest_summary(self):
+        """
+        Retrieves the current rolling summary of older conversation turns.
+
+        Returns:
+            Conversation: The newest summary row, or None if nothing has been summarized yet.
+        """
+        with self.Session() as session:
+            return session.query(Conversation) \
+                .filter(Conversation.speaker_type == CONVERSATIONS_CONFIG.get("summary", 3)) \
+                .filter(Conversation.summarized_by_id.is_(None)) \
+                .order_by(Conversation.created_at.desc(), Conversation.id.desc()) \
+                .first()
+
+    def list_compactable_conversations(self, keep_recent_tokens):
+        """
+        Lists the turns that are old enough to be compacted into the rolling summary.
+
+        These are the turns that have not been summarized yet and fall outside the most recent
+        keep_recent_tokens worth of conversation.
+
+        Parameters:
+            keep_recent_tokens (int): Number of tokens of recent conversation to leave uncompacted.
+
+        Returns:
+            List of rows (oldest first) with id, speaker_type, response and response_tokens.
+        """
+        with self.Session() as session:
+            subquery = self.active_turns_query(session).add_columns(
+                func.sum(Conversation.response_tokens).over(order_by=(Conversation.created_at.desc(), Conversation.id.desc())).label('running_total')
             ).subquery()
 
-            query = session.query(subquery).filter(subquery.c.running_total <= context_limit).order_by(subquery.c.created_at.asc())
+            query = session.query(
+                subquery.c.id, subquery.c.speaker_type, subquery.c.response, subquery.c.response_tokens
+            ).filter(subquery.c.running_total > keep_recent_tokens).order_by(subquery.c.created_at.asc(), subquery.c.id.asc())
+
+            return query.all()
+
+    def add_summary(self, response, response_embedding, response_tokens, compacted_ids):
+        """
+        Stores a new rolling summary and marks the turns (and previous summary) it replaces.
+
+        Parameters:
+            response (str): The summary text.
+            response_embedding (list): The embedding of the summary text.
+            response_tokens (int): The token count of the summary text.
+            compacted_ids (list[int]): IDs of the rows folded into this summary.
+        """
+        summary = Conversation(
+            speaker_type=CONVERSATIONS_CONFIG.get("summary", 3),
+            response=response,
+            response_tokens=response_tokens,
+            response_embedding=response_embedding,
+        )
+
+        with self.Session() as session:
+            session.add(summary)
+            session.flush()
+            session.query(Conversation).filter(Conversation.id.in_(compacted_ids)) \
+                .update({"summarized_by_id": summary.id}, synchronize_session=False)
+            session.commit()
+
+    @contextmanager
+    def summary_lock(self):
+        """
+        Context manager that holds a database-wide lock while a summary is being built,
+        so concurrent workers never compact the same turns twice.
+
+        The advisory lock belongs to a connection of its own, outside the pool and in autocommit
+        mode. Building a summary includes a model call of several seconds, during which no pooled
+        connection is held and no transaction stays open to hold back vacuum.
+
+        Yields:
+            bool: True if the lock was acquired, False if another worker holds it.
+        """
+        engine = create_engine(get_database_url(), poolclass=NullPool, isolation_level="AUTOCOMMIT")
+        try:
+            with engine.connect() as connection:
+                acquired = connection.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": self.SUMMARY_LOCK_KEY}).scalar()
+                try:
+                    yield acquired
+                finally:
+                    if acquired:
+                        connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": self.SUMMARY_LOCK_KEY})
+        finally:
+            engine.dispose()
+
+    @staticmethod
+    def active_turns_query(session):
+        """
+        Returns a query for the conversation turns that are neither summaries nor already summarized.
+        """
+        return session.query(Conversation) \
+            .filter(Conversation.speaker_type != CONVERSATIONS_CONFIG.get("summary", 3)) \
+            .filter(Conversation.summarized_by_id.is_(None))
+
+    def find_similar_conversations(self, embedding, limit=5):
+        """
+        Finds the conversation parts most similar to the given embedding, by cosine similarity.
+
+        Parameters:
+            embedding (list): The query embedding.
+            limit (int): Maximum number of results.
+
+        Returns:
+            List of (Conversation, similarity) tuples, most similar first.
+        """
+        with self.Session() as session:
+            distance = Conversation.response_embedding.cosine_distance(embedding)
+            rows = session.query(Conversation, distance.label('distance')).order_by(distance).limit(limit).all()
+            return [(conversation, 1 - cosine_distance) for conversation, cosine_distance in rows]
+
+    def hybrid_search(self, query_text, embedding, limit=5, candidates=50, rrf_k=60):
+        """
+        Finds the conversation parts that best match a query by keyword and by meaning.
+
+        Two rankings are computed in one SQL round trip: full-text rank (ts_rank_cd over the
+        GIN-indexed response_tsv column) for any of the query's words, and cosine similarity of
+        the embeddings. They are fused with reciprocal rank fusion: each part scores
+        1 / (rrf_k + rank) in every ranking it appears in. Exact names, numbers and commands
+        surface through the keyword ranking even when their embeddings are not close.
+
+        Parameters:
+            query_text (str): The query text.
+            embedding (list): The embedding of the query text.
+            limit (int): Maximum number of results.
+            candidates (int): Number of top results taken from each ranking before fusion.
+            rrf_k (int): Reciprocal rank fusion constant; higher values flatten the rank weights.
+
+        Returns:
+            List of (Conversation, score) tuples, best match first.
+        """
+        words = re.findall(r"\w+", query_text)
+        tsquery = func.to_tsquery(cast(get_text_search_config(), REGCONFIG), " | ".join(words))
+        keyword_rank = func.ts_rank_cd(Conversation.response_tsv, tsquery)
+        keyword = select(Conversation.id, func.row_number().over(order_by=keyword_rank.desc()).label('rank')) \
+            .where(Conversation.response_tsv.op('@@')(tsquery)) \
+            .order_by(keyword_rank.desc()).limit(candidates if words else 0).cte('keyword')
+
+        distance = Conversation.response_embedding.cosine_distance(embedding)
+        semantic = select(Conversation.id, func.row_number().over(order_by=distance).label('rank')) \
+            .order_by(distance).limit(candidates).cte('semantic')
+
+        score = func.coalesce(1.0 / (rrf_k + keyword.c.rank), 0.0) + func.coalesce(1.0 / (rrf_k + semantic.c.rank), 0.0)
+        fused = select(func.coalesce(keyword.c.id, semantic.c.id).label('id'), score.label('score')) \
+            .select_from(keyword.join(semantic, keyword.c.id == semantic.c.id, full=True)).subquery()
 
-            return query.all()
\ No newline at end of file
+        with self.Session() as session:
+            rows = session.execute(
+                select(Conversation, fused.c.score).join(fused, Conversation.id == fused.c.id)
+                .order_by(fused.c.score.desc()).limit(limit)
+            ).all()
+            return [(conversation, score) for conversation, score in rows]
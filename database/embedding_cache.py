@@ -0,0 +1,85 @@
+from array import array
+from datetime import datetime, timedelta, timezone
+from sqlalchemy.dialects.postgresql import insert
+from .models import EmbeddingCacheEntry
+from .connection import get_session_factory
+
+class EmbeddingCacheStore:
+    """
+    Manages database operations for the EmbeddingCache table,
+    the persistent layer behind the in-memory embedding cache.
+    """
+
+    def __init__(self):
+        """
+        Initializes the EmbeddingCacheStore with the shared database session factory.
+        """
+        self.Session = get_session_factory()
+
+    def get_embeddings(self, model, text_hashes):
+        """
+        Retrieves cached embeddings for the given text hashes.
+
+        Parameters:
+            model (str): The embedding model name.
+            text_hashes (list[str]): Hashes of the normalized texts to look up.
+
+        Returns:
+            dict: A mapping of text hash to embedding (list of floats) for every hash found.
+        """
+        if not text_hashes:
+            return {}
+
+        with self.Session() as session:
+            entries = session.query(EmbeddingCacheEntry.text_hash, EmbeddingCacheEntry.embedding) \
+                .filter(EmbeddingCacheEntry.model == model) \
+                .filter(EmbeddingCacheEntry.text_hash.in_(list(text_hashes))) \
+                .all()
+            return {text_hash: self.unpack(embedding) for text_hash, embedding in entries}
+
+    def add_embeddings(self, model, embeddings):
+        """
+        Stores embeddings in the cache, ignoring hashes that are already cached.
+
+        Parameters:
+            model (str): The embedding model name.
+            embeddings (dict): A mapping of text hash to embedding (list of floats).
+        """
+        if not embeddings:
+            return
+
+        rows = [{"model": model, "text_hash": text_hash, "embedding": self.pack(embedding)}
+                for text_hash, embedding in embeddings.items()]
+        with self.Session() as session:
+            session.execute(insert(EmbeddingCacheEntry).values(rows).on_conflict_do_nothing())
+            session.commit()
+
+    def prune(self, max_age_days):
+        """
+        Deletes embeddings cached more than max_age_days ago.
+
+        Parameters:
+            max_age_days (float): Age in days of the oldest embeddings kept.
+
+        Returns:
+            int: The number of embeddings deleted.
+        """
+        cutoff = datetime.now(timezone.utc) - timedelta(days=max_age_days)
+        with self.Session() as session:
+            deleted = session.query(EmbeddingCacheEntry) \
+                .filter(EmbeddingCacheEntry.created_at < cutoff) \
+                .delete(synchronize_session=False)
+            session.commit()
+            return deleted
+
+    @staticmethod
+    def pack(embedding):
+        """Packs an embedding into float32 bytes."""
+        return array('f', embedding).tobytes()
+
+    @staticmethod
+    def unpack(data):
+        """Unpacks float32 bytes into an embedding (list of floats)."""
+        embedding = array('f')
+        embedding.frombytes(data)
+        return embedding.tolist()
@@ -1,13 +1,23 @@
 # database/models.py
 
-from sqlalchemy import Column, Integer, Text, DateTime
+from sqlalchemy import Column, Computed, Index, Integer, Text, DateTime, String, LargeBinary, UniqueConstraint
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.ext.declarative import declarative_base
-from pgvector.sqlalchemy import Vector
+from pgvector.sqlalchemy import Vector, HALFVEC
 from sqlalchemy.sql import func
+from .backends import get_embedding_dimensions, get_embedding_storage, get_text_search_config, is_partitioning_enabled
 
 # Base class for declarative class definitions
 Base = declarative_base()
 
+def get_embedding_column_type():
+    """
+    Returns the pgvector column type for stored embeddings, sized and typed from the configuration.
+    """
+    if get_embedding_storage() == 'halfvec':
+        return HALFVEC(get_embedding_dimensions())
+    return Vector(get_embedding_dimensions())
+
 class Conversation(Base):
     """
     Represents the 'conversations' table in the database.
@@ -19,11 +29,18 @@ class Conversation(Base):
     # Name of the table in the database
     __tablename__ = 'conversations'
 
+    # When partitioning is enabled the table is range-partitioned by month on created_at
+    # (see database/partitions.py). PostgreSQL requires the partition key in the primary key.
+    __table_args__ = (
+        Index('ix_conversations_response_tsv', 'response_tsv', postgresql_using='gin'),
+        {'postgresql_partition_by': 'RANGE (created_at)'} if is_partitioning_enabled() else {},
+    )
+
     # Columns of the table
-    id = Column(Integer, primary_key=True, 
+    id = Column(Integer, primary_key=True, autoincrement=True,
                 doc="The unique identifier for each conversation.")
     
-    created_at = Column(DateTime(timezone=True), server_default=func.now(),
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), primary_key=is_partitioning_enabled(),
                         doc="Timestamp when the conversation was created.")
     
     updated_at = Column(DateTime(timezone=True), onupdate=func.now(),
@@ -41,10 +58,16 @@ class Conversation(Base):
     response_tokens = Column(Integer, nullable=False, 
                     doc="The count of tokens in the users's prompt.")
                                      
-    response_embedding = Column(Vector(1536), nullable=False,
+    response_embedding = Column(get_embedding_column_type(), nullable=False,
                                  doc="The vector embedding of the user's prompt, "
                                      "representing linguistic features.")
 
+    summarized_by_id = Column(Integer, nullable=True, index=True,
+                              doc="The ID of the summary row this conversation part was compacted into, if any.")
+
+    response_tsv = Column(TSVECTOR, Computed(f"to_tsvector('{get_text_search_config()}', response)", persisted=True),
+                          doc="The full-text search vector of the response, maintained by the database.")
+
 class SystemState(Base):
     """
     Represents the 'system_state' table in the database.
@@ -67,4 +90,34 @@ class SystemState(Base):
                         doc="Timestamp when the system state was last updated.")
     
     last_wake_time = Column(Integer, nullable=True, 
-                        doc="The last time a request was received from the user.")
\ No newline at end of file
+                        doc="The last time a request was received from the user.")
+
+class EmbeddingCacheEntry(Base):
+    """
+    Represents the 'embedding_cache' table in the database.
+
+    This class defines the schema for caching text embeddings by model and normalized
+    text hash, so repeated utterances do not require a new embeddings API request.
+    """
+
+    # Name of the table in the database
+    __tablename__ = 'embedding_cache'
+    __table_args__ = (
+        UniqueConstraint('model', 'text_hash', name='uq_embedding_cache_model_text_hash'),
+    )
+
+    # Columns of the table
+    id = Column(Integer, primary_key=True,
+                doc="The unique identifier for each cached embedding.")
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now(),
+                        doc="Timestamp when the embedding was cached.")
+
+    model = Column(String(100), nullable=False,
+                   doc="The embedding model that produced the embedding.")
+
+    text_hash = Column(String(64), nullable=False,
+                       doc="SHA-256 hex digest of the normalized text.")
+
+    embedding = Column(LargeBinary, nullable=False,
+                       doc="The embedding vector, stored as packed float32 values.")
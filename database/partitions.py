@@ -0,0 +1,245 @@
+import logging
+import re
+from datetime import datetime, timezone
+from sqlalchemy import text
+from config import DATABASE_CONFIG
+from .connection import get_engine
+
+# Retention actions selectable through DATABASE_CONFIG['partition_retention_action'].
+#  - archive: detach expired partitions and move them into the archive schema.
+#  - detach: detach expired partitions, leaving them as standalone tables.
+#  - drop: detach and delete expired partitions.
+RETENTION_ACTIONS = ('archive', 'detach', 'drop')
+
+PARTITION_NAME_PATTERN = re.compile(r'^conversations_p(\d{4})_(\d{2})$')
+
+def month_start(value, offset=0):
+    """
+    Returns midnight UTC on the first day of the month containing value, shifted by offset months.
+
+    Args:
+        value (datetime): A timezone-aware datetime.
+        offset (int): Number of months to shift by (may be negative).
+    """
+    value = value.astimezone(timezone.utc)
+    month = value.year * 12 + value.month - 1 + offset
+    return datetime(month // 12, month % 12 + 1, 1, tzinfo=timezone.utc)
+
+def partition_name(month):
+    """
+    Returns the name of the partition holding the month starting at the given datetime.
+    """
+    return f"conversations_p{month:%Y_%m}"
+
+class ConversationPartitionManager:
+    """
+    Maintains monthly range partitions of the conversations table on created_at (PostgreSQL only).
+
+    Partitioning keeps each month's rows, indexes and vacuum work in a separate table. Queries
+    bounded on created_at (such as the recent window) only scan the matching partitions, and
+    expired months are removed by detaching a partition instead of running a large DELETE.
+
+    Attributes:
+        months_ahead (int): Number of future monthly partitions kept ready for new rows.
+        retention_months (int): Months of conversations kept attached; 0 keeps everything.
+        retention_action (str): What happens to expired partitions, one of RETENTION_ACTIONS.
+        archive_schema (str): Schema expired partitions are moved to by the 'archive' action.
+    """
+
+    # Catches rows outside every monthly partition, so inserts never fail if maintenance falls behind.
+    DEFAULT_PARTITION = 'conversations_default'
+
+    def __init__(self):
+        """
+        Initializes the manager with the shared engine and the partitioning settings.
+        """
+        self.engine = get_engine()
+        self.months_ahead = DATABASE_CONFIG.get('partition_months_ahead', 2)
+        self.retention_months = DATABASE_CONFIG.get('partition_retention_months', 0)
+        self.retention_action = DATABASE_CONFIG.get('partition_retention_action', 'archive')
+        self.archive_schema = DATABASE_CONFIG.get('partition_archive_schema', 'archive')
+        if self.retention_action not in RETENTION_ACTIONS:
+            raise ValueError(f"Unknown partition retention action '{self.retention_action}', expected one of {RETENTION_ACTIONS}")
+
+    @staticmethod
+    def is_partitioned(connection):
+        """
+        Returns True if the conversations table exists and is partitioned.
+        """
+        return connection.execute(text(
+            "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass('conversations'))"
+        )).scalar()
+
+    @staticmethod
+    def list_partitions(connection):
+        """
+        Returns the attached monthly partitions as (name, month start) pairs, oldest first.
+        """
+        names = connection.execute(text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE pg_inherits.inhparent = 'conversations'::regclass"
+        )).scalars()
+        partitions = []
+        for name in names:
+            match = PARTITION_NAME_PATTERN.match(name)
+            if match:
+                partitions.append((name, datetime(int(match.group(1)), int(match.group(2)), 1, tzinfo=timezone.utc)))
+        return sorted(partitions, key=lambda partition: partition[1])
+
+    @staticmethod
+    def stored_columns():
+        """
+        Returns the names of the conversations columns that are written, leaving out generated ones.
+        """
+        from .models import Conversation
+        return [column.name for column in Conversation.__table__.columns if column.computed is None]
+
+    def create_partition(self, connection, month):
+        """
+        Creates the partition for the month starting at the given datetime, unless it exists.
+
+        PostgreSQL refuses to create a partition for a range the default partition holds rows
+        of, e.g. after clock skew or while maintenance was not running. Such rows are moved out
+        of the default partition and into the new partition, within the caller's transaction.
+        """
+        name = partition_name(month)
+        if connection.execute(text("SELECT to_regclass(:name)"), {"name": name}).scalar() is not None:
+            return
+        bounds = {"start": month, "end": month_start(month, 1)}
+        in_range = "created_at >= :start AND created_at < :end"
+        misplaced = 0
+        if connection.execute(text("SELECT to_regclass(:name)"), {"name": self.DEFAULT_PARTITION}).scalar() is not None:
+            misplaced = connection.execute(text(f"SELECT count(*) FROM {self.DEFAULT_PARTITION} WHERE {in_range}"), bounds).scalar()
+        if misplaced:
+            connection.execute(text(
+                f"CREATE TEMPORARY TABLE misplaced_conversations AS SELECT * FROM {self.DEFAULT_PARTITION} WHERE {in_range}"
+            ), bounds)
+            connection.execute(text(f"DELETE FROM {self.DEFAULT_PARTITION} WHERE {in_range}"), bounds)
+        connection.execute(text(
+            f"CREATE TABLE {name} PARTITION OF conversations "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{month_start(month, 1).isoformat()}')"
+        ))
+        if misplaced:
+            columns = ", ".join(self.stored_columns())
+            connection.execute(text(f"INSERT INTO conversations ({columns}) SELECT {columns} FROM misplaced_conversations"))
+            connection.execute(text("DROP TABLE misplaced_conversations"))
+            logging.warning(f"Moved {misplaced} conversations from {self.DEFAULT_PARTITION} into the new partition {name}.")
+
+    def create_partitions(self, connection, first_month, last_month):
+        """
+        Creates the monthly partitions from first_month through last_month, skipping existing ones.
+        """
+        month = month_start(first_month)
+        while month <= last_month:
+            self.create_partition(connection, month)
+            month = month_start(month, 1)
+
+    def ensure_partitions(self, now=None):
+        """
+        Creates the partitions for the current month and the next months_ahead months.
+
+        Each month is created in its own transaction. A month that cannot be created is logged
+        and skipped, so it neither blocks the other months nor the retention policy.
+
+        Returns:
+            bool: False if the conversations table is not partitioned, True otherwise.
+        """
+        now = now or datetime.now(timezone.utc)
+        with self.engine.begin() as connection:
+            if not self.is_partitioned(connection):
+                return False
+        month = month_start(now)
+        while month <= month_start(now, self.months_ahead):
+            try:
+                with self.engine.begin() as connection:
+                    self.create_partition(connection, month)
+            except Exception as e:
+                logging.error(f"Could not create the conversation partition {partition_name(month)}: {e}")
+            month = month_start(month, 1)
+        with self.engine.begin() as connection:
+            connection.execute(text(f"CREATE TABLE IF NOT EXISTS {self.DEFAULT_PARTITION} PARTITION OF conversations DEFAULT"))
+        return True
+
+    def apply_retention(self, now=None):
+        """
+        Detaches (and archives or drops) the partitions older than retention_months.
+
+        Returns:
+            list[str]: Names of the partitions that were removed from the conversations table.
+        """
+        if not self.retention_months:
+            return []
+
+        cutoff = month_start(now or datetime.now(timezone.utc), -self.retention_months)
+        expired = []
+        with self.engine.begin() as connection:
+            if not self.is_partitioned(connection):
+                return []
+            for name, month in self.list_partitions(connection):
+                if month >= cutoff:
+                    break
+                connection.execute(text(f"ALTER TABLE conversations DETACH PARTITION {name}"))
+                if self.retention_action == 'archive':
+                    connection.execute(text(f"CREATE SCHEMA IF NOT EXISTS {self.archive_schema}"))
+                    connection.execute(text(f"ALTER TABLE {name} SET SCHEMA {self.archive_schema}"))
+                elif self.retention_action == 'drop':
+                    connection.execute(text(f"DROP TABLE {name}"))
+                expired.append(name)
+        return expired
+
+    def maintain(self, now=None):
+        """
+        Creates upcoming partitions and applies the retention policy.
+        """
+        if not self.ensure_partitions(now):
+            logging.warning("The conversations table is not partitioned; run scripts/partition_conversations.py to convert it.")
+            return
+        for name in self.apply_retention(now):
+            logging.info(f"Removed conversation partition {name} ({self.retention_action}) under the retention policy.")
+
+    def convert_table(self, keep_legacy=False):
+        """
+        Converts an existing, unpartitioned conversations table into a partitioned one.
+
+        The table is renamed, a partitioned table is created from the model, partitions covering
+        every stored month are created, and the rows are copied over in a single transaction.
+
+        Args:
+            keep_legacy (bool): Keep the original table as conversations_legacy instead of dropping it.
+
+        Returns:
+            int: The number of rows copied.
+        """
+        from .models import Conversation
+
+        with self.engine.begin() as connection:
+            if self.is_partitioned(connection):
+                return 0
+
+            # Free the index and constraint names for the new table.
+            connection.execute(text("ALTER TABLE conversations RENAME TO conversations_legacy"))
+            for index_name in connection.execute(text(
+                "SELECT indexname FROM pg_indexes WHERE tablename = 'conversations_legacy'"
+            )).scalars().all():
+                connection.execute(text(f"ALTER INDEX {index_name} RENAME TO {index_name}_legacy"))
+
+            Conversation.__table__.create(connection)
+            oldest = connection.execute(text("SELECT min(created_at) FROM conversations_legacy")).scalar()
+            now = datetime.now(timezone.utc)
+            self.create_partitions(connection, oldest or now, month_start(now, self.months_ahead))
+            connection.execute(text(f"CREATE TABLE {self.DEFAULT_PARTITION} PARTITION OF conversations DEFAULT"))
+
+            # created_at is part of the partitioned table's primary key, so it can no longer be NULL.
+            columns = self.stored_columns()
+            values = ["COALESCE(created_at, now())" if column == 'created_at' else column for column in columns]
+            copied = connection.execute(text(
+                f"INSERT INTO conversations ({', '.join(columns)}) SELECT {', '.join(values)} FROM conversations_legacy"
+            )).rowcount
+            connection.execute(text(
+                "SELECT setval(pg_get_serial_sequence('conversations', 'id'), "
+                "GREATEST((SELECT max(id) FROM conversations), 1))"
+            ))
+            if not keep_legacy:
+                connection.execute(text("DROP TABLE conversations_legacy"))
+        return copied
@@ -1,5 +1,7 @@
+from .backends import get_text_search_config, is_partitioning_enabled
 from .connection import get_engine
 from .models import Base
+from .partitions import ConversationPartitionManager
 from sqlalchemy import text
 
 class DatabaseSetup:
@@ -8,6 +10,17 @@ class DatabaseSetup:
     for ensuring that all defined tables in SQLAlchemy models are created in the database.
     """
 
+    # Schema changes for tables created by earlier versions. create_all() only creates missing
+    # tables, so columns added to existing models are applied here. Every statement must be idempotent.
+    # {text_search_config} is replaced with DATABASE_CONFIG['text_search_config'].
+    MIGRATIONS = [
+        "ALTER TABLE conversations ADD COLUMN IF NOT EXISTS summarized_by_id INTEGER",
+        "CREATE INDEX IF NOT EXISTS ix_conversations_summarized_by_id ON conversations (summarized_by_id)",
+        "ALTER TABLE conversations ADD COLUMN IF NOT EXISTS response_tsv tsvector "
+        "GENERATED ALWAYS AS (to_tsvector('{text_search_config}', response)) STORED",
+        "CREATE INDEX IF NOT EXISTS ix_conversations_response_tsv ON conversations USING GIN (response_tsv)",
+    ]
+
     @staticmethod
     def initial_setup():
         """
@@ -31,3 +44,21 @@ class DatabaseSetup:
         # Create all tables in the database defined in the SQLAlchemy models
         # This will have no effect on existing tables that match the model definitions
         Base.metadata.create_all(engine)
+
+        DatabaseSetup.apply_migrations(engine)
+
+        # Create the partitions for the coming months. The Celery beat schedule keeps them ahead afterwards.
+        if is_partitioning_enabled():
+            ConversationPartitionManager().maintain()
+
+    @staticmethod
+    def apply_migrations(engine):
+        """
+        Brings tables created by earlier versions up to date with the current models.
+
+        Args:
+            engine: The SQLAlchemy engine to run the migrations with.
+        """
+        with engine.begin() as connection:
+            for statement in DatabaseSetup.MIGRATIONS:
+                connection.execute(text(statement.format(text_search_config=get_text_search_config())))
@@ -0,0 +1,45 @@
+import os
+import sqlite3
+import threading
+from config import DATABASE_CONFIG
+
+# sqlite3 connections must not be shared between threads or across a fork, so each
+# thread of each process keeps its own connection to the database file.
+_local = threading.local()
+
+def get_sqlite_path():
+    """
+    Returns the path of the SQLite database file, read from DATABASE_CONFIG.
+    """
+    return DATABASE_CONFIG.get('sqlite_path', 'data/osiris.sqlite3')
+
+def get_sqlite_connection():
+    """
+    Returns the SQLite connection for the current thread, opening it on first use.
+
+    Connections use write-ahead logging so the main process can read while a background
+    worker writes, and wait on locks instead of failing immediately.
+
+    Returns:
+        sqlite3.Connection: A connection whose rows support access by column name.
+    """
+    connection = getattr(_local, 'connection', None)
+    if connection is None or getattr(_local, 'pid', None) != os.getpid():
+        path = get_sqlite_path()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        connection = sqlite3.connect(path, timeout=DATABASE_CONFIG.get('pool_timeout', 30))
+        connection.row_factory = sqlite3.Row
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        _local.connection = connection
+        _local.pid = os.getpid()
+    return connection
+
+def reset_sqlite_connection():
+    """
+    Forgets the current thread's connection. Connections inherited through a fork are
+    replaced automatically, so this is only needed to force a reconnect.
+    """
+    _local.connection = None
+    _local.pid = None
@@ -0,0 +1,326 @@
+import fcntl
+import re
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from config import CONVERSATIONS_CONFIG, DATABASE_CONFIG
+from database.backends import get_embedding_dimensions
+from .connection import get_sqlite_connection, get_sqlite_path
+from .embedding_matrix import EmbeddingMatrix
+
+# Columns of a conversation record, matching the Conversation model.
+COLUMNS = ('id', 'created_at', 'updated_at', 'speaker_type', 'speaker_metadata', 'response',
+           'response_tokens', 'response_embedding', 'summarized_by_id')
+
+# Columns that may be changed through update_conversation.
+UPDATABLE_COLUMNS = ('speaker_type', 'speaker_metadata', 'response', 'response_tokens', 'summarized_by_id')
+
+_embedding_matrix = None
+
+def get_embedding_matrix():
+    """
+    Returns the process-wide embedding matrix for the conversations table.
+    """
+    global _embedding_matrix
+    if _embedding_matrix is None:
+        _embedding_matrix = EmbeddingMatrix(
+            DATABASE_CONFIG.get('sqlite_embedding_path', get_sqlite_path() + '.embeddings'),
+            get_embedding_dimensions(),
+            DATABASE_CONFIG.get('sqlite_embedding_dtype', 'float32'),
+        )
+    return _embedding_matrix
+
+def to_timestamp(value):
+    """Converts a datetime (or None) to seconds since the epoch."""
+    return value.timestamp() if isinstance(value, datetime) else value
+
+def to_record(row, embedding=None):
+    """
+    Converts a SQLite row into an object with the same attributes as the Conversation model.
+    """
+    record = SimpleNamespace(**dict(row))
+    for field in ('created_at', 'updated_at'):
+        if getattr(record, field, None) is not None:
+            setattr(record, field, datetime.fromtimestamp(getattr(record, field), tz=timezone.utc))
+    if embedding is not None:
+        record.response_embedding = embedding
+    return record
+
+class SQLiteConversationMemoryManager:
+    """
+    Manages conversation storage in an embedded SQLite database, for deployments without PostgreSQL.
+
+    This class provides the same interface as database.conversations.ConversationMemoryManager.
+    Rows live in SQLite; embeddings live in a memory-mapped matrix (see EmbeddingMatrix), where
+    similarity search is a vectorized NumPy operation.
+    """
+
+    def __init__(self):
+        """
+        Initializes the manager with the current thread's connection and the shared embedding matrix.
+        """
+        self.embeddings = get_embedding_matrix()
+
+    @property
+    def connection(self):
+        return get_sqlite_connection()
+
+    def add_conversation(self, speaker_type, response, response_embedding, response_tokens):
+        """
+        Adds a new conversation part to the database.
+        """
+        self.add_conversations([{
+            "speaker_type": speaker_type,
+            "response": response,
+            "response_embedding": response_embedding,
+            "response_tokens": response_tokens,
+        }])
+
+    def add_conversations(self, conversations):
+        """
+        Adds several conversation parts in a single transaction.
+
+        Parameters:
+            conversations (list[dict]): Rows with speaker_type, response, response_embedding,
+                                        response_tokens and optionally created_at.
+
+        Returns:
+            list[int]: The IDs of the new rows.
+        """
+        if not conversations:
+            return []
+
+        ids = []
+        with self.connection as connection:
+            for row in conversations:
+                cursor = connection.execute(
+                    "INSERT INTO conversations (created_at, speaker_type, response, response_tokens, summarized_by_id) "
+                    "VALUES (COALESCE(?, (julianday('now') - 2440587.5) * 86400.0), ?, ?, ?, ?)",
+                    (to_timestamp(row.get("created_at")), row["speaker_type"], row["response"],
+                     row["response_tokens"], row.get("summarized_by_id")),
+                )
+                ids.append(cursor.lastrowid)
+        self.embeddings.write(ids, [row["response_embedding"] for row in conversations])
+        return ids
+
+    def get_conversation(self, conversation_id):
+        """
+        Retrieves a conversation from the database by its ID.
+        """
+        row = self.connection.execute("SELECT * FROM conversations WHERE id = ?", (conversation_id,)).fetchone()
+        return to_record(row, self.embeddings.read(conversation_id)) if row else None
+
+    def update_conversation(self, conversation_id, **updates):
+        """
+        Updates a conversation based on the provided conversation ID and update fields.
+        """
+        embedding = updates.pop('response_embedding', None)
+        columns = [column for column in updates if column in UPDATABLE_COLUMNS]
+        if columns:
+            assignments = ", ".join(f"{column} = ?" for column in columns)
+            with self.connection as connection:
+                connection.execute(
+                    f"UPDATE conversations SET {assignments}, updated_at = (julianday('now') - 2440587.5) * 86400.0 WHERE id = ?",
+                    [updates[column] for column in columns] + [conversation_id],
+                )
+        if embedding is not None:
+            self.embeddings.write([conversation_id], [embedding])
+
+    def delete_conversation(self, conversation_id):
+        """
+        Deletes a conversation from the database.
+        """
+        with self.connection as connection:
+            connection.execute("DELETE FROM conversations WHERE id = ?", (conversation_id,))
+        self.embeddings.clear([conversation_id])
+
+    def list_conversations(self, after_date=None, before_date=None):
+        """
+        Lists all conversations in the database within a specified date range.
+        """
+        query = "SELECT * FROM conversations WHERE 1 = 1"
+        parameters = []
+        if after_date:
+            query += " AND created_at >= ?"
+            parameters.append(to_timestamp(after_date))
+        if before_date:
+            query += " AND created_at <= ?"
+            parameters.append(to_timestamp(before_date))
+        query += " ORDER BY created_at ASC"
+        return [to_record(row, self.embeddings.read(row["id"])) for row in self.connection.execute(query, parameters)]
+
+    def iter_conversation_batches(self, columns=None, after_date=None, before_date=None, batch_size=1000):
+        """
+        Streams conversations in batches, without loading the whole table into memory.
+
+        Parameters:
+            columns (list[str]): Optional. Column names to select; defaults to every column.
+                                 'response_embedding' is read from the embedding matrix.
+            after_date (datetime): Optional. Retrieve conversations after this date.
+            before_date (datetime): Optional. Retrieve conversations before this date.
+            batch_size (int): Number of rows per batch.
+
+        Yields:
+            list[tuple]: Rows with the requested columns, in the requested order, ordered by ID.
+        """
+        columns = columns or list(COLUMNS)
+        unknown = [column for column in columns if column not in COLUMNS]
+        if unknown:
+            raise ValueError(f"Unknown conversation columns: {unknown}")
+
+        selected = ["id"] + [column for column in columns if column not in ("id", "response_embedding")]
+        query = f"SELECT {', '.join(selected)} FROM conversations WHERE 1 = 1"
+        parameters = []
+        if after_date:
+            query += " AND created_at >= ?"
+            parameters.append(to_timestamp(after_date))
+        if before_date:
+            query += " AND created_at <= ?"
+            parameters.append(to_timestamp(before_date))
+        query += " ORDER BY id ASC"
+
+        cursor = get_sqlite_connection().execute(query, parameters)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            batch = []
+            for row in rows:
+                record = to_record(row)
+                if "response_embedding" in columns:
+                    record.response_embedding = self.embeddings.read(row["id"])
+                batch.append(tuple(getattr(record, column) for column in columns))
+            yield batch
+
+    def list_recent_conversations(self, context_limit):
+        """
+        Lists recent conversations such that their total token count is close to the context limit.
+        Summaries and already summarized turns are excluded.
+        """
+        rows = self.connection.execute(
+            "SELECT * FROM ("
+            "  SELECT *, SUM(response_tokens) OVER (ORDER BY created_at DESC, id DESC) AS running_total"
+            "  FROM conversations WHERE speaker_type != ? AND summarized_by_id IS NULL"
+            ") WHERE running_total <= ? ORDER BY created_at ASC, id ASC",
+            (CONVERSATIONS_CONFIG.get("summary", 3), context_limit),
+        ).fetchall()
+        return [to_record(row) for row in rows]
+
+    def get_latest_summary(self):
+        """
+        Retrieves the current rolling summary of older conversation turns, or None.
+        """
+        row = self.connection.execute(
+            "SELECT * FROM conversations WHERE speaker_type = ? AND summarized_by_id IS NULL "
+            "ORDER BY created_at DESC, id DESC LIMIT 1",
+            (CONVERSATIONS_CONFIG.get("summary", 3),),
+        ).fetchone()
+        return to_record(row) if row else None
+
+    def list_compactable_conversations(self, keep_recent_tokens):
+        """
+        Lists the unsummarized turns outside the most recent keep_recent_tokens, oldest first.
+        """
+        rows = self.connection.execute(
+            "SELECT id, speaker_type, response, response_tokens FROM ("
+            "  SELECT *, SUM(response_tokens) OVER (ORDER BY created_at DESC, id DESC) AS running_total"
+            "  FROM conversations WHERE speaker_type != ? AND summarized_by_id IS NULL"
+            ") WHERE running_total > ? ORDER BY created_at ASC, id ASC",
+            (CONVERSATIONS_CONFIG.get("summary", 3), keep_recent_tokens),
+        ).fetchall()
+        return [to_record(row) for row in rows]
+
+    def add_summary(self, response, response_embedding, response_tokens, compacted_ids):
+        """
+        Stores a new rolling summary and marks the turns (and previous summary) it replaces.
+        """
+        summary_id, = self.add_conversations([{
+            "speaker_type": CONVERSATIONS_CONFIG.get("summary", 3),
+            "response": response,
+            "response_embedding": response_embedding,
+            "response_tokens": response_tokens,
+        }])
+        with self.connection as connection:
+            connection.executemany(
+                "UPDATE conversations SET summarized_by_id = ? WHERE id = ?",
+                [(summary_id, conversation_id) for conversation_id in compacted_ids],
+            )
+
+    @contextmanager
+    def summary_lock(self):
+        """
+        Context manager that holds a lock across processes while a summary is being built.
+
+        Yields:
+            bool: True if the lock was acquired, False if another worker holds it.
+        """
+        with open(get_sqlite_path() + '.summary.lock', 'a') as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def find_similar_conversations(self, embedding, limit=5):
+        """
+        Finds the conversation parts most similar to the given embedding.
+
+        Parameters:
+            embedding (list): The query embedding.
+            limit (int): Maximum number of results.
+
+        Returns:
+            List of (Conversation, similarity) tuples, most similar first.
+        """
+        # Oversample so rows deleted since their embedding was written can be dropped.
+        matches = self.embeddings.search(embedding, limit * 2)
+        if not matches:
+            return []
+        placeholders = ", ".join("?" for _ in matches)
+        rows = {row["id"]: row for row in self.connection.execute(
+            f"SELECT * FROM conversations WHERE id IN ({placeholders})", [match[0] for match in matches])}
+        return [(to_record(rows[conversation_id]), similarity)
+                for conversation_id, similarity in matches if conversation_id in rows][:limit]
+
+    def hybrid_search(self, query_text, embedding, limit=5, candidates=50, rrf_k=60):
+        """
+        Finds the conversation parts that best match a query by keyword and by meaning.
+
+        The keyword ranking comes from the conversations_fts index (BM25), the semantic ranking from
+        the embedding matrix. They are fused with reciprocal rank fusion: each part scores
+        1 / (rrf_k + rank) in every ranking it appears in.
+
+        Parameters:
+            query_text (str): The query text.
+            embedding (list): The embedding of the query text.
+            limit (int): Maximum number of results.
+            candidates (int): Number of top results taken from each ranking before fusion.
+            rrf_k (int): Reciprocal rank fusion constant; higher values flatten the rank weights.
+
+        Returns:
+            List of (Conversation, score) tuples, best match first.
+        """
+        # Quote every word so FTS5 operators in the query are matched as plain text.
+        words = ['"' + word + '"' for word in re.findall(r"\w+", query_text)]
+        keyword_ids = [row["rowid"] for row in self.connection.execute(
+            "SELECT rowid FROM conversations_fts WHERE conversations_fts MATCH ? ORDER BY bm25(conversations_fts) LIMIT ?",
+            (" OR ".join(words), candidates))] if words else []
+        semantic_ids = [conversation_id for conversation_id, _ in self.embeddings.search(embedding, candidates)]
+
+        scores = {}
+        for ranking in (keyword_ids, semantic_ids):
+            for rank, conversation_id in enumerate(ranking, start=1):
+                scores[conversation_id] = scores.get(conversation_id, 0.0) + 1.0 / (rrf_k + rank)
+        # Oversample so rows deleted since their embedding was written can be dropped.
+        best = sorted(scores, key=scores.get, reverse=True)[:limit * 2]
+        if not best:
+            return []
+        placeholders = ", ".join("?" for _ in best)
+        rows = {row["id"]: row for row in self.connection.execute(
+            f"SELECT * FROM conversations WHERE id IN ({placeholders})", best)}
+        return [(to_record(rows[conversation_id]), scores[conversation_id])
+                for conversation_id in best if conversation_id in rows][:limit]
@@ -0,0 +1,66 @@
+import time
+from array import array
+from .connection import get_sqlite_connection
+
+class SQLiteEmbeddingCacheStore:
+    """
+    Manages the embedding_cache table in the embedded SQLite database.
+
+    This class provides the same interface as database.embedding_cache.EmbeddingCacheStore.
+    """
+
+    @property
+    def connection(self):
+        return get_sqlite_connection()
+
+    def get_embeddings(self, model, text_hashes):
+        """
+        Retrieves cached embeddings for the given text hashes.
+
+        Returns:
+            dict: A mapping of text hash to embedding (list of floats) for every hash found.
+        """
+        if not text_hashes:
+            return {}
+        text_hashes = list(text_hashes)
+        placeholders = ", ".join("?" for _ in text_hashes)
+        rows = self.connection.execute(
+            f"SELECT text_hash, embedding FROM embedding_cache WHERE model = ? AND text_hash IN ({placeholders})",
+            [model] + text_hashes,
+        )
+        return {row["text_hash"]: self.unpack(row["embedding"]) for row in rows}
+
+    def add_embeddings(self, model, embeddings):
+        """
+        Stores embeddings in the cache, ignoring hashes that are already cached.
+        """
+        if not embeddings:
+            return
+        with self.connection as connection:
+            connection.executemany(
+                "INSERT OR IGNORE INTO embedding_cache (model, text_hash, embedding) VALUES (?, ?, ?)",
+                [(model, text_hash, self.pack(embedding)) for text_hash, embedding in embeddings.items()],
+            )
+
+    def prune(self, max_age_days):
+        """
+        Deletes embeddings cached more than max_age_days ago.
+
+        Returns:
+            int: The number of embeddings deleted.
+        """
+        with self.connection as connection:
+            return connection.execute("DELETE FROM embedding_cache WHERE created_at < ?",
+                                      (time.time() - max_age_days * 86400,)).rowcount
+
+    @staticmethod
+    def pack(embedding):
+        """Packs an embedding into float32 bytes."""
+        return array('f', embedding).tobytes()
+
+    @staticmethod
+    def unpack(data):
+        """Unpacks float32 bytes into an embedding (list of floats)."""
+        embedding = array('f')
+        embedding.frombytes(data)
+        return embedding.tolist()
@@ -0,0 +1,175 @@
+import fcntl
+import os
+import threading
+from contextlib import contextmanager
+import numpy as np
+
+class EmbeddingMatrix:
+    """
+    A memory-mapped matrix of embeddings with vectorized cosine top-k search.
+
+    Row i of the matrix holds the embedding of the conversation with ID i. Embeddings are
+    L2-normalized when written, so cosine similarity is a single matrix-vector product. The file
+    grows in chunks and is shared between processes through the page cache; a process notices
+    that another one grew the file and remaps it.
+
+    Attributes:
+        path (str): Path of the matrix file.
+        dimensions (int): Number of dimensions per embedding.
+        dtype (numpy.dtype): Storage type, float32 or float16.
+    """
+
+    # Minimum number of rows added when the file grows.
+    GROWTH_ROWS = 1024
+
+    # Rows scored per block when searching, bounding the temporary float32 copy of float16 data.
+    SEARCH_BLOCK_ROWS = 65536
+
+    def __init__(self, path, dimensions, dtype='float32'):
+        """
+        Opens (or creates) the matrix file.
+
+        Args:
+            path (str): Path of the matrix file.
+            dimensions (int): Number of dimensions per embedding.
+            dtype (str): 'float32' or 'float16'.
+        """
+        self.path = path
+        self.dimensions = dimensions
+        self.dtype = np.dtype(dtype)
+        self.row_bytes = self.dimensions * self.dtype.itemsize
+        self.matrix = None
+        self.mapped_bytes = 0
+        self.lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.remap()
+
+    @property
+    def capacity(self):
+        """Number of rows currently mapped."""
+        return 0 if self.matrix is None else self.matrix.shape[0]
+
+    def remap(self):
+        """
+        Maps the file again if its size changed since it was last mapped.
+        """
+        size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        if size == self.mapped_bytes and (self.matrix is not None or size == 0):
+            return
+        rows = size // self.row_bytes
+        self.matrix = np.memmap(self.path, dtype=self.dtype, mode='r+', shape=(rows, self.dimensions)) if rows else None
+        self.mapped_bytes = size
+
+    @contextmanager
+    def file_lock(self):
+        """
+        Holds an exclusive lock on the matrix across processes while the file is resized.
+        """
+        with open(self.path + '.lock', 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def ensure_capacity(self, rows):
+        """
+        Grows the file so it holds at least the given number of rows.
+        """
+        self.remap()
+        if rows <= self.capacity:
+            return
+        with self.file_lock():
+            self.remap()
+            if rows <= self.capacity:
+                return
+            new_rows = max(rows, self.capacity * 2, self.GROWTH_ROWS)
+            with open(self.path, 'ab') as matrix_file:
+                matrix_file.truncate(new_rows * self.row_bytes)
+            self.remap()
+
+    @staticmethod
+    def normalize(vectors):
+        """
+        Returns the vectors as float32, scaled to unit length. Zero vectors are left as zeros.
+        """
+        vectors = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        return np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+
+    def write(self, ids, embeddings):
+        """
+        Stores embeddings at the given row IDs.
+
+        Args:
+            ids (list[int]): The conversation IDs.
+            embeddings (list): The embeddings, in the same order as ids.
+        """
+        if not ids:
+            return
+        with self.lock:
+            self.ensure_capacity(max(ids) + 1)
+            self.matrix[np.asarray(ids)] = self.normalize(embeddings).astype(self.dtype)
+            self.matrix.flush()
+
+    def read(self, conversation_id):
+        """
+        Returns the stored (normalized) embedding for a conversation ID, or None if there is none.
+        """
+        with self.lock:
+            self.remap()
+            if conversation_id >= self.capacity:
+                return None
+            return np.array(self.matrix[conversation_id], dtype=np.float32)
+
+    def clear(self, ids):
+        """
+        Zeroes the rows for the given IDs so they never match a search.
+        """
+        with self.lock:
+            self.remap()
+            ids = [i for i in ids if i < self.capacity]
+            if ids:
+                self.matrix[np.asarray(ids)] = 0
+                self.matrix.flush()
+
+    def search(self, query, limit, candidate_ids=None):
+        """
+        Finds the rows most similar to the query by cosine similarity.
+
+        Args:
+            query (list): The query embedding.
+            limit (int): Maximum number of results.
+            candidate_ids (list[int], optional): Restrict the search to these row IDs.
+
+        Returns:
+            list[tuple[int, float]]: (row ID, cosine similarity) pairs, most similar first.
+                                     Empty rows are never returned.
+        """
+        query = self.normalize(query)
+        with self.lock:
+            self.remap()
+            if self.matrix is None or limit <= 0:
+                return []
+
+            if candidate_ids is not None:
+                ids = np.asarray([i for i in candidate_ids if i < self.capacity], dtype=np.int64)
+                if ids.size == 0:
+                    return []
+                scores = self.matrix[ids].astype(np.float32) @ query
+            else:
+                ids = None
+                scores = np.empty(self.capacity, dtype=np.float32)
+                for start in range(0, self.capacity, self.SEARCH_BLOCK_ROWS):
+                    block = self.matrix[start:start + self.SEARCH_BLOCK_ROWS]
+                    scores[start:start + block.shape[0]] = block.astype(np.float32) @ query
+
+        # Empty rows are all zeros and score exactly 0; never let them through.
+        valid = np.flatnonzero(scores != 0)
+        if valid.size == 0:
+            return []
+        top = valid[np.argpartition(-scores[valid], min(limit, valid.size) - 1)[:limit]]
+        top = top[np.argsort(-scores[top])]
+        row_ids = ids[top] if ids is not None else top
+        return [(int(row_id), float(scores[index])) for row_id, index in zip(row_ids, top)]
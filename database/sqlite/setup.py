@@ -0,0 +1,75 @@
+from .connection import get_sqlite_connection
+
+class SQLiteDatabaseSetup:
+    """
+    This class is responsible for creating the schema of the embedded SQLite database.
+    """
+
+    # Timestamps are stored as seconds since the epoch.
+    SCHEMA = [
+        """
+        CREATE TABLE IF NOT EXISTS conversations (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            created_at REAL NOT NULL DEFAULT ((julianday('now') - 2440587.5) * 86400.0),
+            updated_at REAL,
+            speaker_type INTEGER NOT NULL,
+            speaker_metadata TEXT,
+            response TEXT NOT NULL,
+            response_tokens INTEGER NOT NULL,
+            summarized_by_id INTEGER
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS ix_conversations_created_at ON conversations (created_at)",
+        "CREATE INDEX IF NOT EXISTS ix_conversations_speaker_type ON conversations (speaker_type)",
+        "CREATE INDEX IF NOT EXISTS ix_conversations_summarized_by_id ON conversations (summarized_by_id)",
+        # Full-text index of the responses, kept in sync with the conversations table by triggers.
+        "CREATE VIRTUAL TABLE IF NOT EXISTS conversations_fts USING fts5(response, content='conversations', content_rowid='id')",
+        """
+        CREATE TRIGGER IF NOT EXISTS conversations_fts_insert AFTER INSERT ON conversations BEGIN
+            INSERT INTO conversations_fts (rowid, response) VALUES (new.id, new.response);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS conversations_fts_delete AFTER DELETE ON conversations BEGIN
+            INSERT INTO conversations_fts (conversations_fts, rowid, response) VALUES ('delete', old.id, old.response);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS conversations_fts_update AFTER UPDATE OF response ON conversations BEGIN
+            INSERT INTO conversations_fts (conversations_fts, rowid, response) VALUES ('delete', old.id, old.response);
+            INSERT INTO conversations_fts (rowid, response) VALUES (new.id, new.response);
+        END
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS system_state (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            created_at REAL NOT NULL DEFAULT ((julianday('now') - 2440587.5) * 86400.0),
+            updated_at REAL,
+            last_wake_time REAL
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS embedding_cache (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            created_at REAL NOT NULL DEFAULT ((julianday('now') - 2440587.5) * 86400.0),
+            model TEXT NOT NULL,
+            text_hash TEXT NOT NULL,
+            embedding BLOB NOT NULL,
+            UNIQUE (model, text_hash)
+        )
+        """,
+    ]
+
+    @staticmethod
+    def initial_setup():
+        """
+        Creates any tables and indexes that do not exist yet. Safe to run on every start.
+        """
+        with get_sqlite_connection() as connection:
+            has_fts = connection.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'conversations_fts'").fetchone()
+            for statement in SQLiteDatabaseSetup.SCHEMA:
+                connection.execute(statement)
+            if not has_fts:
+                # Index the conversations stored before the full-text index existed.
+                connection.execute("INSERT INTO conversations_fts (conversations_fts) VALUES ('rebuild')")
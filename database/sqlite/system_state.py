@@ -0,0 +1,45 @@
+from .connection import get_sqlite_connection
+from .conversations import to_record
+
+# Columns that may be changed through update_system_state.
+UPDATABLE_COLUMNS = ('last_wake_time',)
+
+class SQLiteSystemStateManager:
+    """
+    Manages the system_state table in the embedded SQLite database.
+
+    This class provides the same interface as database.system_state.SystemStateManager.
+    """
+
+    @property
+    def connection(self):
+        return get_sqlite_connection()
+
+    def get_or_create_state(self):
+        """
+        Retrieves the current system state from the database, or creates it if it doesn't exist.
+        """
+        with self.connection as connection:
+            row = connection.execute("SELECT * FROM system_state ORDER BY id LIMIT 1").fetchone()
+            if not row:
+                connection.execute("INSERT INTO system_state DEFAULT VALUES")
+                row = connection.execute("SELECT * FROM system_state ORDER BY id LIMIT 1").fetchone()
+        return to_record(row)
+
+    def update_system_state(self, **updates):
+        """
+        Updates the system state in the database.
+
+        Parameters:
+            **updates: Arbitrary keyword arguments representing the fields to update and their new values.
+        """
+        columns = [column for column in updates if column in UPDATABLE_COLUMNS]
+        if not columns:
+            return
+        state = self.get_or_create_state()
+        assignments = ", ".join(f"{column} = ?" for column in columns)
+        with self.connection as connection:
+            connection.execute(
+                f"UPDATE system_state SET {assignments}, updated_at = (julianday('now') - 2440587.5) * 86400.0 WHERE id = ?",
+                [updates[column] for column in columns] + [state.id],
+            )
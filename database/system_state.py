@@ -1,6 +1,5 @@
-from sqlalchemy.orm import sessionmaker
 from .models import SystemState, Base
-from .connection import get_engine
+from .connection import get_session_factory
 
 class SystemStateManager:
     """
@@ -10,16 +9,15 @@ class SystemStateManager:
 
     def __init__(self):
         """
-        Initializes the SystemStateManager with a database session.
+        Initializes the SystemStateManager with the shared database session factory.
         """
-        self.engine = get_engine()
+        self.Session = get_session_factory()
 
     def get_or_create_state(self):
         """
         Retrieves the current system state from the database, or creates it if it doesn't exist.
         """
-        Session = sessionmaker(bind=self.engine)
-        with Session() as session:
+        with self.Session() as session:
             state = session.query(SystemState).first()
             if not state:
                 state = SystemState()
@@ -39,8 +37,7 @@ class SystemStateManager:
             
             update_system_state(last_wake_time=datetime.now())
         """
-        Session = sessionmaker(bind=self.engine)
-        with Session() as session:
+        with self.Session() as session:
             state = session.query(SystemState).first()
             if not state:
                 state = SystemState()
@@ -0,0 +1,134 @@
+import logging
+import threading
+from types import MappingProxyType
+from config import DATABASE_CONFIG
+from .backends import get_system_state_manager
+
+class SystemStateStore:
+    """
+    An in-process store for hot system state (wake time, active session, ...) in front of
+    the system_state table.
+
+    Reads never take a lock: the current state is an immutable snapshot that writers replace
+    atomically, so tools can read it in microseconds from any thread. Fields that have a column
+    in system_state are persisted by a background thread. Writes are debounced and coalesced,
+    so a burst of updates results in a single database write of the latest values.
+
+    Attributes:
+        persist_interval (float): Seconds to wait after a change before persisting, coalescing further changes.
+        snapshot (MappingProxyType): The current, read-only state.
+    """
+
+    # State fields backed by a column in the system_state table. Other fields live in memory only.
+    PERSISTED_FIELDS = ('last_wake_time',)
+
+    def __init__(self, persist_interval=None):
+        """
+        Initializes the store and starts its persistence thread.
+
+        Args:
+            persist_interval (float, optional): Overrides DATABASE_CONFIG['system_state_persist_interval'].
+        """
+        self.persist_interval = persist_interval or DATABASE_CONFIG.get('system_state_persist_interval', 2.0)
+        self.snapshot = MappingProxyType({})
+        self.state_manager = get_system_state_manager()
+        self.write_lock = threading.Lock()
+        self.dirty = threading.Event()
+        self.shutdown_event = threading.Event()
+        self.persisted = {}
+
+        self.persist_thread = threading.Thread(target=self.run, daemon=True)
+        self.persist_thread.start()
+
+    def get(self, key, default=None):
+        """
+        Returns the current value of a state field without locking.
+
+        Args:
+            key (str): The state field name.
+            default: Value returned when the field is not set.
+        """
+        return self.snapshot.get(key, default)
+
+    def update(self, **updates):
+        """
+        Updates state fields, scheduling a debounced write if any persisted field changed.
+
+        Args:
+            **updates: The state fields to update and their new values.
+        """
+        with self.write_lock:
+            state = dict(self.snapshot)
+            state.update(updates)
+            self.snapshot = MappingProxyType(state)
+        if any(field in updates for field in self.PERSISTED_FIELDS):
+            self.dirty.set()
+
+    def load(self):
+        """
+        Seeds the store from the system_state table. Fields already set in memory are kept,
+        since they are newer than anything in the database.
+        """
+        try:
+            state = self.state_manager.get_or_create_state()
+        except Exception as e:
+            logging.error(f"Error loading the system state: {e}")
+            return
+
+        stored = {field: getattr(state, field) for field in self.PERSISTED_FIELDS}
+        with self.write_lock:
+            self.persisted = dict(stored)
+            self.snapshot = MappingProxyType({**stored, **self.snapshot})
+
+    def run(self):
+        """
+        Loads the stored state, then persists changes at most once per persist_interval.
+        """
+        self.load()
+        while not self.shutdown_event.is_set():
+            self.dirty.wait()
+            # Let further updates accumulate so they are written together.
+            self.shutdown_event.wait(timeout=self.persist_interval)
+            self.dirty.clear()
+            self.persist()
+
+    def persist(self):
+        """
+        Writes the persisted fields that changed since the last write.
+        """
+        snapshot = self.snapshot
+        updates = {field: snapshot[field] for field in self.PERSISTED_FIELDS
+                   if field in snapshot and snapshot[field] != self.persisted.get(field)}
+        if not updates:
+            return
+        try:
+            self.state_manager.update_system_state(**updates)
+            self.persisted.update(updates)
+        except Exception as e:
+            logging.error(f"Error persisting the system state, will retry: {e}")
+            self.dirty.set()
+
+    def shutdown(self):
+        """
+        Stops the persistence thread and writes any pending changes.
+        """
+        self.shutdown_event.set()
+        self.dirty.set()
+        self.persist_thread.join(timeout=self.persist_interval + 1)
+        self.persist()
+
+_system_state_store = None
+_system_state_store_lock = threading.Lock()
+
+def get_system_state_store():
+    """
+    Returns the process-wide system state store, creating it on first use.
+
+    Returns:
+        SystemStateStore: The shared system state store.
+    """
+    global _system_state_store
+    with _system_state_store_lock:
+        if _system_state_store is None:
+            _system_state_store = SystemStateStore()
+        return _system_state_store
@@ -82,6 +82,7 @@ if [ "$OS_TYPE" = "Darwin" ]; then
 fi
 pip install SQLAlchemy
 pip install psycopg2-binary
+pip install asyncpg
 pip install celery redis
 pip install openai
 pip3 install asyncio
@@ -0,0 +1,220 @@
+import hashlib
+import logging
+import re
+import threading
+from array import array
+from collections import OrderedDict
+from config import OPENAI_SETTINGS
+from database.backends import get_embedding_cache_store
+
+class EmbeddingCache:
+    """
+    A content-hash cache for text embeddings with an in-memory LRU in front of a database table.
+
+    Entries are keyed by embedding model and the SHA-256 hash of the normalized text, so the
+    same short utterance ("stop", "what do you see") is only ever embedded once per model.
+    Only texts of at most max_text_length characters are cached: longer ones, like most
+    assistant responses, are rarely repeated word for word and would only crowd out the
+    utterances that are. In memory, embeddings are held as packed float32 arrays, a quarter
+    of the size of a list of Python floats.
+
+    Attributes:
+        max_entries (int): Maximum number of embeddings held in the in-memory LRU.
+        max_text_length (int): Length in characters of the longest text that is cached.
+        entries (OrderedDict): The in-memory LRU of float32 arrays, keyed by (model, text hash).
+        store (EmbeddingCacheStore): The persistent layer, or None if persistence is disabled.
+        stats (dict): Hit, miss and latency counters; see get_stats().
+    """
+
+    # Log a summary of the hit-rate metrics after this many lookups.
+    STATS_LOG_INTERVAL = 100
+
+    def __init__(self, max_entries=None, persistent=None, max_text_length=None):
+        """
+        Initializes the cache.
+
+        Args:
+            max_entries (int, optional): Overrides OPENAI_SETTINGS['embedding_cache_size'].
+            persistent (bool, optional): Overrides OPENAI_SETTINGS['embedding_cache_persistent'].
+            max_text_length (int, optional): Overrides OPENAI_SETTINGS['embedding_cache_max_text_length'].
+        """
+        self.max_entries = max_entries or OPENAI_SETTINGS.get('embedding_cache_size', 1000)
+        self.max_text_length = max_text_length or OPENAI_SETTINGS.get('embedding_cache_max_text_length', 200)
+        if persistent is None:
+            persistent = OPENAI_SETTINGS.get('embedding_cache_persistent', True)
+        self.store = get_embedding_cache_store() if persistent else None
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.stats = {
+            "lookups": 0,
+            "memory_hits": 0,
+            "store_hits": 0,
+            "misses": 0,
+            "api_calls": 0,
+            "api_seconds": 0.0,
+        }
+
+    @staticmethod
+    def normalize_text(text):
+        """
+        Normalizes text so trivially different utterances share a cache entry.
+
+        Lowercases, collapses whitespace and strips surrounding punctuation.
+
+        Args:
+            text (str): The text to normalize.
+
+        Returns:
+            str: The normalized text.
+        """
+        text = re.sub(r"\s+", " ", text.lower()).strip()
+        return text.strip(" .,!?;:\"'")
+
+    @classmethod
+    def hash_text(cls, text):
+        """
+        Returns the SHA-256 hex digest of the normalized text.
+        """
+        return hashlib.sha256(cls.normalize_text(text).encode("utf-8")).hexdigest()
+
+    def is_cacheable(self, text):
+        """
+        Returns True if a text is short enough to be cached.
+        """
+        return len(text) <= self.max_text_length
+
+    def get_many(self, model, texts):
+        """
+        Looks up embeddings for several texts, checking memory first and then the persistent store.
+        Texts too long to be cached are not looked up, nor counted in the metrics.
+
+        Args:
+            model (str): The embedding model name.
+            texts (list[str]): The texts to look up.
+
+        Returns:
+            dict: A mapping of input index to embedding (list of floats) for every text found in the cache.
+        """
+        hashes = {index: self.hash_text(text) for index, text in enumerate(texts) if self.is_cacheable(text)}
+        found = {}
+        missing = {}
+
+        with self.lock:
+            for index, text_hash in hashes.items():
+                key = (model, text_hash)
+                if key in self.entries:
+                    self.entries.move_to_end(key)
+                    found[index] = self.entries[key].tolist()
+                    self.stats["memory_hits"] += 1
+                else:
+                    missing.setdefault(text_hash, []).append(index)
+
+        if missing and self.store is not None:
+            try:
+                stored = self.store.get_embeddings(model, list(missing.keys()))
+            except Exception as e:
+                logging.error(f"Error reading the embedding cache store: {e}")
+                stored = {}
+            with self.lock:
+                for text_hash, embedding in stored.items():
+                    self.remember((model, text_hash), embedding)
+                    for index in missing.pop(text_hash):
+                        found[index] = embedding
+                        self.stats["store_hits"] += 1
+
+        with self.lock:
+            self.stats["lookups"] += len(hashes)
+            self.stats["misses"] += sum(len(indexes) for indexes in missing.values())
+            should_log = self.stats["lookups"] // self.STATS_LOG_INTERVAL != \
+                (self.stats["lookups"] - len(hashes)) // self.STATS_LOG_INTERVAL
+        if should_log:
+            self.log_stats()
+        return found
+
+    def put_many(self, model, texts, embeddings):
+        """
+        Adds freshly created embeddings to the cache, except those of texts too long to be cached.
+
+        Args:
+            model (str): The embedding model name.
+            texts (list[str]): The embedded texts.
+            embeddings (list): The embeddings, in the same order as texts.
+        """
+        entries = {self.hash_text(text): embedding for text, embedding in zip(texts, embeddings) if self.is_cacheable(text)}
+        if not entries:
+            return
+        with self.lock:
+            for text_hash, embedding in entries.items():
+                self.remember((model, text_hash), embedding)
+
+        if self.store is not None:
+            try:
+                self.store.add_embeddings(model, entries)
+            except Exception as e:
+                logging.error(f"Error writing to the embedding cache store: {e}")
+
+    def remember(self, key, embedding):
+        """
+        Inserts an entry into the in-memory LRU, evicting the least recently used entry if full.
+        The caller must hold the lock.
+        """
+        self.entries[key] = array('f', embedding)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def record_api_call(self, seconds):
+        """
+        Records the latency of an embeddings API request made because of cache misses.
+
+        Args:
+            seconds (float): How long the request took.
+        """
+        with self.lock:
+            self.stats["api_calls"] += 1
+            self.stats["api_seconds"] += seconds
+
+    def get_stats(self):
+        """
+        Returns the cache's hit-rate metrics.
+
+        The latency avoided is estimated from the average latency of the API requests that
+        were actually made, multiplied by the number of lookups served from the cache.
+
+        Returns:
+            dict: Counters plus hit_rate, embeddings_avoided and estimated_seconds_saved.
+        """
+        with self.lock:
+            stats = dict(self.stats)
+        hits = stats["memory_hits"] + stats["store_hits"]
+        average_call_seconds = stats["api_seconds"] / stats["api_calls"] if stats["api_calls"] else 0.0
+        stats["hit_rate"] = hits / stats["lookups"] if stats["lookups"] else 0.0
+        stats["embeddings_avoided"] = hits
+        stats["estimated_seconds_saved"] = hits * average_call_seconds
+        return stats
+
+    def log_stats(self):
+        """
+        Logs a one-line summary of the cache's hit-rate metrics.
+        """
+        stats = self.get_stats()
+        logging.info(f"Embedding cache: {stats['hit_rate']:.1%} hit rate over {stats['lookups']} lookups "
+                     f"({stats['memory_hits']} memory, {stats['store_hits']} store), "
+                     f"{stats['embeddings_avoided']} embeddings avoided, "
+                     f"~{stats['estimated_seconds_saved']:.1f}s of API latency saved")
+
+_embedding_cache = None
+_embedding_cache_lock = threading.Lock()
+
+def get_embedding_cache():
+    """
+    Returns the process-wide embedding cache, creating it on first use.
+
+    Returns:
+        EmbeddingCache: The shared embedding cache.
+    """
+    global _embedding_cache
+    with _embedding_cache_lock:
+        if _embedding_cache is None:
+            _embedding_cache = EmbeddingCache()
+        return _embedding_cache
@@ -6,6 +6,7 @@ import time
 from config import OPENAI_SETTINGS
 from openai import OpenAI, OpenAIError
 from integrations.openai.openai_conversation_builder import OpenAIConversationBuilder
+from integrations.openai.embedding_cache import EmbeddingCache, get_embedding_cache
 
 class OpenAIClient:
     """
@@ -36,8 +37,11 @@ class OpenAIClient:
         self.model = OPENAI_SETTINGS.get('model', "gpt-3.5-turbo-1106")
         self.image_model = OPENAI_SETTINGS.get('image_model', "gpt-4-1106-vision-preview")
         self.embedding_model = OPENAI_SETTINGS.get('embedding_model', "text-embedding-ada-002")
+        self.embedding_dimensions = OPENAI_SETTINGS.get('embedding_dimensions')
+        self.embedding_cache_enabled = OPENAI_SETTINGS.get('embedding_cache', True)
         self.temperature = OPENAI_SETTINGS.get('temperature', 0.5)
         self.streaming_complete = False
+        self.encoding = None
 
     def create_completion(self, recent_messages, streaming=True, response_format=None, tools=None, is_tool_call=False):
         """
@@ -116,6 +120,30 @@ class OpenAIClient:
         finally:
             self.streaming_complete = True
 
+    def stream_text(self, pieces):
+        """
+        Streams text from another source, such as a streaming vision analysis, to the response queue.
+
+        The pieces are spoken and stored like a streamed completion, and the stop signal is
+        honoured the same way.
+
+        Args:
+            pieces (iterator): Yields the pieces of the response text.
+        """
+        self.streaming_complete = False
+        try:
+            for piece in pieces:
+                if self.stop_signal.is_set():
+                    logging.info("Streaming stopped due to stop signal.")
+                    break
+                self.response_queue.put(piece)
+        except Exception as e:
+            logging.error(f"Error during streaming: {e}")
+        finally:
+            if hasattr(pieces, 'close'):
+                pieces.close()
+            self.streaming_complete = True
+
     def create_embeddings(self, text):
         """
         Generates embeddings for the given text using the OpenAI API.
@@ -126,19 +154,78 @@ class OpenAIClient:
         Returns:
             The embedding vector as a list, or None if an error occurs.
         """
+        embeddings = self.create_embeddings_batch([text])
+        return embeddings[0] if embeddings else None
+
+    def create_embeddings_batch(self, texts):
+        """
+        Generates embeddings for several texts with a single OpenAI API request.
+
+        When the embedding cache is enabled, texts that were embedded before (after normalization)
+        are served from the cache and only the remaining texts are sent to the API.
+
+        Args:
+            texts (list[str]): The texts to generate embeddings for.
+
+        Returns:
+            list: The embedding vectors, in the same order as the input texts, or None if an error occurs.
+        """
+        if not texts:
+            return []
+
+        texts = list(texts)
+        embeddings = [None] * len(texts)
+        cache = get_embedding_cache() if self.embedding_cache_enabled else None
+        cache_key = self.get_embedding_cache_key()
+        if cache:
+            for index, embedding in cache.get_many(cache_key, texts).items():
+                embeddings[index] = embedding
+
+        # Send each distinct missing text to the API once.
+        missing = {}
+        for index, embedding in enumerate(embeddings):
+            if embedding is None:
+                key = EmbeddingCache.normalize_text(texts[index]) if cache else texts[index]
+                missing.setdefault(key, []).append(index)
+        if not missing:
+            return embeddings
+
+        request_texts = [texts[indexes[0]] for indexes in missing.values()]
         try:
+            start_time = time.perf_counter()
+            # Only models that support shortened embeddings accept the dimensions parameter.
+            dimensions = {"dimensions": self.embedding_dimensions} if self.embedding_dimensions else {}
             response = self.client.embeddings.create(
                 model=self.embedding_model,
-                input=text
+                input=request_texts,
+                **dimensions
             )
-            # return response.
-            return response.data[0].embedding
+            if cache:
+                cache.record_api_call(time.perf_counter() - start_time)
+            # The API returns one item per input, tagged with the input's index.
+            created = [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
         except OpenAIError as e:
             logging.error(f"OpenAI API error: {e}")
             return None
         except Exception as e:
             logging.error(f"Error while creating embeddings: {e}")
             return None
+
+        for indexes, embedding in zip(missing.values(), created):
+            for index in indexes:
+                embeddings[index] = embedding
+        if cache:
+            cache.put_many(cache_key, request_texts, created)
+        return embeddings
+
+    def get_embedding_cache_key(self):
+        """
+        Returns the model key embeddings are cached under. Embeddings shortened with the
+        dimensions parameter are cached separately from full-size ones.
+        """
+        if self.embedding_dimensions:
+            return f"{self.embedding_model}:{self.embedding_dimensions}"
+        return self.embedding_model
     
     def calculate_token_count(self, text):
         """
@@ -150,8 +237,10 @@ class OpenAIClient:
         Returns:
             int: The number of tokens in the text.
         """
-        enc = tiktoken.encoding_for_model(self.model)
-        return len(enc.encode(text))
+        # Resolving the encoding is far slower than encoding a short text, so it is done once.
+        if self.encoding is None:
+            self.encoding = tiktoken.encoding_for_model(self.model)
+        return len(self.encoding.encode(text))
     
     def stop_processing_request(self):
         """
@@ -1,7 +1,8 @@
+import asyncio
 import logging
 import json
 from config import OPENAI_SETTINGS, CONVERSATIONS_CONFIG
-from database.conversations import ConversationMemoryManager
+from database.backends import get_async_conversation_memory_manager, get_conversation_memory_manager
 
 class OpenAIConversationBuilder:
     """
@@ -10,25 +11,74 @@ class OpenAIConversationBuilder:
 
     def __init__(self):
         """
-        Initializes the OpenAIConversationBuilder with a ConversationMemoryManager instance.
+        Initializes the OpenAIConversationBuilder with a conversation memory manager for the configured backend.
         """
-        self.conversation_memory_manager = ConversationMemoryManager()
+        self.conversation_memory_manager = get_conversation_memory_manager()
+        self.async_conversation_memory_manager = None
 
     def create_recent_conversation_messages_array(self, latest_conversation_part, overwrite_context_buffer=False, context_buffer=None, image_url=None):
         """
         Creates an array of recent conversations formatted for the OpenAI API.
 
+        Unless the context buffer is overwritten, the rolling summary of older conversation is
+        included after the system message and the recent turns fill the remaining token budget.
+
         Returns:
             List[dict]: A list of message dictionaries with 'role' and 'content' keys, formatted for OpenAI API.
         """
-        # Retrieve recent conversations
-        context_limit = context_buffer if overwrite_context_buffer else OPENAI_SETTINGS.get('max_context_tokens', 16000)
+        # Retrieve the summary of older conversation and the recent conversations
+        summary = None
+        if overwrite_context_buffer:
+            context_limit = context_buffer
+        else:
+            context_limit = OPENAI_SETTINGS.get('max_context_tokens', 16000)
+            summary = self.conversation_memory_manager.get_latest_summary()
+            if summary:
+                context_limit = max(context_limit - summary.response_tokens, 0)
         recent_conversations = self.conversation_memory_manager.list_recent_conversations(context_limit)
+        return self.format_messages(latest_conversation_part, summary, recent_conversations, image_url)
+
+    async def create_recent_conversation_messages_array_async(self, latest_conversation_part, overwrite_context_buffer=False, context_buffer=None, image_url=None):
+        """
+        Asyncio variant of create_recent_conversation_messages_array, for asyncio orchestrators.
 
-        # Format conversations for OpenAI API
+        The summary and the recent window are read concurrently through the async memory manager
+        (PostgreSQL backend only). The window is read for the full token budget and trimmed by the
+        summary's size afterwards, so neither read waits for the other.
+
+        Returns:
+            List[dict]: A list of message dictionaries with 'role' and 'content' keys, formatted for OpenAI API.
+        """
+        if self.async_conversation_memory_manager is None:
+            self.async_conversation_memory_manager = get_async_conversation_memory_manager()
+        manager = self.async_conversation_memory_manager
+
+        if overwrite_context_buffer:
+            summary = None
+            recent_conversations = await manager.list_recent_conversations(context_buffer)
+        else:
+            context_limit = OPENAI_SETTINGS.get('max_context_tokens', 16000)
+            summary, recent_conversations = await asyncio.gather(
+                manager.get_latest_summary(),
+                manager.list_recent_conversations(context_limit),
+            )
+            if summary:
+                context_limit = max(context_limit - summary.response_tokens, 0)
+                recent_conversations = [row for row in recent_conversations if row.running_total <= context_limit]
+        return self.format_messages(latest_conversation_part, summary, recent_conversations, image_url)
+
+    def format_messages(self, latest_conversation_part, summary, recent_conversations, image_url=None):
+        """
+        Formats the system message, summary, recent conversations and latest conversation part for the OpenAI API.
+
+        Returns:
+            List[dict]: A list of message dictionaries with 'role' and 'content' keys, formatted for OpenAI API.
+        """
         messages = []
         if OPENAI_SETTINGS.get('initial_system_message'):
             messages.append({'role': 'system', 'content': OPENAI_SETTINGS.get('initial_system_message')})
+        if summary:
+            messages.append({'role': 'system', 'content': f"Summary of the earlier conversation: {summary.response}"})
         for conversation in recent_conversations:
             speaker_role = "user" if conversation.speaker_type == CONVERSATIONS_CONFIG.get("user") else "assistant"
             messages.append({
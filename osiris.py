@@ -1,11 +1,15 @@
-from config import CELERY_CONFIG, LOG_LEVEL, VIDEO_SETTINGS
+from config import CELERY_CONFIG, LOG_LEVEL
 from utils.os.helpers import OSHelper
 from celery import Celery
 from celery_config import get_celery_app
-from database.setup import DatabaseSetup
+from background.task_backend import get_local_executor, get_task_backend_name, shutdown_task_backend
+from background.routing import TASK_QUEUES, DEFAULT_QUEUE
+from database.backends import get_database_setup
+from database.system_state_store import get_system_state_store
 from broadcast.broadcaster import broadcaster
 from audio.audio_processor import AudioProcessor
 from video.video_processor import VideoProcessor
+from video.cameras import get_camera_names
 from audio.audio_out import get_audio_out
 from utils.os.helpers import OSHelper
 from utils.text.welcome import welcome_message
@@ -53,8 +57,14 @@ def start_celery_worker():
     """
     # Get the log level from configuration, default to 'info'
     log_level = CELERY_CONFIG.get('LOCAL_LOG_LEVEL', 'info')
+    # Consume the routed queues in priority order
+    queues = ','.join(TASK_QUEUES + (DEFAULT_QUEUE,))
+    command = ['celery', '-A', 'osiris.celery_app', 'worker', f'--loglevel={log_level}', '-Q', queues]
+    # Embed the beat scheduler when there are periodic tasks (e.g. partition maintenance)
+    if celery_app.conf.beat_schedule:
+        command.append('-B')
     # Start Celery worker
-    celery_worker = subprocess.Popen(['celery', '-A', 'osiris.celery_app', 'worker', f'--loglevel={log_level}'])
+    celery_worker = subprocess.Popen(command)
     # Register function to terminate worker on exit
     atexit.register(lambda: celery_worker.terminate())
     return celery_worker
@@ -69,9 +79,9 @@ def stop_celery_worker(celery_worker):
     if celery_worker:
         # Send SIGTERM signal to gracefully terminate the worker
         celery_worker.terminate()
-        # Wait for the worker to exit
+        # Wait for the worker to exit, giving it time to flush its write-behind buffer
         try:
-            celery_worker.wait(timeout=0.5)  # Adjust the timeout as needed
+            celery_worker.wait(timeout=CELERY_CONFIG.get('SHUTDOWN_TIMEOUT', 5))
         except subprocess.TimeoutExpired:
             # If the worker doesn't terminate within the timeout, kill it
             logging.info("Forcibly terminating the Celery worker.")
@@ -84,15 +94,18 @@ def main():
     Configures celery background worker, database, broadcaster, and audio settings.
     """
     welcome_message()
-    # Optionally start Celery worker
+    # Start the background task backend: in-process, or an optional local Celery worker
     celery_worker = None
-    if CELERY_CONFIG.get("RUN_LOCALLY_AUTOMATICALLY", True):
+    if get_task_backend_name() == 'local':
+        logging.info("ROBOT THOUGHT: Starting subconscious systems in-process")
+        get_local_executor()
+    elif CELERY_CONFIG.get("RUN_LOCALLY_AUTOMATICALLY", True):
         logging.info("ROBOT THOUGHT: Starting subconscious systems locally")
         celery_worker = start_celery_worker()
         logging.info("ROBOT THOUGHT: Subconscious systems activated")
 
     # Setup the database
-    DatabaseSetup.initial_setup()
+    get_database_setup().initial_setup()
 
     try: 
         # Initialize the audio processor with the configuration settings
@@ -102,35 +115,49 @@ def main():
         audio_processor = AudioProcessor()
         audio_thread = threading.Thread(target=audio_processor.process_stream)
         audio_thread.start()
-        # Start Video processing
-        video_processor = VideoProcessor()
-        video_thread = threading.Thread(target=video_processor.process_stream)
-        video_thread.start()
-        # Keep the main thread alive
+        # Start Video processing, one thread per camera
+        video_processors = [VideoProcessor(camera) for camera in get_camera_names()]
+        video_threads = [threading.Thread(target=video_processor.process_stream, name=f"video-{video_processor.name}")
+                         for video_processor in video_processors]
+        for video_thread in video_threads:
+            video_thread.start()
+        # Keep the main thread alive, showing each camera in its own window
         try:
             while True:
-                try:
-                    if VIDEO_SETTINGS.get('SHOW_VIDEO', False):
-                        frame = video_processor.frame_queue.get(timeout=0.1)
-                        cv2.imshow('Processed Video Stream', frame)
-                        if cv2.waitKey(1) & 0xFF == 27:
-                            break
-                except queue.Empty:
-                    pass 
+                shown = False
+                for video_processor in video_processors:
+                    if not video_processor.show_video:
+                        continue
+                    try:
+                        frame = video_processor.frame_queue.get_nowait()
+                    except queue.Empty:
+                        continue
+                    window = 'Processed Video Stream' if len(video_processors) == 1 else f'Processed Video Stream ({video_processor.name})'
+                    cv2.imshow(window, frame)
+                    shown = True
+                if shown:
+                    if cv2.waitKey(1) & 0xFF == 27:
+                        break
+                else:
+                    time.sleep(0.01)
         except KeyboardInterrupt:
             audio_processor.shutdown()
-            video_processor.shutdown()
+            for video_processor in video_processors:
+                video_processor.shutdown()
             logging.info("Program interrupted by user. Exiting...")
         
         audio_thread.join()
-        video_thread.join()
+        for video_thread in video_threads:
+            video_thread.join()
 
     except KeyboardInterrupt:
         # Log the termination of the process
         logging.info("\nDone")
     finally:
-        # Terminate the Celery worker if it was started
+        # Terminate the Celery worker if it was started, or drain the in-process background tasks
         stop_celery_worker(celery_worker)
+        shutdown_task_backend()
+        get_system_state_store().shutdown()
         audio_out.shutdown()
         broadcaster.shutdown()
         OSHelper.system_file_cleanup()
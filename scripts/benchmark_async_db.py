@@ -0,0 +1,93 @@
+"""
+Measures how well prompt-building database reads overlap with other I/O, synchronous versus asyncio.
+
+Each simulated turn reads the rolling summary and the recent conversation window (the reads made
+by the conversation builder) and waits on other I/O for --io-ms milliseconds, standing in for the
+LLM and TTS requests an orchestrator runs at the same time. --concurrency turns run at once.
+
+    sync:  the synchronous manager on threads. Each turn runs its two reads on a second thread
+           pool while its own thread waits on the other I/O, so the reads and the I/O overlap,
+           and each read blocks a thread for the whole round trip.
+    async: the asyncio manager (asyncpg) on a single event loop; the reads of every turn and the
+           other I/O overlap.
+
+Both variants overlap the same work, so the difference reflects the cost of threads versus the
+event loop, not the --io-ms wait.
+
+The database configured in DATABASE_CONFIG must be running and contain some conversations.
+
+Usage:
+    python scripts/benchmark_async_db.py [--turns 200] [--concurrency 1 8 32] [--io-ms 20]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config import OPENAI_SETTINGS
+from database.async_connection import dispose_async_engine
+from database.async_conversations import AsyncConversationMemoryManager
+from database.conversations import ConversationMemoryManager
+
+def report(name, concurrency, wall_seconds, latencies):
+    latencies = sorted(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(f"{name:<6} concurrency={concurrency:<4} throughput={len(latencies) / wall_seconds:8.1f} turns/s  "
+          f"median={statistics.median(latencies):8.2f}ms  p95={p95:8.2f}ms")
+
+def run_sync(turns, concurrency, io_seconds, context_limit):
+    manager = ConversationMemoryManager()
+
+    def turn(read_executor):
+        start = time.perf_counter()
+        reads = [read_executor.submit(manager.get_latest_summary),
+                 read_executor.submit(manager.list_recent_conversations, context_limit)]
+        time.sleep(io_seconds)
+        for read in reads:
+            read.result()
+        return (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor, \
+            ThreadPoolExecutor(max_workers=concurrency * 2) as read_executor:
+        latencies = list(executor.map(lambda _: turn(read_executor), range(turns)))
+    report("sync", concurrency, time.perf_counter() - start, latencies)
+
+async def run_async(turns, concurrency, io_seconds, context_limit):
+    manager = AsyncConversationMemoryManager()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def turn():
+        async with semaphore:
+            start = time.perf_counter()
+            await asyncio.gather(
+                manager.get_latest_summary(),
+                manager.list_recent_conversations(context_limit),
+                asyncio.sleep(io_seconds),
+            )
+            return (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    latencies = await asyncio.gather(*[turn() for _ in range(turns)])
+    report("async", concurrency, time.perf_counter() - start, latencies)
+
+async def main(args):
+    context_limit = OPENAI_SETTINGS.get('max_context_tokens', 2000)
+    try:
+        for concurrency in args.concurrency:
+            run_sync(args.turns, concurrency, args.io_ms / 1000, context_limit)
+            await run_async(args.turns, concurrency, args.io_ms / 1000, context_limit)
+    finally:
+        await dispose_async_engine()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--io-ms", type=float, default=20.0, help="Simulated LLM/TTS I/O per turn, in milliseconds.")
+    asyncio.run(main(parser.parse_args()))
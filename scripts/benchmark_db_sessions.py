@@ -0,0 +1,55 @@
+"""
+Benchmarks per-task database latency before and after the shared engine / session registry.
+
+The "before" path mirrors the previous behaviour of the background tasks: every task builds
+its own engine (and therefore a new connection pool) and a new session factory. The "after"
+path uses the process-wide registry in database/connection.py, so connections are reused.
+
+Usage:
+    python scripts/benchmark_db_sessions.py [iterations]
+"""
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from database.connection import get_database_url, get_session_factory
+
+def simulated_task(Session):
+    """Runs the same lightweight round trip a background task performs on each invocation."""
+    with Session() as session:
+        session.execute(text("SELECT 1"))
+        session.commit()
+
+def run_before(iterations):
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        engine = create_engine(get_database_url())
+        simulated_task(sessionmaker(bind=engine))
+        engine.dispose()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+def run_after(iterations):
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        simulated_task(get_session_factory())
+        timings.append(time.perf_counter() - start)
+    return timings
+
+def report(label, timings):
+    timings_ms = sorted(t * 1000 for t in timings)
+    p95 = timings_ms[int(len(timings_ms) * 0.95) - 1]
+    print(f"{label:<28} mean={statistics.mean(timings_ms):7.2f}ms  "
+          f"p50={statistics.median(timings_ms):7.2f}ms  p95={p95:7.2f}ms")
+
+if __name__ == "__main__":
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    report("before (engine per task)", run_before(iterations))
+    report("after (shared registry)", run_after(iterations))
@@ -0,0 +1,94 @@
+"""
+Measures similarity-search recall against storage size for shortened and quantized embeddings.
+
+The stored conversation embeddings are the baseline. For each candidate size (Matryoshka truncation
+to the first N dimensions, as the 'dimensions' parameter of the text-embedding-3 models does) and
+storage type (float32, float16 as used by pgvector's halfvec, and int8 with a per-vector scale), the
+script runs top-k searches for a sample of stored embeddings and reports the fraction of the
+baseline's top-k that is found (recall@k), together with the bytes needed per row.
+
+Truncation is only meaningful for embeddings from the text-embedding-3 models; with
+text-embedding-ada-002 only the storage types should be compared (--dimensions 1536).
+int8 is reported for reference; pgvector has no int8 vector type, so 'halfvec' is the compact
+storage option offered by DATABASE_CONFIG['embedding_storage'].
+
+Usage:
+    python scripts/benchmark_embedding_recall.py [--queries 200] [--k 5] [--limit 50000]
+        [--dimensions 1536 1024 512 256]
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+from database.backends import get_conversation_memory_manager
+
+STORAGE_TYPES = ('float32', 'float16', 'int8')
+
+def load_embeddings(limit):
+    """
+    Reads up to `limit` stored conversation embeddings from the configured backend.
+    """
+    manager = get_conversation_memory_manager()
+    embeddings = []
+    for rows in manager.iter_conversation_batches(['id', 'response_embedding'], batch_size=5000):
+        embeddings.extend(np.asarray(row[1], dtype=np.float32) for row in rows if row[1] is not None)
+        if len(embeddings) >= limit:
+            break
+    matrix = np.vstack(embeddings[:limit])
+    return normalize(matrix[np.linalg.norm(matrix, axis=1) > 0])
+
+def normalize(matrix):
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1, norms)
+
+def quantize(matrix, storage):
+    """
+    Returns the matrix as it would be read back from the given storage type, and the bytes per value.
+    """
+    if storage == 'float16':
+        return matrix.astype(np.float16).astype(np.float32), 2
+    if storage == 'int8':
+        scales = np.abs(matrix).max(axis=1, keepdims=True) / 127
+        scales[scales == 0] = 1
+        return np.round(matrix / scales).astype(np.int8).astype(np.float32) * scales, 1
+    return matrix, 4
+
+def top_k(matrix, queries, query_ids, k):
+    """
+    Returns the indices of the k rows most similar to each query, excluding the query's own row.
+    """
+    scores = queries @ matrix.T
+    scores[np.arange(len(query_ids)), query_ids] = -np.inf
+    return np.argpartition(-scores, k, axis=1)[:, :k]
+
+def recall(expected, found):
+    return np.mean([len(set(a) & set(b)) / len(a) for a, b in zip(expected, found)])
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", type=int, default=200, help="Number of stored embeddings used as queries.")
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--limit", type=int, default=50000, help="Maximum number of embeddings to load.")
+    parser.add_argument("--dimensions", type=int, nargs="+", default=[1536, 1024, 512, 256])
+    args = parser.parse_args()
+
+    baseline = load_embeddings(args.limit)
+    if len(baseline) <= args.k:
+        raise SystemExit(f"Need more than {args.k} stored embeddings, found {len(baseline)}.")
+    rng = np.random.default_rng(0)
+    query_ids = rng.choice(len(baseline), size=min(args.queries, len(baseline)), replace=False)
+    expected = top_k(baseline, baseline[query_ids], query_ids, args.k)
+    print(f"{len(baseline)} embeddings of {baseline.shape[1]} dimensions, {len(query_ids)} queries, k={args.k}")
+    print(f"{'dimensions':>10} {'storage':>8} {'bytes/row':>10} {'recall@k':>9}")
+
+    for dimensions in sorted(args.dimensions, reverse=True):
+        if dimensions > baseline.shape[1]:
+            continue
+        truncated = normalize(baseline[:, :dimensions])
+        for storage in STORAGE_TYPES:
+            stored, value_bytes = quantize(truncated, storage)
+            found = top_k(stored, truncated[query_ids], query_ids, args.k)
+            print(f"{dimensions:>10} {storage:>8} {dimensions * value_bytes:>10} {recall(expected, found):>9.3f}")
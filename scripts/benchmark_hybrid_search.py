@@ -0,0 +1,87 @@
+"""
+Measures the latency of hybrid (keyword + vector) memory search against plain vector search.
+
+The script seeds a large table of synthetic conversation parts. Each part mentions a few words
+from a small vocabulary plus a unique reference number, and has a random embedding. It then times
+find_similar_conversations and hybrid_search for queries that name a reference number, and
+reports how often each search returns the part holding that number. Random embeddings carry no
+meaning, so the hit rate shows what the keyword ranking adds for exact names and numbers.
+
+The SQLite backend always runs against a throwaway database in a temporary directory. The
+PostgreSQL backend only runs with --postgres and writes to the database configured in
+DATABASE_CONFIG, so point it at a scratch database first.
+
+Usage:
+    python scripts/benchmark_hybrid_search.py [--rows 100000] [--queries 100] [--postgres]
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+from config import DATABASE_CONFIG
+from database.backends import get_conversation_memory_manager, get_database_setup, get_embedding_dimensions
+
+BATCH_SIZE = 1000
+VOCABULARY = ("kitchen", "lights", "timer", "weather", "music", "garage", "reminder", "camera",
+              "battery", "charger", "door", "thermostat", "calendar", "recipe", "alarm", "volume")
+
+def seed(manager, rows, dimensions, rng):
+    start = time.perf_counter()
+    for offset in range(0, rows, BATCH_SIZE):
+        count = min(BATCH_SIZE, rows - offset)
+        embeddings = rng.standard_normal((count, dimensions), dtype=np.float32)
+        manager.add_conversations([{
+            "speaker_type": 1 + (offset + i) % 2,
+            "response": " ".join(rng.choice(VOCABULARY, 4)) + f" reference R{offset + i}",
+            "response_embedding": embeddings[i].tolist(),
+            "response_tokens": 12,
+        } for i in range(count)])
+    return time.perf_counter() - start
+
+def time_search(search, queries):
+    timings, hits = [], 0
+    for text, embedding in queries:
+        start = time.perf_counter()
+        results = search(text, embedding)
+        timings.append((time.perf_counter() - start) * 1000)
+        hits += any(text.split()[-1] in conversation.response.split() for conversation, _ in results)
+    timings.sort()
+    return statistics.median(timings), timings[int(len(timings) * 0.95) - 1], hits / len(queries)
+
+def run(backend, rows, query_count, dimensions):
+    get_database_setup(backend).initial_setup()
+    manager = get_conversation_memory_manager(backend)
+    rng = np.random.default_rng(0)
+    seed_seconds = seed(manager, rows, dimensions, rng)
+
+    queries = [(" ".join(rng.choice(VOCABULARY, 2)) + f" R{int(rng.integers(rows))}",
+                rng.standard_normal(dimensions, dtype=np.float32).tolist()) for _ in range(query_count)]
+    searches = {
+        "vector": lambda text, embedding: manager.find_similar_conversations(embedding, 5),
+        "hybrid": lambda text, embedding: manager.hybrid_search(text, embedding, 5),
+    }
+    print(f"{backend}: seeded {rows} rows in {seed_seconds:.1f}s")
+    for name, search in searches.items():
+        median, p95, hit_rate = time_search(search, queries)
+        print(f"  {name:<7} median={median:8.2f}ms  p95={p95:8.2f}ms  exact-match hit rate={hit_rate:6.1%}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--postgres", action="store_true", help="Also benchmark the configured PostgreSQL database.")
+    args = parser.parse_args()
+    dimensions = get_embedding_dimensions()
+
+    with tempfile.TemporaryDirectory() as directory:
+        DATABASE_CONFIG['sqlite_path'] = os.path.join(directory, 'benchmark.sqlite3')
+        run('sqlite', args.rows, args.queries, dimensions)
+
+    if args.postgres:
+        run('postgres', args.rows, args.queries, dimensions)
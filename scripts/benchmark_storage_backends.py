@@ -0,0 +1,74 @@
+"""
+Compares the PostgreSQL (pgvector) and embedded SQLite (NumPy) storage backends.
+
+For each backend the script inserts synthetic conversation parts with random embeddings, then
+times the recent-window query used by the conversation builder and a top-k similarity search.
+
+The SQLite backend always runs against a throwaway database in a temporary directory. The
+PostgreSQL backend only runs with --postgres and writes to the database configured in
+DATABASE_CONFIG, so point it at a scratch database first.
+
+Usage:
+    python scripts/benchmark_storage_backends.py [--rows 20000] [--postgres]
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+from config import DATABASE_CONFIG, OPENAI_SETTINGS
+from database.backends import get_conversation_memory_manager, get_database_setup, get_embedding_dimensions
+
+BATCH_SIZE = 500
+QUERY_REPEATS = 50
+
+def time_calls(function, repeats=QUERY_REPEATS):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+def run(backend, rows, dimensions):
+    get_database_setup(backend).initial_setup()
+    manager = get_conversation_memory_manager(backend)
+    rng = np.random.default_rng(0)
+
+    start = time.perf_counter()
+    for offset in range(0, rows, BATCH_SIZE):
+        count = min(BATCH_SIZE, rows - offset)
+        embeddings = rng.standard_normal((count, dimensions), dtype=np.float32)
+        manager.add_conversations([{
+            "speaker_type": 1 + (offset + i) % 2,
+            "response": f"benchmark conversation part {offset + i}",
+            "response_embedding": embeddings[i].tolist(),
+            "response_tokens": 12,
+        } for i in range(count)])
+    insert_seconds = time.perf_counter() - start
+
+    query = rng.standard_normal(dimensions, dtype=np.float32).tolist()
+    recent_ms = time_calls(lambda: manager.list_recent_conversations(OPENAI_SETTINGS.get('max_context_tokens', 2000)))
+    search_ms = time_calls(lambda: manager.find_similar_conversations(query, 5))
+
+    print(f"{backend:<10} insert={rows / insert_seconds:9.0f} rows/s  "
+          f"recent window={recent_ms:8.2f}ms  top-5 search={search_ms:8.2f}ms")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--postgres", action="store_true", help="Also benchmark the configured PostgreSQL database.")
+    args = parser.parse_args()
+    dimensions = get_embedding_dimensions()
+
+    with tempfile.TemporaryDirectory() as directory:
+        DATABASE_CONFIG['sqlite_path'] = os.path.join(directory, 'benchmark.sqlite3')
+        run('sqlite', args.rows, dimensions)
+
+    if args.postgres:
+        run('postgres', args.rows, dimensions)
@@ -0,0 +1,72 @@
+"""
+Reports the CPU used by video capture, decoding every frame versus decoding on demand.
+
+    read:  the previous capture loop; cap.read() decodes every frame the camera delivers, and one
+           frame per --interval seconds is kept.
+    grab:  the current capture loop (VideoProcessor.process_stream); cap.grab() takes every frame
+           off the driver's buffer and cap.retrieve() decodes only the frame kept per --interval.
+
+Each mode runs for --seconds against a camera opened with the resolution and frame rate from
+VIDEO_SETTINGS (or --device). CPU is measured as process CPU time over wall time, so 100% is one
+fully used core.
+
+Usage:
+    python scripts/benchmark_video_capture.py [--device 0] [--seconds 20] [--interval 1]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import cv2
+from config import VIDEO_SETTINGS
+from video.frame_buffer import FrameBuffer
+
+def open_capture(device):
+    cap = cv2.VideoCapture(device)
+    if VIDEO_SETTINGS.get('FRAME_WIDTH') and VIDEO_SETTINGS.get('FRAME_HEIGHT'):
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, VIDEO_SETTINGS['FRAME_WIDTH'])
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, VIDEO_SETTINGS['FRAME_HEIGHT'])
+    cap.set(cv2.CAP_PROP_FPS, VIDEO_SETTINGS.get('FRAME_RATE', 30))
+    return cap
+
+def run(mode, device, seconds, interval):
+    cap = open_capture(device)
+    frame_buffer = FrameBuffer()
+    grabbed = kept = 0
+    last_kept = 0
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    while time.perf_counter() - wall_start < seconds:
+        now = time.time()
+        due = now - last_kept > interval
+        if mode == 'read':
+            ret, frame = cap.read()
+        else:
+            ret = cap.grab()
+            if ret and due:
+                ret, frame = cap.retrieve()
+        if not ret:
+            continue
+        grabbed += 1
+        if due:
+            frame_buffer.add_frame(frame, now)
+            kept += 1
+            last_kept = now
+    wall, cpu = time.perf_counter() - wall_start, time.process_time() - cpu_start
+    width, height = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    cap.release()
+    print(f"{mode:<5} {width}x{height}  frames={grabbed / wall:6.1f}/s  kept={kept:<4}  cpu={cpu / wall:7.1%}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--device", default=VIDEO_SETTINGS.get('VIDEO_DEVICE', 0),
+                        help="Camera index, video file or stream URL. Defaults to VIDEO_SETTINGS['VIDEO_DEVICE'].")
+    parser.add_argument("--seconds", type=float, default=20.0)
+    parser.add_argument("--interval", type=float, default=VIDEO_SETTINGS.get('CAPTURE_INTERVAL', 1))
+    args = parser.parse_args()
+    device = int(args.device) if str(args.device).isdigit() else args.device
+
+    for mode in ('read', 'grab'):
+        run(mode, device, args.seconds, args.interval)
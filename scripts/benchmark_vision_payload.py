@@ -0,0 +1,82 @@
+"""
+Reports vision upload payload sizes and preparation time for different image settings.
+
+For each combination of maximum edge length and JPEG quality, a frame is prepared as the vision
+adapters do (video/image_prep.py) and the Base64 payload size, the preparation time and the
+estimated upload time at --uplink-mbps are printed. "full" is the previous behaviour: the full
+resolution frame encoded at OpenCV's default quality (95).
+
+With --analyze, every setting is also sent to the configured vision adapter with --query and
+the end-to-end latency (preparation, upload and analysis) is printed, along with the answer so
+quality can be compared. This makes real API requests.
+
+The frame is read from --image, or captured from the configured VIDEO_DEVICE.
+
+Usage:
+    python scripts/benchmark_vision_payload.py [--image photo.jpg] [--uplink-mbps 5] [--analyze]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import cv2
+from config import VIDEO_SETTINGS
+from video.image_prep import ImagePreparer
+
+MAX_EDGES = (None, 1024, 768, 512)
+QUALITIES = (95, 85, 70)
+REPEATS = 20
+
+def load_frame(image_path):
+    if image_path:
+        frame = cv2.imread(image_path)
+        if frame is None:
+            sys.exit(f"Could not read {image_path}")
+        return frame
+    cap = cv2.VideoCapture(VIDEO_SETTINGS.get('VIDEO_DEVICE', 0))
+    try:
+        # Skip the first frames while the camera adjusts its exposure.
+        for _ in range(10):
+            ret, frame = cap.read()
+    finally:
+        cap.release()
+    if not ret:
+        sys.exit("Could not capture a frame from VIDEO_DEVICE")
+    return frame
+
+def main(args):
+    frame = load_frame(args.image)
+    print(f"Frame: {frame.shape[1]}x{frame.shape[0]}")
+    vision_client = None
+    if args.analyze:
+        from video.analysis import get_vision_analyzer
+        vision_client = get_vision_analyzer()
+
+    for max_edge in MAX_EDGES:
+        for quality in QUALITIES:
+            preparer = ImagePreparer(max_edge=max_edge, jpeg_quality=quality)
+            timings = []
+            for _ in range(REPEATS):
+                start = time.perf_counter()
+                payload = preparer.prepare(frame)
+                timings.append((time.perf_counter() - start) * 1000)
+            upload_ms = len(payload) * 8 / (args.uplink_mbps * 1e6) * 1000
+            label = f"{max_edge or 'full'}@q{quality}"
+            line = f"{label:<10} payload={len(payload) / 1024:8.1f}KB  prepare={statistics.median(timings):6.1f}ms  upload≈{upload_ms:7.0f}ms"
+            if vision_client:
+                start = time.perf_counter()
+                answer = vision_client.adapter.analyze_image_data(preparer.prepare(frame), args.query)
+                line += f"  end-to-end={(time.perf_counter() - start) * 1000:7.0f}ms  {answer[:60]!r}"
+            print(line)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--image", help="Image file to use instead of a camera frame.")
+    parser.add_argument("--uplink-mbps", type=float, default=5.0, help="Uplink bandwidth used to estimate upload time.")
+    parser.add_argument("--analyze", action="store_true", help="Also time real requests to the configured vision adapter.")
+    parser.add_argument("--query", default="What do you see?")
+    main(parser.parse_args())
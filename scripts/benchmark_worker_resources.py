@@ -0,0 +1,67 @@
+"""
+Reports per-task latency of background task setup with and without the warm worker resources.
+
+The "before" path mirrors a task that builds its own resources on every invocation: a new
+OpenAIClient, a freshly resolved tiktoken encoding and a new conversation memory manager. The
+"after" path uses the process's WorkerResources (background/worker_resources.py), warmed once as
+Celery's worker_process_init hook does. Both paths then do the same work: count the tokens of an
+utterance and, unless --no-db is given, read the latest summary from the configured database.
+No OpenAI API requests are made.
+
+Usage:
+    python scripts/benchmark_worker_resources.py [--iterations 200] [--no-db]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from background.worker_resources import WorkerResources
+from database.backends import get_conversation_memory_manager
+from integrations.openai.openai import OpenAIClient
+
+UTTERANCE = "What do you see on the table in front of you right now?"
+
+def task_body(openai_client, conversation_manager, use_db):
+    """Runs the work a storage task does with its resources."""
+    openai_client.calculate_token_count(UTTERANCE)
+    if use_db:
+        conversation_manager.get_latest_summary()
+
+def run_before(iterations, use_db):
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        task_body(OpenAIClient(), get_conversation_memory_manager(), use_db)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+def run_after(iterations, use_db):
+    resources = WorkerResources()
+    resources.warm()
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        task_body(resources.openai_client, resources.conversation_manager, use_db)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+def report(label, timings):
+    timings_ms = sorted(t * 1000 for t in timings)
+    p95 = timings_ms[int(len(timings_ms) * 0.95) - 1]
+    print(f"{label:<30} mean={statistics.mean(timings_ms):7.2f}ms  "
+          f"p50={statistics.median(timings_ms):7.2f}ms  p95={p95:7.2f}ms")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--no-db", action="store_true", help="Skip the database read.")
+    args = parser.parse_args()
+
+    # OpenAI() requires an API key to be configured, even though no request is sent.
+    os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+    report("before (resources per task)", run_before(args.iterations, not args.no_db))
+    report("after (warm worker resources)", run_after(args.iterations, not args.no_db))
@@ -0,0 +1,125 @@
+"""
+Exports the conversation history to Parquet or Arrow IPC files for offline analysis.
+
+Conversations are streamed from the configured storage backend in batches, so memory use stays
+constant regardless of the size of the table. Each batch becomes one row group (Parquet) or one
+record batch (Arrow); a new file is started every --rows-per-file rows. Embeddings are written
+as a fixed-size list<float32> column.
+
+Usage:
+    python scripts/export_conversations.py OUTPUT_DIR [--format parquet|arrow] [--batch-size 5000]
+        [--rows-per-file 1000000] [--after 2024-01-01] [--before 2024-02-01] [--no-embeddings]
+"""
+import argparse
+import os
+import sys
+from datetime import datetime
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.ipc
+import pyarrow.parquet as pq
+from database.backends import get_conversation_memory_manager, get_embedding_dimensions
+
+COLUMNS = ['id', 'created_at', 'updated_at', 'speaker_type', 'speaker_metadata', 'response',
+           'response_tokens', 'summarized_by_id']
+
+def build_schema(include_embeddings, dimensions):
+    fields = [
+        pa.field('id', pa.int64()),
+        pa.field('created_at', pa.timestamp('us', tz='UTC')),
+        pa.field('updated_at', pa.timestamp('us', tz='UTC')),
+        pa.field('speaker_type', pa.int32()),
+        pa.field('speaker_metadata', pa.string()),
+        pa.field('response', pa.string()),
+        pa.field('response_tokens', pa.int32()),
+        pa.field('summarized_by_id', pa.int64()),
+    ]
+    if include_embeddings:
+        fields.append(pa.field('response_embedding', pa.list_(pa.float32(), dimensions)))
+    return pa.schema(fields)
+
+def to_record_batch(rows, schema, include_embeddings, dimensions):
+    """Converts one batch of row tuples into an Arrow record batch."""
+    columns = list(zip(*rows))
+    arrays = [pa.array(columns[index], type=schema.field(name).type) for index, name in enumerate(COLUMNS)]
+    if include_embeddings:
+        embeddings = np.zeros((len(rows), dimensions), dtype=np.float32)
+        for index, embedding in enumerate(columns[len(COLUMNS)]):
+            if embedding is not None:
+                embeddings[index] = embedding
+        arrays.append(pa.FixedSizeListArray.from_arrays(pa.array(embeddings.ravel()), dimensions))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+class RotatingWriter:
+    """Writes record batches to numbered files, starting a new file every rows_per_file rows."""
+
+    def __init__(self, directory, file_format, schema, rows_per_file):
+        self.directory = directory
+        self.file_format = file_format
+        self.schema = schema
+        self.rows_per_file = rows_per_file
+        self.writer = None
+        self.sink = None
+        self.file_index = 0
+        self.rows_in_file = 0
+
+    def open(self):
+        extension = 'parquet' if self.file_format == 'parquet' else 'arrow'
+        path = os.path.join(self.directory, f"conversations-{self.file_index:05d}.{extension}")
+        if self.file_format == 'parquet':
+            self.writer = pq.ParquetWriter(path, self.schema, compression='zstd')
+        else:
+            self.sink = pa.OSFile(path, 'wb')
+            self.writer = pa.ipc.new_file(self.sink, self.schema)
+        self.file_index += 1
+        self.rows_in_file = 0
+        print(f"Writing {path}")
+
+    def write(self, batch):
+        if self.writer is None or self.rows_in_file >= self.rows_per_file:
+            self.close()
+            self.open()
+        self.writer.write_batch(batch)
+        self.rows_in_file += batch.num_rows
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+        if self.sink is not None:
+            self.sink.close()
+            self.sink = None
+
+def parse_date(value):
+    return datetime.fromisoformat(value) if value else None
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("output_dir")
+    parser.add_argument("--format", choices=["parquet", "arrow"], default="parquet")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--rows-per-file", type=int, default=1000000)
+    parser.add_argument("--after", help="Only export conversations created at or after this ISO date.")
+    parser.add_argument("--before", help="Only export conversations created at or before this ISO date.")
+    parser.add_argument("--no-embeddings", action="store_true", help="Leave out the embedding column.")
+    args = parser.parse_args()
+
+    include_embeddings = not args.no_embeddings
+    dimensions = get_embedding_dimensions()
+    schema = build_schema(include_embeddings, dimensions)
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    manager = get_conversation_memory_manager()
+    columns = COLUMNS + (['response_embedding'] if include_embeddings else [])
+    writer = RotatingWriter(args.output_dir, args.format, schema, args.rows_per_file)
+    exported = 0
+    try:
+        for rows in manager.iter_conversation_batches(columns, parse_date(args.after), parse_date(args.before), args.batch_size):
+            writer.write(to_record_batch(rows, schema, include_embeddings, dimensions))
+            exported += len(rows)
+    finally:
+        writer.close()
+    print(f"Exported {exported} conversation parts")
@@ -0,0 +1,57 @@
+"""
+Exports frames from the on-disk frame archive as JPEG files, for reviewing what the robot saw.
+
+Frames are looked up through the archive's timestamp index, so only the segments covering the
+requested times are read. Each frame is written as OUTPUT_DIR/frame_<capture time>.jpg. With
+--at, only the first frame captured at or after that time is exported.
+
+Times are ISO dates in local time, e.g. 2024-05-01T14:30:00. With several cameras configured,
+--camera picks the camera whose archive is read; the first camera is the default.
+
+Usage:
+    python scripts/export_frames.py OUTPUT_DIR --after 2024-05-01T14:30 [--before 2024-05-01T14:35]
+    python scripts/export_frames.py OUTPUT_DIR --at 2024-05-01T14:32:10 [--camera rear]
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from video.cameras import get_camera
+from video.frame_archive import FrameArchive
+
+def parse_time(value):
+    return datetime.fromisoformat(value).timestamp()
+
+def write_frame(output_dir, timestamp, data):
+    path = os.path.join(output_dir, f"frame_{datetime.fromtimestamp(timestamp).strftime('%Y%m%dT%H%M%S.%f')}.jpg")
+    with open(path, 'wb') as frame_file:
+        frame_file.write(data)
+
+def main(args):
+    archive = FrameArchive(directory=args.archive or get_camera(args.camera).get('FRAME_ARCHIVE_PATH'))
+    os.makedirs(args.output_dir, exist_ok=True)
+    if args.at:
+        frame = archive.get_frame_at(parse_time(args.at))
+        frames = [frame] if frame else []
+    else:
+        frames = archive.iter_frames(parse_time(args.after), parse_time(args.before) if args.before else time.time())
+    count = 0
+    for timestamp, data in frames:
+        write_frame(args.output_dir, timestamp, data)
+        count += 1
+    print(f"Exported {count} frames to {args.output_dir}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("output_dir")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--after", help="Export frames captured at or after this time.")
+    group.add_argument("--at", help="Export the first frame captured at or after this time.")
+    parser.add_argument("--before", help="Export frames captured before this time. Defaults to now.")
+    parser.add_argument("--camera", help="Camera whose archive is read. Defaults to the first camera.")
+    parser.add_argument("--archive", help="Archive directory. Defaults to the camera's archive in VIDEO_SETTINGS['FRAME_ARCHIVE_PATH'].")
+    main(parser.parse_args())
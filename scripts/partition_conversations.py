@@ -0,0 +1,32 @@
+"""
+Converts an existing, unpartitioned conversations table into a table range-partitioned by month.
+
+Enable DATABASE_CONFIG['partition_conversations'] first and stop Osiris and its Celery worker. The
+conversations are copied into monthly partitions in a single transaction, so the table is either
+fully converted or left unchanged.
+
+Usage:
+    python scripts/partition_conversations.py [--keep-legacy]
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from database.backends import is_partitioning_enabled
+from database.partitions import ConversationPartitionManager
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--keep-legacy", action="store_true",
+                        help="Keep the original table as conversations_legacy instead of dropping it.")
+    args = parser.parse_args()
+
+    if not is_partitioning_enabled():
+        raise SystemExit("Set DATABASE_CONFIG['partition_conversations'] to True (postgres backend) first.")
+
+    manager = ConversationPartitionManager()
+    copied = manager.convert_table(keep_legacy=args.keep_legacy)
+    manager.maintain()
+    print(f"Copied {copied} conversation parts into the partitioned table.")
@@ -0,0 +1,182 @@
+"""
+Migrates stored conversation embeddings to the configured size and storage type.
+
+Run this after changing OPENAI_SETTINGS['embedding_dimensions'] or DATABASE_CONFIG['embedding_storage']
+(or DATABASE_CONFIG['sqlite_embedding_dtype'] for the SQLite backend). Embeddings are recomputed in
+batches with the configured embedding model, or with --truncate, shortened in place.
+
+--truncate keeps the first N components of each stored embedding and renormalizes it. This is only
+valid for embeddings from models trained to support shortening (the text-embedding-3 models), but it
+needs no API calls. Otherwise every conversation part is sent to the embeddings API again.
+
+PostgreSQL:
+    If only the storage type changes (vector <-> halfvec), the column is converted in place. If the
+    dimensions change, new embeddings are written to a temporary column that replaces the old one
+    once every row has been migrated. An interrupted run can be resumed by running the script again.
+
+SQLite:
+    A new embedding matrix is written next to the current one and replaces it when complete. Pass
+    --from-dimensions/--from-dtype if the current matrix was not written with the defaults.
+
+Usage:
+    python scripts/reembed_conversations.py [--truncate] [--batch-size 500]
+        [--from-dimensions 1536] [--from-dtype float32]
+"""
+import argparse
+import os
+import re
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+from config import DATABASE_CONFIG
+from database.backends import DEFAULT_EMBEDDING_DIMENSIONS, get_backend_name, get_embedding_dimensions, get_embedding_storage
+
+TEMPORARY_COLUMN = 'response_embedding_migrated'
+
+def truncate_embeddings(embeddings, dimensions):
+    """
+    Shortens embeddings to their first `dimensions` components and renormalizes them.
+    """
+    matrix = np.asarray(embeddings, dtype=np.float32)[:, :dimensions]
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    return matrix / norms
+
+def compute_embeddings(texts, embeddings, dimensions, truncate, client):
+    """
+    Returns the new embeddings for one batch, either truncated from the stored ones or recomputed.
+    """
+    if truncate:
+        return truncate_embeddings(embeddings, dimensions).tolist()
+    created = client.create_embeddings_batch(texts)
+    if created is None:
+        raise RuntimeError("The embeddings API call failed; run the script again to resume.")
+    return created
+
+def get_column_type(connection, column):
+    """
+    Returns the (type, dimensions) of a pgvector column, or None if the column does not exist.
+    """
+    from sqlalchemy import text
+    column_type = connection.execute(text(
+        "SELECT format_type(atttypid, atttypmod) FROM pg_attribute "
+        "WHERE attrelid = 'conversations'::regclass AND attname = :column AND NOT attisdropped"
+    ), {"column": column}).scalar()
+    if column_type is None:
+        return None
+    match = re.match(r"(\w+)\((\d+)\)", column_type)
+    return (match.group(1), int(match.group(2))) if match else (column_type, None)
+
+def migrate_postgres(dimensions, storage, truncate, batch_size, client):
+    from sqlalchemy import text
+    from database.connection import get_engine
+    engine = get_engine()
+    target = f"{storage}({dimensions})"
+
+    with engine.begin() as connection:
+        current = get_column_type(connection, 'response_embedding')
+        migrating = get_column_type(connection, TEMPORARY_COLUMN)
+    print(f"Current embeddings: {current[0]}({current[1]}), target: {target}")
+
+    if current == (storage, dimensions) and migrating is None:
+        print("Nothing to migrate.")
+        return
+
+    if current[1] == dimensions and migrating is None:
+        # Same size, different precision: pgvector casts between vector and halfvec directly.
+        with engine.begin() as connection:
+            connection.execute(text(
+                f"ALTER TABLE conversations ALTER COLUMN response_embedding TYPE {target} "
+                f"USING response_embedding::{target}"))
+        print("Converted the embedding column in place.")
+        return
+
+    if truncate and current[1] < dimensions:
+        raise SystemExit(f"Cannot truncate {current[1]}-dimensional embeddings to {dimensions} dimensions.")
+
+    with engine.begin() as connection:
+        if migrating is not None and migrating != (storage, dimensions):
+            connection.execute(text(f"ALTER TABLE conversations DROP COLUMN {TEMPORARY_COLUMN}"))
+        connection.execute(text(f"ALTER TABLE conversations ADD COLUMN IF NOT EXISTS {TEMPORARY_COLUMN} {target}"))
+
+    migrated = 0
+    while True:
+        with engine.begin() as connection:
+            rows = connection.execute(text(
+                f"SELECT id, response, response_embedding::real[] FROM conversations "
+                f"WHERE {TEMPORARY_COLUMN} IS NULL ORDER BY id LIMIT :limit"
+            ), {"limit": batch_size}).fetchall()
+            if not rows:
+                break
+            embeddings = compute_embeddings([row[1] for row in rows], [row[2] for row in rows],
+                                            dimensions, truncate, client)
+            connection.execute(
+                text(f"UPDATE conversations SET {TEMPORARY_COLUMN} = CAST(:embedding AS {target}) WHERE id = :id"),
+                [{"id": row[0], "embedding": str(list(embedding))} for row, embedding in zip(rows, embeddings)],
+            )
+        migrated += len(rows)
+        print(f"Migrated {migrated} conversation parts")
+
+    with engine.begin() as connection:
+        connection.execute(text("ALTER TABLE conversations DROP COLUMN response_embedding"))
+        connection.execute(text(f"ALTER TABLE conversations RENAME COLUMN {TEMPORARY_COLUMN} TO response_embedding"))
+        connection.execute(text("ALTER TABLE conversations ALTER COLUMN response_embedding SET NOT NULL"))
+    print("Replaced the embedding column.")
+
+def migrate_sqlite(dimensions, truncate, batch_size, client, from_dimensions, from_dtype):
+    from database.sqlite.connection import get_sqlite_connection, get_sqlite_path
+    from database.sqlite.embedding_matrix import EmbeddingMatrix
+
+    path = DATABASE_CONFIG.get('sqlite_embedding_path', get_sqlite_path() + '.embeddings')
+    if truncate and from_dimensions < dimensions:
+        raise SystemExit(f"Cannot truncate {from_dimensions}-dimensional embeddings to {dimensions} dimensions.")
+
+    source = EmbeddingMatrix(path, from_dimensions, from_dtype)
+    migrated_path = path + '.migrated'
+    if os.path.exists(migrated_path):
+        os.remove(migrated_path)
+    target = EmbeddingMatrix(migrated_path, dimensions, DATABASE_CONFIG.get('sqlite_embedding_dtype', 'float32'))
+
+    cursor = get_sqlite_connection().execute("SELECT id, response FROM conversations ORDER BY id")
+    migrated = 0
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            break
+        ids = [row["id"] for row in rows]
+        stored = None
+        if truncate:
+            stored = [source.read(conversation_id) for conversation_id in ids]
+            stored = [np.zeros(from_dimensions) if embedding is None else embedding for embedding in stored]
+        target.write(ids, compute_embeddings([row["response"] for row in rows], stored, dimensions, truncate, client))
+        migrated += len(rows)
+        print(f"Migrated {migrated} conversation parts")
+
+    if target.matrix is not None:
+        target.matrix.flush()
+    os.replace(migrated_path, path)
+    print(f"Replaced {path}; restart Osiris and its workers to load the new matrix.")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--truncate", action="store_true",
+                        help="Shorten the stored embeddings instead of recomputing them (text-embedding-3 models only).")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--from-dimensions", type=int, default=DEFAULT_EMBEDDING_DIMENSIONS,
+                        help="Dimensions of the current SQLite embedding matrix.")
+    parser.add_argument("--from-dtype", choices=["float32", "float16"], default="float32",
+                        help="Storage type of the current SQLite embedding matrix.")
+    args = parser.parse_args()
+
+    client = None
+    if not args.truncate:
+        from integrations.openai.openai import OpenAIClient
+        client = OpenAIClient()
+
+    if get_backend_name() == 'sqlite':
+        migrate_sqlite(get_embedding_dimensions(), args.truncate, args.batch_size, client,
+                       args.from_dimensions, args.from_dtype)
+    else:
+        migrate_postgres(get_embedding_dimensions(), get_embedding_storage(), args.truncate, args.batch_size, client)
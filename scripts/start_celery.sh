@@ -1 +1,4 @@
-celery -A osiris.celery_app worker --loglevel=info
+# Add -B to run the periodic tasks (e.g. partition maintenance when DATABASE_CONFIG['partition_conversations'] is enabled)
+# in this worker, or run a separate `celery -A osiris.celery_app beat` process.
+# -Q lists the task queues (see background/routing.py) in the order they are consumed.
+celery -A osiris.celery_app worker --loglevel=info -Q memory,state,maintenance,celery
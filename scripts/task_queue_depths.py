@@ -0,0 +1,35 @@
+"""
+Prints the number of pending background tasks in each Celery queue.
+
+The queues and their routes are defined in background/routing.py. Depths are read from the Redis
+broker configured in CELERY_CONFIG, so this only applies to the 'celery' task backend; tasks a
+worker has already reserved are not counted.
+
+Usage:
+    python scripts/task_queue_depths.py [--watch SECONDS]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from background.task_backend import get_queue_depths, get_task_backend_name
+
+def print_depths():
+    depths = get_queue_depths()
+    print(time.strftime("%H:%M:%S") + "  " + "  ".join(f"{queue_name}={depth}" for queue_name, depth in depths.items()))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--watch", type=float, help="Print the depths every this many seconds until interrupted.")
+    args = parser.parse_args()
+
+    if get_task_backend_name() != 'celery':
+        raise SystemExit("Queue depths of the 'local' task backend are only visible inside the Osiris process.")
+
+    print_depths()
+    while args.watch:
+        time.sleep(args.watch)
+        print_depths()
@@ -0,0 +1,13 @@
+import importlib.util
+import os
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+# Tests run against the example configuration when no config.py has been created.
+if not os.path.exists(os.path.join(ROOT, 'config.py')):
+    spec = importlib.util.spec_from_file_location('config', os.path.join(ROOT, 'config.example.py'))
+    config = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(config)
+    sys.modules['config'] = config
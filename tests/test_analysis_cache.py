@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+
+from video.analysis_cache import VisionAnalysisCache, normalize_query, perceptual_hash
+
+QUERY = normalize_query("What am I holding?")
+
+def scene():
+    # A textured 640x480 background: horizontal and vertical gradients with some blocks.
+    y, x = np.mgrid[0:480, 0:640]
+    gray = (x * 0.2 + y * 0.3 + 40 * ((x // 80 + y // 60) % 2)).astype(np.uint8)
+    return cv2.merge([gray, gray, gray])
+
+def with_noise(frame, seed):
+    noise = np.random.default_rng(seed).normal(0, 3, frame.shape)
+    return np.clip(frame + noise, 0, 255).astype(np.uint8)
+
+def test_unchanged_scene_hits():
+    cache = VisionAnalysisCache(ttl=60, max_distance=6, max_entries=8, max_change=0.01, pixel_threshold=25)
+    frame = scene()
+    cache.put(cache.fingerprint(frame), QUERY, "a mug")
+
+    assert cache.get(cache.fingerprint(with_noise(frame, 1)), QUERY) == "a mug"
+
+def test_object_in_region_of_interest_misses():
+    cache = VisionAnalysisCache(ttl=60, max_distance=6, max_entries=8, max_change=0.01, pixel_threshold=25)
+    frame = scene()
+    cache.put(cache.fingerprint(frame), QUERY, "a mug")
+
+    # A small object held up to the camera: 2% of the frame, too little to move the perceptual hash much.
+    changed = frame.copy()
+    changed[200:280, 300:380] = (20, 60, 220)
+    assert (perceptual_hash(frame) ^ perceptual_hash(changed)).bit_count() <= cache.max_distance
+
+    assert cache.get(cache.fingerprint(changed), QUERY) is None
+    assert cache.get_metrics()["misses"] == 1
@@ -1,15 +1,16 @@
 import logging
-from config import VIDEO_SETTINGS
-from decorators.openai_decorators import openai_function
-from datetime import datetime
-from database.system_state import SystemStateManager 
+from config import VIDEO_SETTINGS, VISION_ANALYSIS_SETTINGS
+from decorators.openai_decorators import openai_function, openai_functions
+from database.system_state_store import get_system_state_store
 from video.analysis import get_vision_analyzer
-from utils.os.helpers import OSHelper
+from video.cameras import get_camera_names
+from video.frame_buffer import get_frame_buffer
+from video.speculative import get_speculative_vision
 
 
 if VIDEO_SETTINGS.get("CAPTURE_VIDEO", True):
     @openai_function
-    def analyze_image_based_on_users_request(users_request):
+    def analyze_image_based_on_users_request(users_request, camera=None):
         """
         {
             "description": "If a user asks the robot 'What is this?' or 'What do you see?' or 'Can you tell the difference', or any other user type question that may imply a visual requirement, this function will use the system's video output to analyze the user's request and return a description",
@@ -20,30 +21,71 @@ if VIDEO_SETTINGS.get("CAPTURE_VIDEO", True):
                     "users_request": {
                         "type": "string",
                         "description": "What is the user asking?"
+                    },
+                    "camera": {
+                        "type": "string",
+                        "description": "The camera to look through, if the user refers to one or to a direction, e.g. 'behind you'. Omit to use the main camera."
                     }
                 },
                 "required": ["users_request"]
             }
         }
         """
-        state_manager = SystemStateManager()
         vision_client = get_vision_analyzer()
+        stream_to_speech = VISION_ANALYSIS_SETTINGS.get("stream_to_speech", False)
+
+        camera_names = get_camera_names()
+        if camera not in camera_names:
+            if camera is not None:
+                logging.warning(f"Unknown camera '{camera}', using the {camera_names[0]} camera")
+            camera = camera_names[0]
+
+        # Use the frame captured, and possibly already described, when the wake phrase was heard. Speculation
+        # only captures from the main camera.
+        speculative_vision = get_speculative_vision() if camera == camera_names[0] else None
+        speculation = speculative_vision.take() if speculative_vision else None
+        if speculation:
+            if speculation.description:
+                try:
+                    description = speculation.description.result()
+                    logging.info(f"Answering from the speculative scene description: {description}")
+                    return description
+                except Exception as e:
+                    logging.warning(f"Speculative scene description failed: {e}")
+            try:
+                payload = speculation.payload.result()
+                if stream_to_speech:
+                    # The answer is spoken as it is generated (see AudioProcessor.handle_successful_tool_response).
+                    # The request is made before the stream is returned, so a failure falls back to the frame buffer.
+                    return vision_client.analyze_frame_stream(speculation.frame, users_request, payload)
+                description = vision_client.analyze_frame(speculation.frame, users_request, payload)
+                logging.info(f"Image analysis result: {description}")
+                return description
+            except Exception as e:
+                logging.warning(f"Analysis of the speculatively captured frame failed: {e}")
 
-        state = state_manager.get_or_create_state()
+        last_wake_time = get_system_state_store().get('last_wake_time')
 
-        if state.last_wake_time is None:
+        if last_wake_time is None:
             return "Something went wrong while processing the state request. Please try again."
         
-        # Convert last_wake_time to datetime
-        last_wake_datetime = datetime.fromtimestamp(state.last_wake_time)
-
-        # Find the closest image file
-        closest_image_path = OSHelper.find_closest_image("tmp/video/", last_wake_datetime.timestamp())
-        logging.info(f"Closest image path: {closest_image_path}")
-        if closest_image_path:
-            # Analyze the image
-            description = vision_client.analyze_image(closest_image_path, users_request)
+        # Find the first frame captured after the wake, or else the latest interval frame (at most
+        # CAPTURE_INTERVAL old), which the buffer keeps even when the scene was found unchanged.
+        frame_buffer = get_frame_buffer(camera)
+        closest_frame = frame_buffer.get_frame_at(last_wake_time) or frame_buffer.get_latest()
+        if closest_frame:
+            frame_time, frame = closest_frame
+            logging.info(f"Closest frame captured by the {camera} camera at: {frame_time}")
+            if stream_to_speech:
+                return vision_client.analyze_frame_stream(frame, users_request)
+            # Analyze the frame
+            description = vision_client.analyze_frame(frame, users_request)
             logging.info(f"Image analysis result: {description}")
             return description    
         else:
             return "Something went wrong processing the request. Please try again."
+
+    # The model picks a camera by name, so the configured cameras are listed in the tool's parameters
+    for tool in openai_functions:
+        if tool["function"]["name"] == "analyze_image_based_on_users_request":
+            tool["function"]["parameters"]["properties"]["camera"]["enum"] = get_camera_names()
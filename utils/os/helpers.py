@@ -9,39 +9,6 @@ class OSHelper:
     This class includes static methods for performing various file system tasks such as cleaning up orphaned files and retrieving files.
     """
 
-    @staticmethod
-    def find_closest_image(directory, target_time):
-        """
-        Finds the closest image file in a directory based on the target time.
-
-        This function searches through all JPG files in the specified directory and 
-        selects the one whose creation time is closest to, but not earlier than, 
-        the target time.
-
-        Args:
-            directory (str): The directory path where the image files are stored.
-            target_time (float): The target time (in seconds since epoch) to compare the file creation times against.
-
-        Returns:
-            str: The path of the closest image file. Returns None if no suitable file is found.
-        """
-        closest_file = None
-        closest_time_diff = None
-
-        # Iterate over each file in the specified directory
-        for filename in os.listdir(directory):
-            if filename.lower().endswith(".jpg"):  # Check if the file is a JPG image
-                filepath = os.path.join(directory, filename)
-                filetime = os.path.getmtime(filepath)  # Get the modification time of the file
-                # Check if the file's time is later than the target time and if it's the closest so far
-                if filetime > target_time:
-                    logging.info(f"File is close: {filepath} - Time: {filetime}")
-                    time_diff = filetime - target_time
-                    if closest_time_diff is None or time_diff < closest_time_diff:
-                        closest_file = filepath
-                        closest_time_diff = time_diff
-        return closest_file
-
     @staticmethod
     def convert_image_to_base64(filepath):
         """
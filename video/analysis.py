@@ -1,5 +1,7 @@
 from config import VISION_ANALYSIS_SETTINGS
 from utils.os.helpers import OSHelper
+from video.analysis_cache import VisionAnalysisCache, normalize_query
+from video.image_prep import ImagePreparer
 import importlib
 import logging
 
@@ -18,6 +20,10 @@ class VisionAnalysisClient:
         module = importlib.import_module(module_name)
         adapter_class = getattr(module, class_name)
         self.adapter = adapter_class() 
+        # Adapters configure their own image preparation; others get the defaults
+        self.image_preparer = getattr(self.adapter, 'image_preparer', None) or ImagePreparer()
+        # Results of recent frame analyses, reused while the scene is unchanged
+        self.cache = VisionAnalysisCache() if VISION_ANALYSIS_SETTINGS.get('cache', True) else None
 
     def analyze_image(self, image_path: str, query: str) -> str:
         """
@@ -44,6 +50,119 @@ class VisionAnalysisClient:
             >>> print(result)
         """
         return self.adapter.analyze_image(image_path, query)
+
+    def analyze_frame(self, frame, query: str, payload: str = None) -> str:
+        """
+        Analyzes a video frame held in memory, e.g. one taken from the frame buffer.
+
+        The frame is prepared in memory (see prepare_frame), so nothing is written to disk. If the
+        same query was recently asked about a frame of the same scene, the cached result is
+        returned without calling the adapter (see VisionAnalysisCache).
+
+        Args:
+            frame (numpy.ndarray): The BGR frame, as captured by cv2.VideoCapture.
+            query (str): A query string describing the analysis to be performed on the frame.
+            payload (str, optional): The frame already prepared by prepare_frame.
+
+        Returns:
+            str: The analysis result as a string.
+        """
+        if self.cache is None:
+            return self.adapter.analyze_image_data(payload or self.prepare_frame(frame), query)
+
+        fingerprint, normalized_query = self.cache.fingerprint(frame), normalize_query(query)
+        result = self.cache.get(fingerprint, normalized_query)
+        if result is not None:
+            logging.info(f"Reusing the cached analysis of an unchanged scene ({self.cache.get_metrics()})")
+            return result
+        result = self.adapter.analyze_image_data(payload or self.prepare_frame(frame), query)
+        # An empty answer is not worth repeating for the rest of the cache's ttl
+        if result:
+            self.cache.put(fingerprint, normalized_query, result)
+        return result
+
+    def analyze_frame_stream(self, frame, query: str, payload: str = None):
+        """
+        Analyzes a video frame held in memory, returning the result as pieces to be consumed as
+        the adapter generates them.
+
+        The request is made, and its first piece received, before this returns, so a failed
+        request raises here, where the caller can still fall back, rather than while the answer
+        is being spoken. Cached results are returned whole. Adapters without streaming support
+        (analyze_image_data_stream) return their complete result at once. The complete result is
+        cached once the stream has been consumed to the end without errors, unless it is empty.
+
+        Args:
+            frame (numpy.ndarray): The BGR frame, as captured by cv2.VideoCapture.
+            query (str): A query string describing the analysis to be performed on the frame.
+            payload (str, optional): The frame already prepared by prepare_frame.
+
+        Returns:
+            iterator: Yields the pieces of the analysis result.
+
+        Raises:
+            RuntimeError: If the adapter returned no answer.
+        """
+        fingerprint = normalized_query = None
+        if self.cache is not None:
+            fingerprint, normalized_query = self.cache.fingerprint(frame), normalize_query(query)
+            result = self.cache.get(fingerprint, normalized_query)
+            if result is not None:
+                logging.info(f"Reusing the cached analysis of an unchanged scene ({self.cache.get_metrics()})")
+                return iter([result])
+
+        payload = payload or self.prepare_frame(frame)
+        if not hasattr(self.adapter, 'analyze_image_data_stream'):
+            result = self.adapter.analyze_image_data(payload, query)
+            if fingerprint is not None and result:
+                self.cache.put(fingerprint, normalized_query, result)
+            return iter([result])
+
+        pieces = self.adapter.analyze_image_data_stream(payload, query)
+        # Streams often start with empty pieces, e.g. OpenAI's first chunk only carries the role
+        first_piece = next((piece for piece in pieces if piece), None)
+        if first_piece is None:
+            raise RuntimeError("The vision analysis returned no answer")
+        return self.stream_pieces(first_piece, pieces, fingerprint, normalized_query)
+
+    def stream_pieces(self, first_piece, pieces, fingerprint, normalized_query):
+        """
+        Yields the pieces of a streamed analysis, and caches the complete result once they have all been received.
+
+        Args:
+            first_piece (str): The piece already received by analyze_frame_stream.
+            pieces (iterator): The adapter's stream of the remaining pieces.
+            fingerprint (tuple): The frame's cache fingerprint, or None to not cache the result.
+            normalized_query (str): The normalized query the result is cached under.
+
+        Yields:
+            str: The next piece of the analysis result.
+        """
+        received = [first_piece]
+        try:
+            yield first_piece
+            for piece in pieces:
+                received.append(piece)
+                yield piece
+        finally:
+            # Stops the adapter's request if the stream is abandoned, e.g. on the stop signal
+            if hasattr(pieces, 'close'):
+                pieces.close()
+        result = "".join(received)
+        if fingerprint is not None and result:
+            self.cache.put(fingerprint, normalized_query, result)
+
+    def prepare_frame(self, frame) -> str:
+        """
+        Crops, downscales and JPEG-encodes a frame with the adapter's image settings, ready to upload.
+
+        Args:
+            frame (numpy.ndarray): The BGR frame.
+
+        Returns:
+            str: The Base64 encoded JPEG image.
+        """
+        return self.image_preparer.prepare(frame)
         
 
 vision_analyzer = VisionAnalysisClient()
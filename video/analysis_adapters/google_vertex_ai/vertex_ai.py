@@ -1,8 +1,9 @@
+import cv2
 import os
 import vertexai
 from vertexai.preview.generative_models import GenerativeModel, Part
-from utils.os.helpers import OSHelper
 from config import GOOGLE_VISION_ANALYSIS_ADAPTER_SETTINGS
+from video.image_prep import ImagePreparer
 
 class VertexAIClient:
     def __init__(self):
@@ -19,6 +20,13 @@ class VertexAIClient:
         # Load the Gemini Pro Vision model
         self.model = GenerativeModel(GOOGLE_VISION_ANALYSIS_ADAPTER_SETTINGS['model'])
 
+        # Downscale and re-encode images before upload
+        self.image_preparer = ImagePreparer(
+            max_edge=GOOGLE_VISION_ANALYSIS_ADAPTER_SETTINGS.get('max_image_edge', 1024),
+            jpeg_quality=GOOGLE_VISION_ANALYSIS_ADAPTER_SETTINGS.get('jpeg_quality', 85),
+            region_of_interest=GOOGLE_VISION_ANALYSIS_ADAPTER_SETTINGS.get('region_of_interest'),
+        )
+
     def analyze_image(self, image_path: str, query: str) -> str:
         """
         Analyzes an image using the Gemini Pro Vision model and returns a description based on the provided query.
@@ -30,8 +38,19 @@ class VertexAIClient:
         Returns:
             str: The API's response text describing the image based on the query.
         """
-        data = OSHelper.convert_image_to_base64(image_path)
-        
+        return self.analyze_image_data(self.image_preparer.prepare(cv2.imread(image_path)), query)
+
+    def analyze_image_data(self, data: str, query: str) -> str:
+        """
+        Analyzes an in-memory image using the Gemini Pro Vision model and returns a description based on the provided query.
+
+        Args:
+            data (str): The Base64 encoded JPEG image.
+            query (str): The query string to provide context or specify the type of information needed about the image.
+
+        Returns:
+            str: The API's response text describing the image based on the query.
+        """
         # Query the model
         response = self.model.generate_content(
             [
@@ -39,4 +58,25 @@ class VertexAIClient:
                 query,                               # Add the query
             ]
         )
-        return response.text
\ No newline at end of file
+        return response.text
+
+    def analyze_image_data_stream(self, data: str, query: str):
+        """
+        Analyzes an in-memory image using the Gemini Pro Vision model, yielding the description as it is generated.
+
+        Args:
+            data (str): The Base64 encoded JPEG image.
+            query (str): The query string to provide context or specify the type of information needed about the image.
+
+        Yields:
+            str: The next piece of the response text.
+        """
+        responses = self.model.generate_content(
+            [
+                Part.from_data(data, "image/jpeg"),  # Add the image
+                query,                               # Add the query
+            ],
+            stream=True,
+        )
+        for response in responses:
+            yield response.text
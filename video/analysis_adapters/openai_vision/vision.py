@@ -1,6 +1,8 @@
-from utils.os.helpers import OSHelper
+import cv2
+from config import OPENAI_SETTINGS
 from integrations.openai.openai import OpenAIClient
 from integrations.openai.openai_conversation_builder import OpenAIConversationBuilder
+from video.image_prep import ImagePreparer
 
 class OpenAIVisionClient:
     """
@@ -14,6 +16,7 @@ class OpenAIVisionClient:
         openai_client (OpenAIClient): An instance of the OpenAIClient class for interacting with OpenAI's API.
         conversation_builder (OpenAIConversationBuilder): An instance of the OpenAIConversationBuilder class to 
                                                           build a conversation-like structure for the image analysis query.
+        image_preparer (ImagePreparer): Downscales and re-encodes images before upload.
     """
 
     def __init__(self):
@@ -24,6 +27,11 @@ class OpenAIVisionClient:
         """
         self.openai_client = OpenAIClient()  # Initialize the OpenAI API client
         self.conversation_builder = OpenAIConversationBuilder()  # Initialize the conversation builder
+        self.image_preparer = ImagePreparer(
+            max_edge=OPENAI_SETTINGS.get('image_max_edge', 1024),
+            jpeg_quality=OPENAI_SETTINGS.get('image_jpeg_quality', 85),
+            region_of_interest=OPENAI_SETTINGS.get('image_region_of_interest'),
+        )
 
     def analyze_image(self, image_path: str, query: str) -> str:
         """
@@ -40,7 +48,43 @@ class OpenAIVisionClient:
         Returns:
             str: The analysis result returned by OpenAI's API.
         """
-        data = OSHelper.convert_image_to_base64(image_path)  # Convert image to base64
+        return self.analyze_image_data(self.image_preparer.prepare(cv2.imread(image_path)), query)  # Downscale and convert image to base64
+
+    def analyze_image_data(self, data: str, query: str) -> str:
+        """
+        Analyzes an in-memory image using OpenAI's API.
+
+        Args:
+            data (str): The Base64 encoded JPEG image.
+            query (str): A query string describing what analysis to perform on the image.
+
+        Returns:
+            str: The analysis result returned by OpenAI's API.
+        """
         conversation = self.conversation_builder.create_recent_conversation_messages_array(query, True, 0, data)  # Build the conversation array
         response = self.openai_client.create_completion(conversation, False, None, None, False)  # Get the analysis from OpenAI
+        if response is None:
+            raise RuntimeError("The vision analysis request failed")
         return response.choices[0].message.content  # Return the content of the response
+
+    def analyze_image_data_stream(self, data: str, query: str):
+        """
+        Analyzes an in-memory image using OpenAI's API, yielding the analysis as it is generated.
+
+        Args:
+            data (str): The Base64 encoded JPEG image.
+            query (str): A query string describing what analysis to perform on the image.
+
+        Yields:
+            str: The next piece of the analysis.
+
+        Raises:
+            RuntimeError: If the request failed.
+        """
+        conversation = self.conversation_builder.create_recent_conversation_messages_array(query, True, 0, data)  # Build the conversation array
+        response = self.openai_client.create_completion(conversation, True, None, None, False)  # Stream the analysis from OpenAI
+        if response is None:
+            raise RuntimeError("The vision analysis request failed")
+        for chunk in response:
+            if chunk.choices and chunk.choices[0].delta.content is not None:
+                yield chunk.choices[0].delta.content
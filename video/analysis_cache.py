@@ -0,0 +1,145 @@
+import re
+import threading
+import time
+from collections import deque
+import cv2
+import numpy as np
+from config import VISION_ANALYSIS_SETTINGS
+
+# (width, height) of the thumbnails compared before a cached result is reused.
+THUMBNAIL_SIZE = (64, 48)
+
+def perceptual_hash(frame):
+    """
+    Returns a 64-bit perceptual hash (pHash) of a frame.
+
+    The frame is reduced to a 32x32 grayscale image, and each bit of the hash records whether one
+    of the 8x8 lowest-frequency DCT coefficients is above their median. Frames of the same scene
+    differ in only a few bits despite sensor noise and JPEG artifacts.
+
+    Args:
+        frame (numpy.ndarray): The BGR frame.
+
+    Returns:
+        int: The hash.
+    """
+    small = cv2.resize(frame, (32, 32), interpolation=cv2.INTER_AREA)
+    gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY).astype(np.float32)
+    low_frequencies = cv2.dct(gray)[:8, :8].flatten()
+    bits = low_frequencies > np.median(low_frequencies[1:])
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+def thumbnail(frame):
+    """
+    Returns a small version of a BGR frame, for pixel-level comparison. Color is kept, as an
+    object can differ from what is behind it in color only.
+    """
+    return cv2.resize(frame, THUMBNAIL_SIZE, interpolation=cv2.INTER_AREA)
+
+def normalize_query(query):
+    """
+    Returns a query in lower case with punctuation removed and whitespace collapsed, so
+    "What do you see?" and "what do you see" share cache entries.
+    """
+    return " ".join(re.findall(r"\w+", query.lower()))
+
+class VisionAnalysisCache:
+    """
+    Caches vision analysis results by frame and normalized query.
+
+    Users often ask "what do you see?" again while the scene is static. A frame asked the same
+    normalized query within ttl seconds gets the cached result, without a vision API request, if
+    it matches the cached frame on two counts:
+
+      - Its perceptual hash is within max_distance bits (Hamming distance). The hash ignores
+        noise but, built from the lowest frequencies only, barely reacts to small changes.
+      - At most max_change of its thumbnail pixels differ from the cached frame's by more than
+        pixel_threshold in any color channel. This catches small changes in one place, like an
+        object held up to the camera, so "what am I holding?" is asked again about a new object.
+
+    Attributes:
+        ttl (float): Seconds a result is reused.
+        max_distance (int): Maximum Hamming distance between the hashes of frames treated as the same scene.
+        max_change (float): Maximum fraction (0 to 1) of changed thumbnail pixels between frames treated as the same scene.
+        pixel_threshold (int): Difference (0 to 255) in any channel at which a thumbnail pixel counts as changed.
+        entries (deque): (created time, frame hash, thumbnail, normalized query, result), oldest first.
+        hits (int): Number of lookups answered from the cache.
+        misses (int): Number of lookups that were not.
+    """
+
+    def __init__(self, ttl=None, max_distance=None, max_entries=None, max_change=None, pixel_threshold=None):
+        """
+        Initializes an empty cache.
+
+        Args:
+            ttl (float, optional): Overrides VISION_ANALYSIS_SETTINGS['cache_ttl'].
+            max_distance (int, optional): Overrides VISION_ANALYSIS_SETTINGS['cache_max_distance'].
+            max_entries (int, optional): Overrides VISION_ANALYSIS_SETTINGS['cache_size'].
+            max_change (float, optional): Overrides VISION_ANALYSIS_SETTINGS['cache_max_change'].
+            pixel_threshold (int, optional): Overrides VISION_ANALYSIS_SETTINGS['cache_pixel_threshold'].
+        """
+        self.ttl = ttl or VISION_ANALYSIS_SETTINGS.get('cache_ttl', 60)
+        self.max_distance = max_distance if max_distance is not None else VISION_ANALYSIS_SETTINGS.get('cache_max_distance', 6)
+        self.max_change = max_change if max_change is not None else VISION_ANALYSIS_SETTINGS.get('cache_max_change', 0.01)
+        self.pixel_threshold = pixel_threshold or VISION_ANALYSIS_SETTINGS.get('cache_pixel_threshold', 25)
+        self.entries = deque(maxlen=max_entries or VISION_ANALYSIS_SETTINGS.get('cache_size', 64))
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def fingerprint(frame):
+        """
+        Returns what the cache compares frames by: (perceptual hash, thumbnail).
+        """
+        return perceptual_hash(frame), thumbnail(frame)
+
+    def matches(self, fingerprint, cached_hash, cached_thumbnail):
+        """
+        Returns True if a frame's fingerprint matches a cached frame's.
+        """
+        frame_hash, frame_thumbnail = fingerprint
+        if (cached_hash ^ frame_hash).bit_count() > self.max_distance:
+            return False
+        changed = (cv2.absdiff(frame_thumbnail, cached_thumbnail) > self.pixel_threshold).any(axis=2)
+        return np.count_nonzero(changed) <= self.max_change * changed.size
+
+    def get(self, fingerprint, query):
+        """
+        Returns the cached result for a frame fingerprint (see fingerprint) and normalized query, or None.
+        """
+        now = time.time()
+        with self.lock:
+            while self.entries and now - self.entries[0][0] > self.ttl:
+                self.entries.popleft()
+            # Newest first, so the most recent analysis of the scene wins.
+            for _, cached_hash, cached_thumbnail, cached_query, result in reversed(self.entries):
+                if cached_query == query and self.matches(fingerprint, cached_hash, cached_thumbnail):
+                    self.hits += 1
+                    return result
+            self.misses += 1
+            return None
+
+    def put(self, fingerprint, query, result):
+        """
+        Caches the result of analyzing a frame with a normalized query.
+        """
+        frame_hash, frame_thumbnail = fingerprint
+        with self.lock:
+            self.entries.append((time.time(), frame_hash, frame_thumbnail, query, result))
+
+    def get_metrics(self):
+        """
+        Returns the hit and miss counts and the hit rate of the cache.
+
+        Returns:
+            dict: hits, misses, hit_rate (None before the first lookup) and entries.
+        """
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else None,
+                "entries": len(self.entries),
+            }
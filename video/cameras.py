@@ -0,0 +1,51 @@
+import os
+from config import VIDEO_SETTINGS
+
+# Name of the single camera used when VIDEO_SETTINGS['VIDEO_DEVICES'] is empty.
+DEFAULT_CAMERA = 'default'
+
+def get_camera_settings():
+    """
+    Returns the settings of every configured camera, the default camera first.
+
+    Each entry of VIDEO_SETTINGS['VIDEO_DEVICES'] is merged over VIDEO_SETTINGS, so a camera
+    only lists the settings it changes. Each camera archives its frames in its own subdirectory
+    of FRAME_ARCHIVE_PATH unless it sets its own. Without VIDEO_DEVICES, there is one camera,
+    named DEFAULT_CAMERA, configured by VIDEO_SETTINGS alone.
+
+    Returns:
+        list[dict]: The settings of each camera, with its name under 'name'.
+    """
+    devices = VIDEO_SETTINGS.get('VIDEO_DEVICES')
+    if not devices:
+        return [{**VIDEO_SETTINGS, 'name': DEFAULT_CAMERA}]
+    archive_path = VIDEO_SETTINGS.get('FRAME_ARCHIVE_PATH', 'data/frame_archive')
+    return [{**VIDEO_SETTINGS, 'FRAME_ARCHIVE_PATH': os.path.join(archive_path, device['name']), **device}
+            for device in devices]
+
+def get_camera_names():
+    """
+    Returns the names of the configured cameras, the default camera first.
+    """
+    return [camera['name'] for camera in get_camera_settings()]
+
+def get_camera(name=None):
+    """
+    Returns the settings of a camera.
+
+    Args:
+        name (str, optional): The camera name. Defaults to the first configured camera.
+
+    Returns:
+        dict: The camera's settings, see get_camera_settings.
+
+    Raises:
+        ValueError: If no camera has that name.
+    """
+    cameras = get_camera_settings()
+    if name is None:
+        return cameras[0]
+    for camera in cameras:
+        if camera['name'] == name:
+            return camera
+    raise ValueError(f"Unknown camera '{name}', expected one of {', '.join(camera['name'] for camera in cameras)}")
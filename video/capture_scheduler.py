@@ -0,0 +1,113 @@
+import logging
+import os
+import sys
+import threading
+import time
+from config import VIDEO_SETTINGS
+
+class CaptureScheduler:
+    """
+    Shares the CPU spent decoding video frames fairly between cameras, and keeps capture from starving audio.
+
+    Grabbing a frame is cheap; decoding it is not. Every camera's capture thread asks the
+    scheduler before decoding a frame. A budget of max_decodes_per_second is split evenly
+    between the running cameras, each holding a token bucket refilled at its share, so adding
+    a camera lowers every camera's display and pose rate instead of adding CPU load, and a busy
+    camera never takes another camera's share. Interval frames for the frame buffer are always
+    decoded, as vision analysis depends on them, but they use up their camera's tokens, so the
+    optional decodes yield to them.
+
+    Capture threads also lower their own scheduling priority by niceness on Linux, so the
+    audio thread is scheduled first whenever both are ready to run.
+
+    Attributes:
+        max_decodes_per_second (float): Frames decoded per second across all cameras, or None for no limit.
+        niceness (int): Amount by which capture threads lower their priority, 0 to keep it.
+        buckets (dict): Per camera name, [tokens, time of the last refill].
+    """
+
+    def __init__(self, max_decodes_per_second=None, niceness=None):
+        """
+        Initializes the scheduler.
+
+        Args:
+            max_decodes_per_second (float, optional): Overrides VIDEO_SETTINGS['MAX_DECODED_FRAMES_PER_SECOND'].
+            niceness (int, optional): Overrides VIDEO_SETTINGS['CAPTURE_NICENESS'].
+        """
+        self.max_decodes_per_second = max_decodes_per_second or VIDEO_SETTINGS.get('MAX_DECODED_FRAMES_PER_SECOND')
+        self.niceness = niceness if niceness is not None else VIDEO_SETTINGS.get('CAPTURE_NICENESS', 5)
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def register(self, camera):
+        """
+        Adds a camera to the cameras sharing the budget. Call from the camera's capture thread,
+        whose priority is lowered.
+        """
+        with self.lock:
+            self.buckets[camera] = [1.0, time.monotonic()]
+        self.lower_thread_priority()
+
+    def unregister(self, camera):
+        """
+        Removes a camera, so its share goes to the remaining cameras.
+        """
+        with self.lock:
+            self.buckets.pop(camera, None)
+
+    def acquire(self, camera, required=False):
+        """
+        Takes a decode from a camera's share of the budget.
+
+        Args:
+            camera (str): The camera name.
+            required (bool, optional): Decode even if the camera's share is used up, borrowing
+                                       from its next tokens. Used for interval frames.
+
+        Returns:
+            bool: True if the frame should be decoded.
+        """
+        if not self.max_decodes_per_second:
+            return True
+        with self.lock:
+            bucket = self.buckets.get(camera)
+            if bucket is None:
+                return True
+            now = time.monotonic()
+            rate = self.max_decodes_per_second / len(self.buckets)
+            # A bucket holds at most one token, so an idle camera cannot save up a burst.
+            bucket[0] = min(bucket[0] + (now - bucket[1]) * rate, 1.0)
+            bucket[1] = now
+            if bucket[0] < 1.0 and not required:
+                return False
+            bucket[0] -= 1.0
+            return True
+
+    def lower_thread_priority(self):
+        """
+        Raises the niceness of the calling thread. Only Linux schedules threads with their own
+        niceness; elsewhere this would lower the whole process, audio included, so it is skipped.
+        """
+        if not self.niceness or not sys.platform.startswith('linux'):
+            return
+        thread_id = threading.get_native_id()
+        try:
+            os.setpriority(os.PRIO_PROCESS, thread_id, os.getpriority(os.PRIO_PROCESS, thread_id) + self.niceness)
+        except OSError as e:
+            logging.warning(f"Could not lower the priority of the capture thread: {e}")
+
+_capture_scheduler = None
+_capture_scheduler_lock = threading.Lock()
+
+def get_capture_scheduler():
+    """
+    Returns the process-wide capture scheduler shared by the cameras' VideoProcessors, creating it on first use.
+
+    Returns:
+        CaptureScheduler: The shared scheduler.
+    """
+    global _capture_scheduler
+    with _capture_scheduler_lock:
+        if _capture_scheduler is None:
+            _capture_scheduler = CaptureScheduler()
+        return _capture_scheduler
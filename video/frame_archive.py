@@ -0,0 +1,259 @@
+import bisect
+import logging
+import mmap
+import os
+import threading
+import time
+import cv2
+import numpy as np
+from config import VIDEO_SETTINGS
+from video.cameras import get_camera
+
+# One index record per archived frame: capture time, and the position of its JPEG in the segment file.
+INDEX_RECORD = np.dtype([('timestamp', '<f8'), ('offset', '<u8'), ('length', '<u4')])
+
+SEGMENT_EXTENSION = '.jpgs'
+INDEX_EXTENSION = '.idx'
+
+class FrameArchive:
+    """
+    Keeps frames on disk for later debugging, in append-only segment files with a timestamp index.
+
+    Frames are JPEG-encoded and appended to the current segment file; a new segment starts every
+    segment_seconds, so one file is written per minute rather than one per frame. Each segment
+    has a sidecar index of fixed-size records (timestamp, offset, length). Timestamps only
+    increase, so a frame is found by binary search over the segment start times and then over
+    the memory-mapped index of one segment, without reading any other file.
+
+    Whole segments are deleted once they are older than max_age seconds, or, oldest first, while
+    the archive is larger than max_bytes. The current segment is never deleted.
+
+    Attributes:
+        directory (str): Directory holding the segment and index files.
+        segment_seconds (float): Seconds of frames per segment.
+        max_bytes (int): Maximum total size of the archive, or None for no limit.
+        max_age (float): Maximum age of a segment in seconds, or None for no limit.
+        jpeg_quality (int): JPEG quality of archived frames, from 0 to 100.
+        segments (list[int]): Start times of the segments in milliseconds since the epoch, oldest first.
+    """
+
+    def __init__(self, directory=None, segment_seconds=None, max_bytes=None, max_age=None, jpeg_quality=None):
+        """
+        Opens the archive, creating its directory if needed. Existing segments are kept; frames are appended to a new segment.
+
+        Args:
+            directory (str, optional): Overrides VIDEO_SETTINGS['FRAME_ARCHIVE_PATH'].
+            segment_seconds (float, optional): Overrides VIDEO_SETTINGS['FRAME_ARCHIVE_SEGMENT_SECONDS'].
+            max_bytes (int, optional): Overrides VIDEO_SETTINGS['FRAME_ARCHIVE_MAX_BYTES'].
+            max_age (float, optional): Overrides VIDEO_SETTINGS['FRAME_ARCHIVE_MAX_AGE'].
+            jpeg_quality (int, optional): Overrides VIDEO_SETTINGS['FRAME_ARCHIVE_JPEG_QUALITY'].
+        """
+        self.directory = directory or VIDEO_SETTINGS.get('FRAME_ARCHIVE_PATH', 'data/frame_archive')
+        self.segment_seconds = segment_seconds or VIDEO_SETTINGS.get('FRAME_ARCHIVE_SEGMENT_SECONDS', 60)
+        self.max_bytes = max_bytes or VIDEO_SETTINGS.get('FRAME_ARCHIVE_MAX_BYTES')
+        self.max_age = max_age or VIDEO_SETTINGS.get('FRAME_ARCHIVE_MAX_AGE')
+        self.jpeg_quality = jpeg_quality or VIDEO_SETTINGS.get('FRAME_ARCHIVE_JPEG_QUALITY', 85)
+        os.makedirs(self.directory, exist_ok=True)
+        self.segments = sorted(int(name[:-len(INDEX_EXTENSION)]) for name in os.listdir(self.directory)
+                               if name.endswith(INDEX_EXTENSION) and name[:-len(INDEX_EXTENSION)].isdigit())
+        self.current_start = None
+        self.segment_file = None
+        self.index_file = None
+        self.lock = threading.Lock()
+
+    def path(self, start, extension):
+        return os.path.join(self.directory, f"{start}{extension}")
+
+    def rotate(self, timestamp):
+        """
+        Closes the current segment and starts a new one at timestamp, then applies retention.
+        """
+        self.close_segment()
+        self.current_start = int(timestamp * 1000)
+        self.segment_file = open(self.path(self.current_start, SEGMENT_EXTENSION), 'ab')
+        self.index_file = open(self.path(self.current_start, INDEX_EXTENSION), 'ab')
+        self.segments.append(self.current_start)
+        self.apply_retention(timestamp)
+
+    def append(self, frame, timestamp):
+        """
+        Encodes a frame as JPEG and appends it to the current segment.
+
+        Args:
+            frame (numpy.ndarray): The BGR frame.
+            timestamp (float): Capture time in seconds since the epoch.
+        """
+        ok, encoded = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+        if not ok:
+            logging.warning(f"Could not encode the frame captured at {timestamp} for the archive")
+            return
+        self.append_jpeg(encoded.tobytes(), timestamp)
+
+    def append_jpeg(self, data, timestamp):
+        """
+        Appends an encoded JPEG image to the current segment.
+
+        The image is written before its index record, so a crash can leave unindexed bytes at the
+        end of a segment but never an index record pointing past its data.
+
+        Args:
+            data (bytes): The JPEG image.
+            timestamp (float): Capture time in seconds since the epoch.
+        """
+        with self.lock:
+            if self.segment_file is None or timestamp * 1000 >= self.current_start + self.segment_seconds * 1000:
+                self.rotate(timestamp)
+            offset = self.segment_file.tell()
+            self.segment_file.write(data)
+            self.segment_file.flush()
+            self.index_file.write(np.array([(timestamp, offset, len(data))], dtype=INDEX_RECORD).tobytes())
+            self.index_file.flush()
+
+    def read_index(self, start):
+        """
+        Returns the index records of a segment, memory-mapped; an empty array if it has none.
+        """
+        index_path = self.path(start, INDEX_EXTENSION)
+        try:
+            with open(index_path, 'rb') as index_file:
+                size = os.fstat(index_file.fileno()).st_size
+                # A record cut short by a crash is ignored.
+                count = size // INDEX_RECORD.itemsize
+                if count == 0:
+                    return np.empty(0, dtype=INDEX_RECORD)
+                mapped = mmap.mmap(index_file.fileno(), count * INDEX_RECORD.itemsize, access=mmap.ACCESS_READ)
+        except FileNotFoundError:
+            return np.empty(0, dtype=INDEX_RECORD)
+        return np.frombuffer(mapped, dtype=INDEX_RECORD, count=count)
+
+    def read_jpeg(self, start, record):
+        """
+        Returns the JPEG image of an index record of a segment.
+        """
+        with open(self.path(start, SEGMENT_EXTENSION), 'rb') as segment_file:
+            segment_file.seek(int(record['offset']))
+            return segment_file.read(int(record['length']))
+
+    def get_frame_at(self, target_time):
+        """
+        Returns the first archived frame captured at or after a given time.
+
+        If the time is older than every archived frame, the oldest archived frame is returned.
+
+        Args:
+            target_time (float): The time in seconds since the epoch.
+
+        Returns:
+            tuple[float, bytes]: (timestamp, JPEG image), or None if no frame was archived at or
+                                 after target_time. Decode the image with cv2.imdecode.
+        """
+        with self.lock:
+            segments = list(self.segments)
+        # The segment that starts last at or before the target, then later ones if it ends earlier.
+        position = max(bisect.bisect_right(segments, target_time * 1000) - 1, 0)
+        for start in segments[position:]:
+            records = self.read_index(start)
+            match = int(np.searchsorted(records['timestamp'], target_time, side='left'))
+            if match < len(records):
+                return float(records[match]['timestamp']), self.read_jpeg(start, records[match])
+        return None
+
+    def iter_frames(self, start_time, end_time):
+        """
+        Yields the archived frames captured between two times.
+
+        Args:
+            start_time (float): Start of the range in seconds since the epoch, inclusive.
+            end_time (float): End of the range in seconds since the epoch, exclusive.
+
+        Yields:
+            tuple[float, bytes]: (timestamp, JPEG image), oldest first.
+        """
+        with self.lock:
+            segments = list(self.segments)
+        position = max(bisect.bisect_right(segments, start_time * 1000) - 1, 0)
+        for start in segments[position:]:
+            if start >= end_time * 1000:
+                return
+            records = self.read_index(start)
+            first = int(np.searchsorted(records['timestamp'], start_time, side='left'))
+            last = int(np.searchsorted(records['timestamp'], end_time, side='left'))
+            for record in records[first:last]:
+                yield float(record['timestamp']), self.read_jpeg(start, record)
+
+    def segment_size(self, start):
+        return sum(os.path.getsize(self.path(start, extension)) for extension in (SEGMENT_EXTENSION, INDEX_EXTENSION)
+                   if os.path.exists(self.path(start, extension)))
+
+    def apply_retention(self, now=None):
+        """
+        Deletes the segments older than max_age, then the oldest segments while the archive is larger than max_bytes.
+
+        Args:
+            now (float, optional): The current time in seconds since the epoch.
+        """
+        now = now or time.time()
+        removable = [start for start in self.segments if start != self.current_start]
+        expired = set()
+        if self.max_age:
+            # A segment holds frames up to the start of the next one.
+            ends = dict(zip(self.segments, self.segments[1:]))
+            expired.update(start for start in removable if ends.get(start, now * 1000) < (now - self.max_age) * 1000)
+        if self.max_bytes:
+            sizes = {start: self.segment_size(start) for start in self.segments}
+            total = sum(size for start, size in sizes.items() if start not in expired)
+            for start in removable:
+                if total <= self.max_bytes:
+                    break
+                if start not in expired:
+                    expired.add(start)
+                    total -= sizes[start]
+        for start in expired:
+            for extension in (SEGMENT_EXTENSION, INDEX_EXTENSION):
+                try:
+                    os.remove(self.path(start, extension))
+                except FileNotFoundError:
+                    pass
+            self.segments.remove(start)
+        if expired:
+            logging.info(f"Removed {len(expired)} frame archive segments")
+
+    def close_segment(self):
+        for file in (self.segment_file, self.index_file):
+            if file is not None:
+                file.close()
+        self.segment_file = self.index_file = None
+
+    def close(self):
+        """
+        Closes the current segment.
+        """
+        with self.lock:
+            self.close_segment()
+
+_frame_archives = {}
+_frame_archive_lock = threading.Lock()
+
+def get_frame_archive(camera=None):
+    """
+    Returns the process-wide frame archive of a camera, or None if FRAME_ARCHIVE is off for it.
+
+    Args:
+        camera (str, optional): The camera name. Defaults to the first configured camera.
+
+    Returns:
+        FrameArchive: The camera's shared archive, or None.
+    """
+    settings = get_camera(camera)
+    if not settings.get('FRAME_ARCHIVE', False):
+        return None
+    with _frame_archive_lock:
+        if settings['name'] not in _frame_archives:
+            _frame_archives[settings['name']] = FrameArchive(
+                directory=settings.get('FRAME_ARCHIVE_PATH'),
+                segment_seconds=settings.get('FRAME_ARCHIVE_SEGMENT_SECONDS'),
+                max_bytes=settings.get('FRAME_ARCHIVE_MAX_BYTES'),
+                max_age=settings.get('FRAME_ARCHIVE_MAX_AGE'),
+                jpeg_quality=settings.get('FRAME_ARCHIVE_JPEG_QUALITY'),
+            )
+        return _frame_archives[settings['name']]
@@ -0,0 +1,154 @@
+import threading
+import numpy as np
+from config import VIDEO_SETTINGS
+from video.cameras import get_camera
+
+class FrameBuffer:
+    """
+    Keeps the most recent video frames in memory, with the time each was captured.
+
+    Frames are copied into a preallocated ring of NumPy arrays, so storing a frame never allocates
+    and the memory used is fixed at capacity frames. Capture timestamps only increase, so the ring
+    is sorted by time and a frame is found by binary search in O(log n).
+
+    With scene-change detection enabled, the VideoProcessor only adds a frame to the ring when the
+    scene has changed. Otherwise every interval frame is added. Either way, the latest interval frame is also kept in a separate slot, so
+    get_latest and get_frame_at always see the current view: a change too small to pass the
+    threshold, like an object held up to the camera, only affects what is retained.
+
+    Attributes:
+        capacity (int): Maximum number of frames kept; the oldest frame is overwritten first.
+        frames (numpy.ndarray): The ring of frames, allocated when the first frame is added.
+        timestamps (numpy.ndarray): Capture time of each slot of the ring, in seconds since the epoch.
+        next_index (int): The slot the next frame is written to.
+        count (int): Number of frames currently held.
+        latest_frame (numpy.ndarray): The latest interval frame, whether or not it was added to the ring.
+        latest_time (float): Capture time of latest_frame, or None before the first frame.
+    """
+
+    def __init__(self, capacity=None):
+        """
+        Initializes an empty buffer.
+
+        Args:
+            capacity (int, optional): Overrides VIDEO_SETTINGS['FRAME_BUFFER_SIZE'].
+        """
+        self.capacity = capacity or VIDEO_SETTINGS.get('FRAME_BUFFER_SIZE', 30)
+        self.frames = None
+        self.timestamps = np.zeros(self.capacity, dtype=np.float64)
+        self.next_index = 0
+        self.count = 0
+        self.latest_frame = None
+        self.latest_time = None
+        self.lock = threading.Lock()
+
+    def add_frame(self, frame, timestamp):
+        """
+        Stores a copy of a frame, overwriting the oldest frame once the buffer is full.
+
+        The ring is reallocated (and emptied) if the frame shape changes, e.g. when the camera
+        resolution changes.
+
+        Args:
+            frame (numpy.ndarray): The frame, as returned by cv2.VideoCapture.read().
+            timestamp (float): Capture time in seconds since the epoch.
+        """
+        with self.lock:
+            if self.frames is None or self.frames.shape[1:] != frame.shape or self.frames.dtype != frame.dtype:
+                self.frames = np.empty((self.capacity,) + frame.shape, dtype=frame.dtype)
+                self.next_index = 0
+                self.count = 0
+            np.copyto(self.frames[self.next_index], frame)
+            self.timestamps[self.next_index] = timestamp
+            self.next_index = (self.next_index + 1) % self.capacity
+            self.count = min(self.count + 1, self.capacity)
+
+    def set_latest(self, frame, timestamp):
+        """
+        Keeps a copy of the latest interval frame, without adding it to the ring.
+
+        Args:
+            frame (numpy.ndarray): The frame, as returned by cv2.VideoCapture.read().
+            timestamp (float): Capture time in seconds since the epoch.
+        """
+        with self.lock:
+            if self.latest_frame is None or self.latest_frame.shape != frame.shape or self.latest_frame.dtype != frame.dtype:
+                self.latest_frame = np.empty_like(frame)
+            np.copyto(self.latest_frame, frame)
+            self.latest_time = timestamp
+
+    def slot(self, position):
+        """
+        Returns the ring slot of the frame at a position in time order (0 is the oldest).
+        """
+        return (self.next_index - self.count + position) % self.capacity
+
+    def get_latest(self):
+        """
+        Returns the most recently captured frame, including the latest slot.
+
+        Returns:
+            tuple[float, numpy.ndarray]: (timestamp, copy of the frame), or None if the buffer is empty.
+        """
+        with self.lock:
+            if self.count and (self.latest_time is None or self.timestamps[self.slot(self.count - 1)] >= self.latest_time):
+                slot = self.slot(self.count - 1)
+                return float(self.timestamps[slot]), self.frames[slot].copy()
+            if self.latest_time is None:
+                return None
+            return float(self.latest_time), self.latest_frame.copy()
+
+    def get_frame_at(self, target_time):
+        """
+        Returns the first frame captured at or after a given time.
+
+        If the time is older than every buffered frame, the oldest buffered frame is returned. If no
+        frame was added to the ring since, the latest slot is returned when it was captured at or
+        after the time, as the scene has not changed enough to add a frame.
+
+        Args:
+            target_time (float): The time in seconds since the epoch, e.g. the last wake time.
+
+        Returns:
+            tuple[float, numpy.ndarray]: (timestamp, copy of the frame), or None if no frame was
+                                         captured at or after target_time.
+        """
+        with self.lock:
+            low, high = 0, self.count
+            while low < high:
+                middle = (low + high) // 2
+                if self.timestamps[self.slot(middle)] < target_time:
+                    low = middle + 1
+                else:
+                    high = middle
+            if low == self.count:
+                if self.latest_time is not None and self.latest_time >= target_time:
+                    return float(self.latest_time), self.latest_frame.copy()
+                return None
+            slot = self.slot(low)
+            return float(self.timestamps[slot]), self.frames[slot].copy()
+
+    def __len__(self):
+        return self.count
+
+_frame_buffers = {}
+_frame_buffer_lock = threading.Lock()
+
+def get_frame_buffer(camera=None):
+    """
+    Returns the process-wide frame buffer of a camera, filled by its VideoProcessor, creating it on first use.
+
+    Args:
+        camera (str, optional): The camera name. Defaults to the first configured camera.
+
+    Returns:
+        FrameBuffer: The camera's shared frame buffer.
+
+    Raises:
+        ValueError: If no camera has that name.
+    """
+    settings = get_camera(camera)
+    with _frame_buffer_lock:
+        if settings['name'] not in _frame_buffers:
+            _frame_buffers[settings['name']] = FrameBuffer(settings.get('FRAME_BUFFER_SIZE'))
+        return _frame_buffers[settings['name']]
@@ -0,0 +1,235 @@
+import cv2
+import logging
+import os
+import subprocess
+import sys
+import threading
+import time
+import numpy as np
+from multiprocessing import resource_tracker, shared_memory
+from multiprocessing.connection import Connection
+
+# Landmarks published per pose: MediaPipe Pose's 33 body landmarks as (x, y, z, visibility),
+# with x and y normalized to the frame size.
+POSE_LANDMARKS = 33
+LANDMARK_FIELDS = 4
+
+# The worker runs as `python -m video.pose_worker` from the project root.
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def run_pose_worker(frame_name, frame_shape, requests, results):
+    """
+    Runs pose estimation in the worker process until the request pipe is closed.
+
+    Each request is the capture time of a frame the parent has just written to shared memory.
+    The parent does not write another frame until the result for this one has been sent. A
+    result is the capture time (float64) followed by the landmarks (float32), NaN if no person
+    was found.
+    """
+    import mediapipe as mp
+
+    frame_memory = shared_memory.SharedMemory(name=frame_name)
+    # The parent owns the shared memory; this process's resource tracker must not unlink it on exit.
+    resource_tracker.unregister(frame_memory._name, "shared_memory")
+    frame = np.ndarray(frame_shape, dtype=np.uint8, buffer=frame_memory.buf)
+    landmarks = np.empty((POSE_LANDMARKS, LANDMARK_FIELDS), dtype=np.float32)
+    pose = mp.solutions.pose.Pose()
+    try:
+        while True:
+            try:
+                timestamp = np.frombuffer(requests.recv_bytes(), dtype=np.float64)[0]
+            except EOFError:
+                return
+            try:
+                output = pose.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+            except Exception as e:
+                logging.error(f"Pose estimation failed: {e}")
+                output = None
+            if output is not None and output.pose_landmarks:
+                landmarks[:] = [(point.x, point.y, point.z, point.visibility) for point in output.pose_landmarks.landmark]
+            else:
+                landmarks[:] = np.nan
+            results.send_bytes(timestamp.tobytes() + landmarks.tobytes())
+    finally:
+        pose.close()
+        # The array must be released before the shared memory it points into is closed.
+        del frame
+        frame_memory.close()
+
+class PoseWorker:
+    """
+    Runs MediaPipe pose estimation in a separate process, at its own rate.
+
+    Frames are passed through shared memory, so they are never pickled, and pose estimation
+    neither stalls the capture loop nor competes for the GIL with the audio thread. The worker
+    takes one frame at a time: frames submitted while it is busy are dropped, so it always works
+    on a recent frame and never builds a backlog. The landmarks of the latest processed frame
+    are published as a (33, 4) float32 array with the capture time of the frame.
+
+    The worker is a fresh interpreter running this module, rather than a fork of the capture
+    thread: a fork of a process full of threads (audio, background tasks, the database pool)
+    can inherit a lock held by another thread and deadlock. If the worker exits or takes more
+    than BUSY_TIMEOUT seconds on a frame, the error is logged and it is restarted with the next
+    frame, up to MAX_RESTARTS times, after which pose estimation is disabled.
+
+    Attributes:
+        frame_shape (tuple): Shape of the frames the shared memory was sized for.
+        process (subprocess.Popen): The worker process, started with the first frame.
+        restarts (int): Number of times the worker was restarted after failing.
+        disabled (bool): True once the worker failed more than MAX_RESTARTS times.
+    """
+
+    # Seconds the worker may spend on one frame before it is considered hung. Generous, as the
+    # first frame also waits for MediaPipe to load.
+    BUSY_TIMEOUT = 30
+    MAX_RESTARTS = 3
+
+    def __init__(self):
+        """
+        Initializes the worker. Shared memory and the process are created when the first frame is submitted.
+        """
+        self.frame_shape = None
+        self.process = None
+        self.busy_since = None
+        self.latest_pose = None
+        self.restarts = 0
+        self.disabled = False
+        self.lock = threading.Lock()
+
+    def start(self, frame_shape):
+        """
+        Creates the shared memory for frames of the given shape and starts the worker process.
+        """
+        self.frame_shape = frame_shape
+        self.frame_memory = shared_memory.SharedMemory(create=True, size=int(np.prod(frame_shape)))
+        self.frame = np.ndarray(frame_shape, dtype=np.uint8, buffer=self.frame_memory.buf)
+
+        request_read, request_write = os.pipe()
+        result_read, result_write = os.pipe()
+        # A session of its own keeps Ctrl+C from reaching the worker; it exits when the request pipe closes.
+        self.process = subprocess.Popen(
+            [sys.executable, '-m', 'video.pose_worker', self.frame_memory.name, ','.join(map(str, frame_shape)),
+             str(request_read), str(result_write)],
+            pass_fds=(request_read, result_write), cwd=PROJECT_ROOT, start_new_session=True,
+        )
+        os.close(request_read)
+        os.close(result_write)
+        self.requests = Connection(request_write, readable=False)
+        self.results = Connection(result_read, writable=False)
+        self.busy_since = None
+        logging.info(f"Pose worker started (pid {self.process.pid}) for {frame_shape[1]}x{frame_shape[0]} frames")
+
+    def collect_results(self):
+        """
+        Reads the results the worker has sent, keeping the latest.
+        """
+        try:
+            while self.results.poll():
+                message = self.results.recv_bytes()
+                timestamp = float(np.frombuffer(message[:8], dtype=np.float64)[0])
+                landmarks = np.frombuffer(message[8:], dtype=np.float32).reshape(POSE_LANDMARKS, LANDMARK_FIELDS)
+                with self.lock:
+                    self.latest_pose = None if np.isnan(landmarks[0, 0]) else (timestamp, landmarks.copy())
+                self.busy_since = None
+        except (EOFError, OSError):
+            # The worker exited; check_worker notices it.
+            pass
+
+    def check_worker(self):
+        """
+        Collects the worker's results, and restarts it if it exited or hung.
+
+        Returns:
+            bool: False once pose estimation has been disabled.
+        """
+        if self.process is None:
+            return not self.disabled
+        self.collect_results()
+        if self.process.poll() is not None:
+            failure = f"exited with code {self.process.returncode}"
+        elif self.busy_since is not None and time.monotonic() - self.busy_since > self.BUSY_TIMEOUT:
+            failure = f"did not finish a frame in {self.BUSY_TIMEOUT} seconds"
+        else:
+            return True
+        logging.error(f"Pose worker (pid {self.process.pid}) {failure}")
+        self.close()
+        self.restarts += 1
+        if self.restarts > self.MAX_RESTARTS:
+            logging.error(f"Pose estimation disabled, the pose worker failed {self.restarts} times")
+            self.disabled = True
+        return not self.disabled
+
+    def is_idle(self):
+        """
+        Returns True if the worker would take a frame now. Lets the capture loop skip decoding frames that would be dropped.
+        """
+        return self.check_worker() and (self.process is None or self.busy_since is None)
+
+    def submit(self, frame, timestamp):
+        """
+        Hands a frame to the worker, unless it is still busy with the previous one.
+
+        Args:
+            frame (numpy.ndarray): The BGR uint8 frame.
+            timestamp (float): Capture time of the frame in seconds since the epoch.
+
+        Returns:
+            bool: True if the worker took the frame, False if it was dropped.
+        """
+        if not self.check_worker():
+            return False
+        if self.process is not None and frame.shape != self.frame_shape:
+            self.close()
+        if self.process is None:
+            self.start(frame.shape)
+        if self.busy_since is not None:
+            return False
+        np.copyto(self.frame, frame)
+        try:
+            self.requests.send_bytes(np.float64(timestamp).tobytes())
+        except OSError:
+            # The worker exited; check_worker restarts it.
+            return False
+        self.busy_since = time.monotonic()
+        return True
+
+    def get_latest_pose(self):
+        """
+        Returns the landmarks of the most recently processed frame.
+
+        Returns:
+            tuple[float, numpy.ndarray]: (capture time of the frame, (33, 4) array of x, y, z and
+                                         visibility), or None if no frame was processed yet or no
+                                         person was found in the latest one.
+        """
+        if self.process is not None:
+            self.collect_results()
+        with self.lock:
+            return self.latest_pose
+
+    def close(self):
+        """
+        Stops the worker process and releases the shared memory.
+        """
+        if self.process is None:
+            return
+        # Closing the request pipe ends the worker's loop.
+        self.requests.close()
+        try:
+            self.process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+        self.results.close()
+        self.process = None
+        self.busy_since = None
+        self.frame = None
+        self.frame_memory.close()
+        self.frame_memory.unlink()
+
+if __name__ == '__main__':
+    # Started by PoseWorker.start: python -m video.pose_worker FRAME_MEMORY_NAME FRAME_SHAPE REQUEST_FD RESULT_FD
+    logging.basicConfig(level=logging.INFO)
+    frame_name, frame_shape, request_fd, result_fd = sys.argv[1:]
+    run_pose_worker(frame_name, tuple(int(size) for size in frame_shape.split(',')),
+                    Connection(int(request_fd), writable=False), Connection(int(result_fd), readable=False))
@@ -0,0 +1,67 @@
+import cv2
+import numpy as np
+from config import VIDEO_SETTINGS
+
+class SceneChangeDetector:
+    """
+    Detects when the camera's view has changed enough to be worth keeping a new frame.
+
+    Each frame is reduced to a small grayscale thumbnail and compared with the thumbnail of the
+    last frame that was kept. The change score is the fraction of thumbnail pixels whose
+    brightness differs by more than pixel_threshold, so sensor noise and small lighting flicker
+    score near 0 while a person walking in, or the robot turning, scores high. Comparing with the
+    last kept frame, rather than the previous one, also catches slow changes once they add up.
+
+    Attributes:
+        threshold (float): Change score (0 to 1) at or above which the scene has changed.
+        pixel_threshold (int): Brightness difference (0 to 255) at which a thumbnail pixel counts as changed.
+        thumbnail_size (tuple): (width, height) of the thumbnails compared.
+        reference (numpy.ndarray): Thumbnail of the last kept frame, or None before the first frame.
+    """
+
+    def __init__(self, threshold=None, pixel_threshold=None, thumbnail_size=(64, 48)):
+        """
+        Initializes the detector.
+
+        Args:
+            threshold (float, optional): Overrides VIDEO_SETTINGS['SCENE_CHANGE_THRESHOLD'].
+            pixel_threshold (int, optional): Overrides VIDEO_SETTINGS['SCENE_CHANGE_PIXEL_THRESHOLD'].
+            thumbnail_size (tuple, optional): (width, height) of the compared thumbnails.
+        """
+        self.threshold = threshold or VIDEO_SETTINGS.get('SCENE_CHANGE_THRESHOLD', 0.05)
+        self.pixel_threshold = pixel_threshold or VIDEO_SETTINGS.get('SCENE_CHANGE_PIXEL_THRESHOLD', 25)
+        self.thumbnail_size = thumbnail_size
+        self.reference = None
+
+    def thumbnail(self, frame):
+        """
+        Returns a small grayscale version of a BGR frame. Downscaling first keeps the color conversion cheap.
+        """
+        small = cv2.resize(frame, self.thumbnail_size, interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+
+    def score(self, thumbnail):
+        """
+        Returns the change score of a thumbnail against the last kept frame; 1.0 if no frame was kept yet.
+        """
+        if self.reference is None:
+            return 1.0
+        difference = cv2.absdiff(thumbnail, self.reference)
+        return float(np.count_nonzero(difference > self.pixel_threshold)) / difference.size
+
+    def update(self, frame):
+        """
+        Scores a frame and, if the scene changed, makes it the new reference.
+
+        Args:
+            frame (numpy.ndarray): The BGR frame.
+
+        Returns:
+            tuple[bool, float]: Whether the scene changed, and the change score.
+        """
+        thumbnail = self.thumbnail(frame)
+        score = self.score(thumbnail)
+        changed = score >= self.threshold
+        if changed:
+            self.reference = thumbnail
+        return changed, score
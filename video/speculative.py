@@ -0,0 +1,163 @@
+import logging
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from config import VIDEO_SETTINGS, VISION_ANALYSIS_SETTINGS
+from video.analysis import get_vision_analyzer
+from video.frame_buffer import get_frame_buffer
+
+# Bare verbs like "see", "show" and "read" are left out, as they are as common in requests that
+# are not visual ("see you later", "show me the weather", "read me the news").
+DEFAULT_VISUAL_KEYWORDS = ("can you see", "do you see", "what you see", "see this", "look at", "looking at",
+                           "read this", "read that", "show you", "color", "colour", "holding", "wearing", "camera",
+                           "picture", "front of you", "what is this", "what's this")
+
+DEFAULT_SCENE_PROMPT = ("Describe this scene in detail: the people, objects, any visible text, colors and where things "
+                        "are. Mention what anyone near the camera is holding, pointing at or showing.")
+
+class Speculation:
+    """
+    A frame captured when a wake phrase was heard, prepared for upload ahead of the vision tool.
+    It belongs to the utterance being spoken, and is discarded when that utterance is done.
+
+    Attributes:
+        created_at (float): When the speculation started, in seconds since the epoch.
+        frame_time (float): Capture time of the frame.
+        frame (numpy.ndarray): The frame.
+        payload (concurrent.futures.Future): Resolves to the frame's upload payload.
+        description (concurrent.futures.Future): Resolves to a generic scene description, or None if none was requested.
+    """
+
+    def __init__(self, frame_time, frame, payload):
+        self.created_at = time.time()
+        self.frame_time = frame_time
+        self.frame = frame
+        self.payload = payload
+        self.description = None
+
+class SpeculativeVision:
+    """
+    Starts vision work when a wake phrase is heard, before the language model has chosen the vision tool.
+
+    The vision tool only runs after two language model round trips (the tool check and the tool
+    selection). When a wake phrase is heard, the current frame is taken from the main camera's frame buffer and
+    prepared for upload in the background. If the utterance then looks visual to a cheap local
+    keyword check, a generic scene description is requested right away. The vision tool takes the
+    speculation: it answers from the description when there is one, or analyzes the prepared frame.
+    When vision answers are streamed to speech, no description is requested, as the answer is
+    spoken directly and must address the user's actual question.
+
+    A speculation is only ever used for the utterance it was captured during: the audio processor
+    calls end_utterance once each recognized utterance has been handled, which discards it
+    whether or not the vision tool took it, so a later request never gets an older frame or a
+    description made for another question.
+
+    Attributes:
+        keywords (tuple): Words and phrases that make an utterance look visual.
+        scene_prompt (str): The query used for the generic scene description.
+        max_age (float): Seconds a speculation remains usable by the vision tool.
+        speculation (Speculation): The speculation of the current utterance, or None.
+    """
+
+    def __init__(self):
+        """
+        Initializes the speculative path and its background worker.
+        """
+        keywords = VISION_ANALYSIS_SETTINGS.get('speculative_keywords', DEFAULT_VISUAL_KEYWORDS)
+        self.keywords = tuple(keyword.lower() for keyword in keywords)
+        self.keyword_pattern = re.compile(r"\b(" + "|".join(re.escape(keyword) for keyword in self.keywords) + r")\b")
+        self.scene_prompt = VISION_ANALYSIS_SETTINGS.get('speculative_prompt', DEFAULT_SCENE_PROMPT)
+        self.describe = not VISION_ANALYSIS_SETTINGS.get('stream_to_speech', False)
+        self.max_age = VISION_ANALYSIS_SETTINGS.get('speculative_max_age', 30)
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="speculative-vision")
+        self.speculation = None
+        self.lock = threading.Lock()
+
+    def looks_visual(self, text):
+        """
+        Returns True if an utterance contains one of the visual keywords.
+        """
+        return bool(self.keyword_pattern.search(text.lower()))
+
+    def on_wake(self):
+        """
+        Captures the current frame and starts preparing its upload payload in the background.
+
+        The current utterance's speculation is kept, so a wake phrase seen in several partial
+        recognition results, and then in the final result, only captures one frame.
+        """
+        with self.lock:
+            if self.speculation is not None:
+                return
+            latest = get_frame_buffer().get_latest()
+            if latest is None:
+                return
+            frame_time, frame = latest
+            payload = self.executor.submit(get_vision_analyzer().prepare_frame, frame)
+            self.speculation = Speculation(frame_time, frame, payload)
+            logging.debug(f"Speculatively preparing the frame captured at {frame_time}")
+
+    def on_utterance(self, text):
+        """
+        Captures the frame and, unless answers are streamed to speech, requests a generic scene
+        description right away if the utterance looks visual.
+
+        Args:
+            text (str): The recognized utterance.
+        """
+        if not self.looks_visual(text):
+            return
+        self.on_wake()
+        with self.lock:
+            speculation = self.speculation
+            if not self.describe or speculation is None or speculation.description is not None:
+                return
+            logging.info("ROBOT THOUGHT: That sounds visual, taking a look.")
+            vision_client = get_vision_analyzer()
+            speculation.description = self.executor.submit(
+                lambda: vision_client.adapter.analyze_image_data(speculation.payload.result(), self.scene_prompt))
+
+    def take(self):
+        """
+        Returns the current speculation if it is still fresh, and clears it so it is used only once.
+
+        Returns:
+            Speculation: The speculation, or None.
+        """
+        with self.lock:
+            speculation, self.speculation = self.speculation, None
+        if speculation is None or time.time() - speculation.created_at > self.max_age:
+            return None
+        return speculation
+
+    def end_utterance(self):
+        """
+        Discards the current utterance's speculation, if the vision tool did not take it. Work
+        that has not started yet is cancelled.
+        """
+        with self.lock:
+            speculation, self.speculation = self.speculation, None
+        if speculation is not None:
+            speculation.payload.cancel()
+            if speculation.description is not None:
+                speculation.description.cancel()
+            logging.debug(f"Discarded the unused speculation for the frame captured at {speculation.frame_time}")
+
+_speculative_vision = None
+_speculative_vision_lock = threading.Lock()
+
+def get_speculative_vision():
+    """
+    Returns the process-wide speculative vision path, or None if it is disabled.
+
+    Returns:
+        SpeculativeVision: The shared instance, or None.
+    """
+    global _speculative_vision
+    if not (VIDEO_SETTINGS.get('CAPTURE_VIDEO', False) and VISION_ANALYSIS_SETTINGS.get('speculative', False)):
+        return None
+    with _speculative_vision_lock:
+        if _speculative_vision is None:
+            _speculative_vision = SpeculativeVision()
+        return _speculative_vision
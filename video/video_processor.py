@@ -1,37 +1,67 @@
 import cv2
 import mediapipe as mp
-import os
+import numpy as np
 import queue
 import logging
 import threading
 import time
 from config import VIDEO_SETTINGS
 from utils.os.helpers import OSHelper
+from video.cameras import get_camera
+from video.capture_scheduler import get_capture_scheduler
+from video.frame_archive import get_frame_archive
+from video.frame_buffer import get_frame_buffer
+from video.pose_worker import PoseWorker
+from video.scene_change import SceneChangeDetector
 
 class VideoProcessor:
     """
     A class to handle video processing, including capturing video input and 
     processing it with MediaPipe for pose estimation.
+
+    Each camera has its own VideoProcessor, running in its own thread, with its own frame
+    buffer, archive and rates. The cameras share a CaptureScheduler, which splits the frames
+    decoded per second fairly between them.
     """
 
-    def __init__(self):
-        # MediaPipe Pose solution initialization
-        self.mp_pose = mp.solutions.pose
-        self.pose = self.mp_pose.Pose()
+    def __init__(self, camera=None):
+        """
+        Initializes the processor of a camera.
+
+        Args:
+            camera (str, optional): The camera name (see VIDEO_SETTINGS['VIDEO_DEVICES']). Defaults to the first camera.
+        """
+        self.settings = get_camera(camera)
+        self.name = self.settings['name']
+
+        # MediaPipe Pose runs in its own process (see PoseWorker), only when pose estimation is enabled
+        self.pose_estimation = self.settings.get('POSE_ESTIMATION', False)
+        self.pose_worker = PoseWorker() if self.pose_estimation else None
         self.cap = None
 
         # Video capture settings
-        self.frame_rate = VIDEO_SETTINGS.get('FRAME_RATE', 30)
-        self.device = VIDEO_SETTINGS.get('VIDEO_DEVICE', 0)
-        self.capture_interval = VIDEO_SETTINGS.get('CAPTURE_INTERVAL', 1)
-        self.frame_counter = 0
+        self.frame_rate = self.settings.get('FRAME_RATE', 30)
+        self.frame_width = self.settings.get('FRAME_WIDTH')
+        self.frame_height = self.settings.get('FRAME_HEIGHT')
+        self.device = self.settings.get('VIDEO_DEVICE', 0)
+        self.capture_interval = self.settings.get('CAPTURE_INTERVAL', 1)
         self.last_capture_time = time.time()
-        self.frame_queue = queue.Queue()
 
-        # Check and create tmp directory for storing frames
-        self.tmp_folder = 'tmp/video'
-        if not os.path.exists(self.tmp_folder):
-            os.makedirs(self.tmp_folder)
+        # Frames for the GUI, latest only, so a slow display never holds old frames
+        self.show_video = self.settings.get('SHOW_VIDEO', False)
+        self.display_interval = 1.0 / self.settings.get('DISPLAY_FRAME_RATE', 15)
+        self.last_display_time = 0
+        self.frame_queue = queue.Queue(maxsize=1)
+
+        # Recent frames, kept in memory for vision analysis; only when the scene changed if detection is enabled
+        self.frame_buffer = get_frame_buffer(self.name)
+        self.scene_detector = None
+        if self.settings.get('SCENE_CHANGE_DETECTION', True):
+            self.scene_detector = SceneChangeDetector(self.settings.get('SCENE_CHANGE_THRESHOLD'),
+                                                      self.settings.get('SCENE_CHANGE_PIXEL_THRESHOLD'))
+        # Buffered frames are also kept on disk when the frame archive is enabled
+        self.frame_archive = get_frame_archive(self.name)
+        self.scheduler = get_capture_scheduler()
 
         self.shutdown_event = threading.Event()
 
@@ -40,25 +70,106 @@ class VideoProcessor:
         Captures and processes the video stream.
         """
         if VIDEO_SETTINGS.get('CAPTURE_VIDEO', False):
-            self.cap = cv2.VideoCapture(self.device)
+            self.cap = self.open_capture()
+            self.scheduler.register(self.name)
 
             while not self.shutdown_event.is_set():
-                ret, frame = self.cap.read()
+                # Grab every frame so the driver's buffer never holds stale frames, but only decode
+                # (retrieve) the frames a consumer needs.
+                if not self.cap.grab():
+                    time.sleep(0.01)
+                    continue
+
+                now = time.time()
+                buffer_due = now - self.last_capture_time > self.capture_interval
+                display_due = self.show_video and now - self.last_display_time >= self.display_interval
+                pose_due = self.pose_estimation and self.pose_worker.is_idle()
+                if not (buffer_due or display_due or pose_due):
+                    continue
+                # Display and pose frames are skipped once this camera has used its share of the decode budget
+                if not self.scheduler.acquire(self.name, required=buffer_due):
+                    continue
+
+                ret, frame = self.cap.retrieve()
                 if not ret:
                     continue
 
+                # Capture frames at a set interval into the frame buffer
+                if buffer_due:
+                    self.buffer_frame(frame, now)
+                    self.last_capture_time = now
+
                 # Process the frame
-                #self.process_frame(frame)
+                if pose_due:
+                    self.process_frame(frame, now)
 
-                # Capture frames at a set interval for saving
-                if time.time() - self.last_capture_time > self.capture_interval:
-                    frame_name = os.path.join(self.tmp_folder, f"frame_{self.frame_counter}.jpg")
-                    cv2.imwrite(frame_name, frame)
-                    logging.debug(f"Frame saved as {frame_name}")
-                    self.frame_counter += 1
-                    self.last_capture_time = time.time()
+                if display_due:
+                    if self.pose_estimation:
+                        frame = self.draw_pose(frame)
+                    self.show_frame(frame)
+                    self.last_display_time = now
 
+            self.scheduler.unregister(self.name)
             self.clean_up()
+
+    def buffer_frame(self, frame, timestamp):
+        """
+        Makes an interval frame the frame buffer's latest frame, and adds it to the buffer's ring
+        and the frame archive unless scene-change detection finds the scene unchanged. The vision
+        tool always sees the latest frame; the detection only limits what is retained.
+        """
+        self.frame_buffer.set_latest(frame, timestamp)
+        if self.scene_detector is None:
+            self.frame_buffer.add_frame(frame, timestamp)
+            logging.debug(f"Camera {self.name}: frame buffered at {timestamp}")
+        else:
+            changed, score = self.scene_detector.update(frame)
+            if not changed:
+                return
+            self.frame_buffer.add_frame(frame, timestamp)
+            logging.debug(f"Camera {self.name}: scene changed (score {score:.3f}), frame buffered at {timestamp}")
+        if self.frame_archive:
+            self.frame_archive.append(frame, timestamp)
+
+    def open_capture(self):
+        """
+        Opens the video device and negotiates the configured resolution and frame rate.
+
+        Cameras pick the nearest mode they support, so the negotiated values are read back and
+        logged. A lower resolution or frame rate reduces the USB bandwidth and the CPU spent
+        grabbing frames.
+
+        Returns:
+            cv2.VideoCapture: The opened capture device.
+        """
+        cap = cv2.VideoCapture(self.device)
+        if self.frame_width and self.frame_height:
+            cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.frame_width)
+            cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.frame_height)
+        cap.set(cv2.CAP_PROP_FPS, self.frame_rate)
+
+        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        logging.info(f"Camera {self.name}: video device {self.device} negotiated {width}x{height} at {fps:g} fps")
+        if (self.frame_width and self.frame_height and (width, height) != (self.frame_width, self.frame_height)) \
+                or (fps and abs(fps - self.frame_rate) > 0.5):
+            logging.warning(f"Camera {self.name}: video device {self.device} does not support {self.frame_width}x{self.frame_height} "
+                            f"at {self.frame_rate} fps, using {width}x{height} at {fps:g} fps")
+        return cap
+
+    def show_frame(self, frame):
+        """
+        Hands a frame to the GUI, replacing the previous frame if it has not been shown yet.
+        """
+        try:
+            self.frame_queue.get_nowait()
+        except queue.Empty:
+            pass
+        try:
+            self.frame_queue.put_nowait(frame)
+        except queue.Full:
+            pass
     
     def clean_up(self):
         """
@@ -66,21 +177,42 @@ class VideoProcessor:
         """
         if self.cap:
             self.cap.release()
+        if self.pose_worker:
+            self.pose_worker.close()
+        if self.frame_archive:
+            self.frame_archive.close()
         cv2.destroyAllWindows()
         OSHelper.clear_orphaned_video_files()
 
-    def process_frame(self, frame):
+    def process_frame(self, frame, timestamp):
         """
-        Processes a single video frame.
+        Processes a single video frame by handing it to the pose worker. The frame is dropped if the worker is busy.
         """
-        self.frame_queue.put(frame)
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = self.pose.process(frame_rgb)
+        self.pose_worker.submit(frame, timestamp)
 
-        if results.pose_landmarks:
-            # Draw pose landmarks
-            mp.solutions.drawing_utils.draw_landmarks(frame, results.pose_landmarks, self.mp_pose.POSE_CONNECTIONS)
-            # Additional processing can be added here
+    def get_latest_pose(self):
+        """
+        Returns the latest pose landmarks, as (capture time, (33, 4) array), or None. See PoseWorker.get_latest_pose.
+        """
+        return self.pose_worker.get_latest_pose() if self.pose_worker else None
+
+    def draw_pose(self, frame, min_visibility=0.5):
+        """
+        Draws the latest pose landmarks and their connections on a frame for display.
+        """
+        pose = self.get_latest_pose()
+        if pose is None:
+            return frame
+        height, width = frame.shape[:2]
+        landmarks = pose[1]
+        points = np.rint(landmarks[:, :2] * (width, height)).astype(int)
+        visible = landmarks[:, 3] >= min_visibility
+        for start, end in mp.solutions.pose.POSE_CONNECTIONS:
+            if visible[start] and visible[end]:
+                cv2.line(frame, tuple(points[start]), tuple(points[end]), (255, 255, 255), 2)
+        for point in points[visible]:
+            cv2.circle(frame, tuple(point), 3, (0, 0, 255), -1)
+        return frame
     
     def shutdown(self):
         """